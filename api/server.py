@@ -22,10 +22,19 @@ CORS(app)
 # Хранилище активных задач
 tasks = {}
 
+# Токены отмены выполняющихся задач (не в tasks - там только JSON для /api/progress)
+cancel_tokens = {}
+
 @app.route('/api/health', methods=['GET'])
 def health():
-    """Health check"""
-    return jsonify({'status': 'ok', 'message': 'Flask API is running'})
+    """Health check (+ загружена ли модель Ollama в память)"""
+    from services.ollama_session import get_ollama_session
+
+    return jsonify({
+        'status': 'ok',
+        'message': 'Flask API is running',
+        'ollama': get_ollama_session().status()
+    })
 
 @app.route('/api/create-video', methods=['POST'])
 def create_video():
@@ -52,6 +61,10 @@ def create_video():
             'data': data
         }
 
+        # Токен до старта потока: отмена доступна сразу после ответа с task_id
+        from services.cancellation import CancelToken
+        cancel_tokens[task_id] = CancelToken()
+
         # Запускаем РЕАЛЬНУЮ генерацию в отдельном потоке
         thread = Thread(target=real_generation, args=(task_id, data))
         thread.daemon = True
@@ -77,6 +90,30 @@ def get_progress(task_id):
 
     return jsonify(tasks[task_id])
 
+@app.route('/api/cancel/<task_id>', methods=['POST'])
+def cancel_task(task_id):
+    """Отменить генерацию: корутина, HTTP-запросы и процессы рендера задачи"""
+    if task_id not in tasks:
+        return jsonify({'error': 'Task not found'}), 404
+
+    token = cancel_tokens.get(task_id)
+    if token is None or tasks[task_id]['status'] != 'running':
+        return jsonify({'error': f"Task is {tasks[task_id]['status']}"}), 409
+
+    tasks[task_id].update({
+        'status': 'cancelling',
+        'step': 'Отмена...'
+    })
+
+    # Процессы рендера убиваются сразу - CPU освобождается до ответа
+    token.cancel()
+
+    return jsonify({
+        'success': True,
+        'task_id': task_id,
+        'message': 'Task cancelled'
+    })
+
 @app.route('/api/videos', methods=['GET'])
 def get_videos():
     """Получить список готовых видео"""
@@ -87,6 +124,10 @@ def real_generation(task_id, data):
     """
     РЕАЛЬНАЯ генерация видео через MainOrchestrator
     """
+    from services.cancellation import TaskCancelledError, run_cancellable
+
+    token = cancel_tokens[task_id]
+
     try:
         from main_orchestrator import YouTubeAutomationOrchestrator
 
@@ -107,7 +148,7 @@ def real_generation(task_id, data):
                 'generating_audio': 'Создание озвучки через ElevenLabs...',
                 'audio_complete': 'Озвучка готова!',
                 'generating_subtitles': 'Генерация субтитров...',
-                'editing_video': 'Рендер финального видео через Remotion...',
+                'editing_video': 'Рендер финального видео...',
                 'finalizing': 'Создание SEO метаданных...',
                 'complete': 'Видео готово!'
             }
@@ -138,6 +179,10 @@ def real_generation(task_id, data):
         voice = data.get('voice', 'rachel')
         music = data.get('music', 'no_music')
         use_ollama = data.get('use_ollama', True)  # По умолчанию используем Ollama
+        renderer = data.get('renderer', 'remotion')  # 'remotion' или 'ffmpeg'
+        scene_cache = data.get('scene_cache', False)  # Рендер по сценам с кэшем клипов
+        prerender_subtitles = data.get('prerender_subtitles', False)  # Субтитры из ASS, а не в браузере
+        output_formats = data.get('output_formats')  # Например ['landscape', 'shorts']
 
         # Создаём прогресс callback который интегрируется с MainOrchestrator
         def orchestrator_progress(step):
@@ -158,8 +203,21 @@ def real_generation(task_id, data):
             progress = progress_map.get(step, 0)
             progress_callback(step, progress)
 
-        # Запускаем полный пайплайн
-        video_path = loop.run_until_complete(
+        def render_progress(stats):
+            """Реальный прогресс рендера: кадры, fps и ETA вместо оценки по процентам"""
+            tasks[task_id].update({
+                'progress': 90 + int(stats['percent'] * 0.05),
+                'step': (
+                    f"Рендер: {stats['frames']}/{stats['totalFrames']} кадров "
+                    f"({stats['fps']:.1f} fps)"
+                ),
+                'timeRemaining': stats['eta'] if stats['eta'] is not None else tasks[task_id].get('timeRemaining'),
+                'render': stats
+            })
+
+        # Запускаем полный пайплайн (отменяется через /api/cancel)
+        video_path = run_cancellable(
+            loop,
             orchestrator.create_full_video(
                 topic=topic,
                 niche=niche,
@@ -167,8 +225,14 @@ def real_generation(task_id, data):
                 voice=voice,
                 background_music=music,
                 use_ollama=use_ollama,  # Передаём параметр Ollama
-                on_progress=orchestrator_progress
-            )
+                on_progress=orchestrator_progress,
+                renderer=renderer,
+                scene_cache=scene_cache,
+                on_render_progress=render_progress,
+                prerender_subtitles=prerender_subtitles,
+                output_formats=output_formats
+            ),
+            token
         )
 
         # Получаем метаданные видео (через ffprobe вместо MoviePy)
@@ -203,6 +267,15 @@ def real_generation(task_id, data):
 
         loop.close()
 
+    except TaskCancelledError:
+        print(f"Task {task_id} cancelled")
+
+        tasks[task_id].update({
+            'status': 'cancelled',
+            'step': 'Отменено',
+            'timeRemaining': 0
+        })
+
     except Exception as e:
         print(f"Error in real_generation: {e}")
         import traceback
@@ -213,6 +286,127 @@ def real_generation(task_id, data):
             'error': str(e)
         })
 
+    finally:
+        cancel_tokens.pop(task_id, None)
+
+@app.route('/api/preview-render', methods=['POST'])
+def preview_render():
+    """Черновой рендер готового проекта (480p, без генерации изображений и озвучки)"""
+    try:
+        data = request.get_json()
+
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+
+        if 'project_dir' not in data:
+            return jsonify({'error': 'project_dir is required'}), 400
+
+        from services.output_manager import OutputManager
+
+        try:
+            project_dir = OutputManager().resolve_project_dir(data['project_dir'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 403
+
+        if not (project_dir / 'timeline.json').exists():
+            return jsonify({'error': 'Project has no timeline.json'}), 404
+
+        task_id = str(uuid.uuid4())
+
+        tasks[task_id] = {
+            'status': 'running',
+            'progress': 0,
+            'step': 'Черновой рендер...',
+            'timeRemaining': None,
+            'data': data
+        }
+
+        from services.cancellation import CancelToken
+        cancel_tokens[task_id] = CancelToken()
+
+        thread = Thread(target=preview_generation, args=(task_id, data))
+        thread.daemon = True
+        thread.start()
+
+        return jsonify({
+            'success': True,
+            'task_id': task_id,
+            'message': 'Preview render started'
+        })
+
+    except Exception as e:
+        print(f"Error in preview_render: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def preview_generation(task_id, data):
+    """
+    Черновой рендер через YouTubeAutomationOrchestrator.render_preview
+    (без создания оркестратора: нужны только таймлайн и рендерер)
+    """
+    from services.cancellation import TaskCancelledError, run_cancellable
+
+    token = cancel_tokens[task_id]
+
+    try:
+        from main_orchestrator import YouTubeAutomationOrchestrator
+
+        def render_progress(stats):
+            tasks[task_id].update({
+                'progress': int(stats['percent']),
+                'step': (
+                    f"Черновой рендер: {stats['frames']}/{stats['totalFrames']} кадров "
+                    f"({stats['fps']:.1f} fps)"
+                ),
+                'timeRemaining': stats['eta'],
+                'render': stats
+            })
+
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        preview_path = run_cancellable(
+            loop,
+            YouTubeAutomationOrchestrator.render_preview(
+                project_dir=data['project_dir'],
+                renderer=data.get('renderer', 'remotion'),
+                scene_step=int(data.get('scene_step', 1)),
+                on_render_progress=render_progress
+            ),
+            token
+        )
+
+        tasks[task_id].update({
+            'status': 'completed',
+            'progress': 100,
+            'step': 'Черновик готов!',
+            'timeRemaining': 0,
+            'video': {
+                'path': preview_path
+            }
+        })
+
+        loop.close()
+
+    except TaskCancelledError:
+        tasks[task_id].update({
+            'status': 'cancelled',
+            'step': 'Отменено',
+            'timeRemaining': 0
+        })
+
+    except Exception as e:
+        print(f"Error in preview_generation: {e}")
+        import traceback
+        traceback.print_exc()
+
+        tasks[task_id].update({
+            'status': 'error',
+            'error': str(e)
+        })
+
+    finally:
+        cancel_tokens.pop(task_id, None)
+
 @app.route('/api/open-file', methods=['POST'])
 def open_file():
     """Открыть файл в системном приложении по умолчанию"""
@@ -1033,4 +1227,8 @@ if __name__ == '__main__':
     print("=" * 80)
     print()
 
+    # Прогрев Ollama: первое видео утром не ждёт загрузку модели
+    from services.ollama_session import get_ollama_session
+    get_ollama_session().warm_up_in_background()
+
     app.run(host='127.0.0.1', port=5001, debug=False, threaded=True)
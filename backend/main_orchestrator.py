@@ -27,11 +27,17 @@ from services.api_key_manager import APIKeyManager
 from services.content_analyzer import ContentAnalyzer, ContentAnalyzerError
 from services.analyzer_advanced import YouTubeAnalyzer, YouTubeAnalyzerError
 from services.script_gen import ScriptGenerator, ScriptGeneratorError
-from services.remotion_renderer import RemotionRenderer
+from services.remotion_renderer import RENDER_PROFILES, RemotionRenderer
+from services.ffmpeg_renderer import FFmpegRenderer
+from services.segment_renderer import SegmentedRenderer
+from services.ken_burns import EffectType, KenBurnsEffect
+from services.scene_clip_cache import SceneCachedRenderer
+from services.cancellation import TaskCancelledError, run_process
 from typing import Dict, List, Optional
 from datetime import datetime
 import asyncio
 import json
+import shutil
 
 
 class YouTubeAutomationError(Exception):
@@ -46,6 +52,19 @@ class YouTubeAutomationOrchestrator:
     Координирует работу всех сервисов для создания видео от идеи до готового контента
     """
 
+    # Длина сценария в create_full_video (слов)
+    SCRIPT_TARGET_LENGTH = 1000
+
+    # Движки финального монтажа (create_full_video(renderer=...))
+    RENDERERS = ('remotion', 'ffmpeg')
+
+    # Форматы видео по имени (create_full_video(output_formats=...))
+    OUTPUT_FORMATS = {
+        'landscape': (1920, 1080),
+        'shorts': (1080, 1920),
+        'square': (1080, 1080)
+    }
+
     def __init__(
         self,
         cache_file: str = ".api_keys_cache.json",
@@ -107,6 +126,10 @@ class YouTubeAutomationOrchestrator:
             )
             print("   ✅ ScriptGenerator инициализирован (Google Gemini)")
 
+            # Ollama грузит модель заранее, пока готовятся остальные сервисы
+            if not (self.script_generator.ollama.last_warm_up or {}).get('ok'):
+                self.script_generator.ollama.warm_up_in_background()
+
             # 5. Инициализируем Ken Burns Effects
             print("⚙️  Инициализация KenBurnsEffect...")
             from services.ken_burns import KenBurnsEffect
@@ -118,6 +141,10 @@ class YouTubeAutomationOrchestrator:
             self.video_renderer = RemotionRenderer()
             print("   ✅ Remotion рендерер инициализирован (профессиональные эффекты)")
 
+            # Render server собирает bundle и открывает браузер, пока идут генерация и TTS
+            if self.video_renderer.server:
+                self.video_renderer.server.start_in_background()
+
             print()
             print("=" * 70)
             print("✅ ВСЕ СЕРВИСЫ ИНИЦИАЛИЗИРОВАНЫ УСПЕШНО")
@@ -273,7 +300,8 @@ class YouTubeAutomationOrchestrator:
                     image_prompts = await self.script_generator.generate_image_prompts(
                         script=script['script'],
                         style=image_style,
-                        images_per_minute=15
+                        images_per_minute=15,
+                        language=language
                     )
 
                     project['image_prompts'] = image_prompts
@@ -472,6 +500,206 @@ class YouTubeAutomationOrchestrator:
         except Exception as e:
             raise YouTubeAutomationError(f"Ошибка загрузки проекта: {str(e)}")
 
+    def get_renderer(
+        self,
+        renderer: str = "remotion",
+        subtitle_style: str = "highlighted_words",
+        profile: str = "final",
+        prerender_subtitles: bool = False
+    ):
+        """
+        Рендерер для задачи (аргументы - см. create_renderer)
+
+        Финальный Remotion рендер без предрендера субтитров - общий
+        self.video_renderer, остальные - новый экземпляр для того же проекта
+
+        Raises:
+            YouTubeAutomationError: Неизвестный рендерер или профиль
+        """
+        if renderer == 'remotion' and profile == 'final' and not prerender_subtitles:
+            return self.video_renderer
+
+        return self.create_renderer(
+            renderer, subtitle_style, profile, prerender_subtitles,
+            remotion_dir=self.video_renderer.remotion_dir
+        )
+
+    @classmethod
+    def create_renderer(
+        cls,
+        renderer: str = "remotion",
+        subtitle_style: str = "highlighted_words",
+        profile: str = "final",
+        prerender_subtitles: bool = False,
+        remotion_dir: Optional[str] = None
+    ):
+        """
+        Новый рендерер (без оркестратора - нужен только Remotion проект)
+
+        Args:
+            renderer: 'remotion' или 'ffmpeg'
+            subtitle_style: Стиль субтитров (FFmpegRenderer прожигает их сам)
+            profile: Профиль рендера из RENDER_PROFILES ('final' или 'preview')
+            prerender_subtitles: Remotion рендерит только сцены, субтитры
+                прожигаются ffmpeg из ASS (у FFmpegRenderer так всегда)
+            remotion_dir: Remotion проект (по умолчанию - remotion-renderer)
+
+        Raises:
+            YouTubeAutomationError: Неизвестный рендерер или профиль
+        """
+        if profile not in RENDER_PROFILES:
+            raise YouTubeAutomationError(
+                f"Неизвестный профиль рендера: {profile} (доступны: {', '.join(RENDER_PROFILES)})"
+            )
+
+        if renderer == 'remotion':
+            # Тот же Remotion проект - и тот же прогретый render server
+            return RemotionRenderer(
+                remotion_dir=remotion_dir,
+                profile=profile,
+                subtitles='ass' if prerender_subtitles else 'remotion',
+                subtitle_style=subtitle_style
+            )
+        if renderer == 'ffmpeg':
+            # Без состояния и дорогой инициализации - свой экземпляр на задачу
+            if profile == 'final':
+                return FFmpegRenderer(subtitle_style=subtitle_style)
+
+            settings = RENDER_PROFILES[profile]
+            return FFmpegRenderer(
+                transition=0 if settings['simple_transitions'] else 0.5,
+                subtitle_style=subtitle_style,
+                preset=settings['x264_preset'],
+                crf=settings['crf'],
+                supersample=1
+            )
+
+        raise YouTubeAutomationError(
+            f"Неизвестный рендерер: {renderer} (доступны: {', '.join(cls.RENDERERS)})"
+        )
+
+    @classmethod
+    def parse_output_format(cls, output_format) -> tuple:
+        """
+        Формат видео -> (ширина, высота)
+
+        Args:
+            output_format: Имя из OUTPUT_FORMATS, строка 'WxH' или (W, H)
+
+        Raises:
+            YouTubeAutomationError: Неизвестный или некорректный формат
+        """
+        if isinstance(output_format, str) and output_format in cls.OUTPUT_FORMATS:
+            return cls.OUTPUT_FORMATS[output_format]
+
+        try:
+            if isinstance(output_format, str):
+                width, height = (int(value) for value in output_format.lower().split('x'))
+            else:
+                width, height = (int(value) for value in output_format)
+        except (TypeError, ValueError):
+            raise YouTubeAutomationError(
+                f"Неизвестный формат видео: {output_format} (например: {', '.join(cls.OUTPUT_FORMATS)} или 1080x1920)"
+            )
+
+        # x264 с yuv420p требует чётные размеры
+        if width <= 0 or height <= 0 or width % 2 or height % 2:
+            raise YouTubeAutomationError(f"Некорректный размер видео: {width}x{height}")
+
+        return width, height
+
+    @staticmethod
+    def reframe_scenes(scenes: List[Dict], width: int, height: int) -> List[Dict]:
+        """
+        Сцены для формата кадра: окна Ken Burns пересчитываются под его пропорции
+
+        Для 16:9 сцены возвращаются как есть
+        """
+        if width * 9 == height * 16:
+            return scenes
+
+        ken_burns = KenBurnsEffect()
+        reframed = []
+        for scene in scenes:
+            params = scene.get('effectParams')
+            if not params:
+                try:
+                    params = ken_burns.get_effect_params(EffectType(scene.get('effect', 'zoom_in')))
+                except ValueError:
+                    params = ken_burns.get_effect_params(EffectType.STATIC)
+
+            reframed.append({**scene, 'effectParams': ken_burns.reframe_params(params, width, height)})
+
+        return reframed
+
+    def _add_background_music(
+        self,
+        video_path: str,
+        background_music: str,
+        audio_duration: float,
+        output_path: str
+    ) -> str:
+        """
+        Наложение фоновой музыки на готовое видео
+
+        Returns:
+            Путь к видео с музыкой (или исходное видео, если музыка не выбрана
+            или не наложилась)
+        """
+        if background_music and background_music != 'no_music':
+            print(f"\n🎵 Добавление фоновой музыки ({background_music})...")
+            from config.background_music import get_music_path, get_music_volume
+
+            music_path = get_music_path(background_music)
+            if music_path and os.path.exists(music_path):
+                volume_db = get_music_volume(background_music)
+                output_with_music = output_path
+
+                from services.music_bed_cache import MusicBedCache, probe_sample_rate
+
+                # Готовая подложка (громкость, частота, зацикливание) - остаётся обрезать и сложить
+                cmd = None
+                if audio_duration > 0:
+                    try:
+                        bed_cache = MusicBedCache()
+                        bed_path = bed_cache.get_bed(
+                            background_music,
+                            audio_duration,
+                            sample_rate=probe_sample_rate(video_path)
+                        )
+                        cmd = bed_cache.build_mix_command(video_path, bed_path, audio_duration, output_with_music)
+                    except Exception as e:
+                        print(f"   ⚠️  Подложка недоступна, сводим напрямую: {e}")
+
+                if cmd is None:
+                    # FFmpeg команда для наложения музыки
+                    cmd = [
+                        'ffmpeg', '-i', video_path, '-i', music_path,
+                        '-filter_complex',
+                        f'[1:a]volume={volume_db}dB,aloop=loop=-1:size=2e+09[music];'
+                        '[0:a][music]amix=inputs=2:duration=first:dropout_transition=2',
+                        '-c:v', 'copy', '-c:a', 'aac',
+                        '-shortest',  # Обрезать музыку по длительности видео
+                        '-y',  # Overwrite output
+                        output_with_music
+                    ]
+
+                try:
+                    result = run_process(cmd)
+                    if result.returncode != 0:
+                        raise RuntimeError(result.stderr[-2000:])
+                    video_path = output_with_music
+                    print(f"   ✅ Музыка добавлена ({volume_db} dB)")
+                except TaskCancelledError:
+                    raise
+                except Exception as e:
+                    print(f"   ⚠️  Не удалось добавить музыку: {e}")
+            else:
+                print(f"   ℹ️  Музыкальный файл не найден: {music_path}")
+                print(f"   📝 Скачайте музыку из YouTube Audio Library и поместите в backend/assets/music/")
+
+        return video_path
+
     async def create_full_video(
         self,
         topic: str,
@@ -481,7 +709,12 @@ class YouTubeAutomationOrchestrator:
         background_music: str = "no_music",
         subtitle_style: str = "highlighted_words",
         use_ollama: bool = True,
-        on_progress: callable = None
+        on_progress: callable = None,
+        renderer: str = "remotion",
+        scene_cache: bool = False,
+        on_render_progress: callable = None,
+        prerender_subtitles: bool = False,
+        output_formats: Optional[List] = None
     ) -> str:
         """
         ПОЛНЫЙ ПАЙПЛАЙН: от темы до готового видео!
@@ -494,15 +727,40 @@ class YouTubeAutomationOrchestrator:
             subtitle_style: Стиль субтитров
             use_ollama: Использовать локальную Ollama для генерации скриптов
             on_progress: Callback для обновления прогресса
+            renderer: Движок монтажа: 'remotion' (React/Chromium) или
+                'ffmpeg' (zoompan/xfade, на порядок быстрее на CPU)
+            scene_cache: Рендер по сценам с кэшем клипов - при повторном
+                рендере перерисовываются только изменившиеся сцены
+                (сцены склеиваются встык, без переходов)
+            on_render_progress: Callback реального прогресса рендера: кадры,
+                скорость (fps) и ETA из вывода рендерера (см. RenderProgress)
+            prerender_subtitles: Субтитры стиля subtitle_style один раз
+                прожигаются из ASS вместо отрисовки в браузере на каждом кадре
+            output_formats: Форматы видео из одного таймлайна, например
+                ['landscape', 'shorts'] или ['1920x1080', '1080x1920'].
+                Первый - основное video.mp4, остальные - video_<W>x<H>.mp4;
+                изображения и озвучка генерируются один раз
 
         Returns:
             Путь к готовому видео
+
+        Raises:
+            TaskCancelledError: Задача отменена (см. services.cancellation)
         """
 
         from services.output_manager import OutputManager
         from services.telegram_notifier import TelegramNotifier
         import time
 
+        formats = [self.parse_output_format(output_format) for output_format in (output_formats or ['landscape'])]
+        base_renderer = self.get_renderer(renderer, subtitle_style, prerender_subtitles=prerender_subtitles)
+
+        if scene_cache:
+            video_renderer = SceneCachedRenderer(base_renderer)
+        else:
+            # Длинные видео рендерятся сегментами параллельно, короткие - целиком
+            video_renderer = SegmentedRenderer(base_renderer)
+
         # Инициализация
         output_manager = OutputManager()
         telegram = TelegramNotifier()
@@ -531,6 +789,8 @@ class YouTubeAutomationOrchestrator:
             }
         )
 
+        voice_manager = None
+
         try:
             # ШАГ 1: Генерация скрипта
             telegram.notify_progress(topic, "generating_script", 20)
@@ -540,7 +800,7 @@ class YouTubeAutomationOrchestrator:
 
             script_result = await self.script_generator.generate_script(
                 topic=topic,
-                target_length=1000,
+                target_length=self.SCRIPT_TARGET_LENGTH,
                 language='ru',
                 use_ollama=use_ollama
             )
@@ -562,10 +822,13 @@ class YouTubeAutomationOrchestrator:
                 on_progress("generating_images")
             print(f"\n[2/5] 🎨 Генерация изображений...")
 
+            # Изображения генерируются до озвучки: длительностей TTS ещё нет, тайминги
+            # сцен - по скорости речи (ScenePlanner принимает и реальные, когда они есть)
             image_prompts = await self.script_generator.generate_image_prompts(
                 script=script_text,
                 style=style,
-                images_per_minute=15
+                images_per_minute=15,
+                language='ru'
             )
 
             # Генерируем изображения
@@ -624,10 +887,9 @@ class YouTubeAutomationOrchestrator:
                 print(f"   ⚠️  Не удалось получить длительность аудио: {e}")
                 audio_duration = 0  # Fallback
 
-            # Remotion рендер - профессиональные эффекты
-            print("   🎨 Используется Remotion для профессиональных эффектов")
+            print(f"   🎨 Рендер: {renderer}")
 
-            # Подготовка сцен для Remotion
+            # Подготовка сцен (общий формат RemotionRenderer / FFmpegRenderer)
             remotion_scenes = []
 
             for scene in scenes:
@@ -635,6 +897,7 @@ class YouTubeAutomationOrchestrator:
                     'imagePath': scene['path'],
                     'duration': scene['duration'],
                     'effect': scene.get('effect_type', 'zoom_in'),
+                    'effectParams': scene.get('effect_params'),
                     'subtitle': {
                         'text': scene.get('subtitle_text', ''),
                         'startTime': scene.get('subtitle_start', 0),
@@ -644,48 +907,44 @@ class YouTubeAutomationOrchestrator:
                 }
                 remotion_scenes.append(remotion_scene)
 
-            # Рендер через Remotion
-            output_video = self.video_renderer.render_video(
-                scenes=remotion_scenes,
-                audio_path=str(audio_path),
-                output_path=str(project_dir / "temp" / "video.mp4"),
-                fps=30,
-                width=1920,
-                height=1080
+            # Таймлайн проекта - для черновых и повторных рендеров без генерации заново
+            output_manager.save_timeline(
+                project_dir, remotion_scenes, audio_path, audio_duration, subtitle_style, *formats[0]
             )
 
-            # Добавление фоновой музыки (если выбрана)
-            if background_music and background_music != 'no_music':
-                print(f"\n🎵 Добавление фоновой музыки ({background_music})...")
-                from config.background_music import get_music_path, get_music_volume
-
-                music_path = get_music_path(background_music)
-                if music_path and os.path.exists(music_path):
-                    volume_db = get_music_volume(background_music)
-                    output_with_music = str(project_dir / "temp" / "video_with_music.mp4")
+            # Все форматы - из одних изображений, озвучки и плана Ken Burns
+            output_video = None
+            extra_videos = []
+
+            for index, (width, height) in enumerate(formats):
+                suffix = '' if index == 0 else f"_{width}x{height}"
+                if len(formats) > 1:
+                    print(f"\n📐 Формат {index + 1}/{len(formats)}: {width}x{height}")
+
+                rendered = video_renderer.render_video(
+                    scenes=self.reframe_scenes(remotion_scenes, width, height),
+                    audio_path=str(audio_path),
+                    output_path=str(project_dir / "temp" / f"video{suffix}.mp4"),
+                    fps=30,
+                    width=width,
+                    height=height,
+                    on_progress=on_render_progress
+                )
 
-                    # FFmpeg команда для наложения музыки
-                    import subprocess
-                    cmd = [
-                        'ffmpeg', '-i', output_video, '-i', music_path,
-                        '-filter_complex',
-                        f'[1:a]volume={volume_db}dB,aloop=loop=-1:size=2e+09[music];'
-                        '[0:a][music]amix=inputs=2:duration=first:dropout_transition=2',
-                        '-c:v', 'copy', '-c:a', 'aac',
-                        '-shortest',  # Обрезать музыку по длительности видео
-                        '-y',  # Overwrite output
-                        output_with_music
-                    ]
+                # Добавление фоновой музыки (если выбрана)
+                rendered = self._add_background_music(
+                    rendered, background_music, audio_duration,
+                    str(project_dir / "temp" / f"video{suffix}_with_music.mp4")
+                )
 
-                    try:
-                        subprocess.run(cmd, check=True, capture_output=True)
-                        output_video = output_with_music
-                        print(f"   ✅ Музыка добавлена ({volume_db} dB)")
-                    except Exception as e:
-                        print(f"   ⚠️  Не удалось добавить музыку: {e}")
+                if index == 0:
+                    output_video = rendered
                 else:
-                    print(f"   ℹ️  Музыкальный файл не найден: {music_path}")
-                    print(f"   📝 Скачайте музыку из YouTube Audio Library и поместите в backend/assets/music/")
+                    # temp удаляется при сохранении основного видео - копируем сразу
+                    extra_path = project_dir / f"video_{width}x{height}.mp4"
+                    shutil.copy2(rendered, extra_path)
+                    extra_videos.append(str(extra_path))
+                    print(f"   ✅ {extra_path.name}")
 
             # Время генерации
             generation_time = time.time() - start_time
@@ -702,6 +961,7 @@ class YouTubeAutomationOrchestrator:
                     'subtitle_style': subtitle_style,
                     'duration': audio_duration,
                     'image_count': len(scenes),
+                    'formats': [f"{width}x{height}" for width, height in formats],
                     'word_count': script_result['word_count'],
                     'language': 'ru',
                     'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -728,6 +988,8 @@ class YouTubeAutomationOrchestrator:
             print(f"\n🎉 ВИДЕО ГОТОВО!")
             print(f"📁 Папка проекта: {project_dir}")
             print(f"🎬 Видео: {final_path}")
+            for extra_video in extra_videos:
+                print(f"🎬 Видео: {extra_video}")
 
             # Логирование статистики
             try:
@@ -749,6 +1011,14 @@ class YouTubeAutomationOrchestrator:
 
             return str(final_path)
 
+        except (TaskCancelledError, asyncio.CancelledError):
+            # Символы ElevenLabs, зарезервированные под озвучку этой задачи, больше не нужны
+            if voice_manager and voice_manager.quota_scheduler:
+                voice_manager.quota_scheduler.release_all()
+
+            print(f"\n⏹️  Задача отменена: {topic}")
+            raise
+
         except Exception as e:
             # Логирование неудачной попытки
             try:
@@ -770,3 +1040,85 @@ class YouTubeAutomationOrchestrator:
             telegram.notify_error(topic, "unknown", str(e))
             print(f"\n❌ ОШИБКА: {e}")
             raise
+
+    @staticmethod
+    def sample_scenes(scenes: List[Dict], step: int = 1) -> List[Dict]:
+        """
+        Каждая step-я сцена для чернового рендера
+
+        Выбранная сцена держится на экране всю свою группу (сумма длительностей),
+        поэтому видео остаётся той же длины и озвучка не рассинхронизируется
+        """
+        if step <= 1:
+            return scenes
+
+        sampled = []
+        for start in range(0, len(scenes), step):
+            group = scenes[start:start + step]
+            sampled.append({**group[0], 'duration': sum(scene['duration'] for scene in group)})
+
+        return sampled
+
+    @classmethod
+    async def render_preview(
+        cls,
+        project_dir: str,
+        renderer: str = "remotion",
+        scene_step: int = 1,
+        on_render_progress: callable = None,
+        output_manager=None
+    ) -> str:
+        """
+        Черновой рендер готового проекта (профиль 'preview': 480p, 15 fps,
+        ultrafast, склейка встык) из его изображений и озвучки
+
+        Нужны только таймлайн и рендерер - оркестратор (ключи API, Ollama)
+        не создаётся
+
+        Args:
+            project_dir: Папка проекта (с timeline.json из create_full_video)
+            renderer: 'remotion' или 'ffmpeg'
+            scene_step: Брать каждую N-ю сцену (1 - все сцены)
+            on_render_progress: Callback прогресса рендера (см. RenderProgress)
+            output_manager: OutputManager с папкой проектов (по умолчанию - стандартная)
+
+        Returns:
+            Путь к preview.mp4 в папке проекта
+
+        Raises:
+            YouTubeAutomationError: Папка вне папки проектов, нет таймлайна,
+                неизвестный рендерер
+        """
+        from services.output_manager import OutputManager
+
+        output_manager = output_manager or OutputManager()
+
+        try:
+            project_dir = output_manager.resolve_project_dir(project_dir)
+            timeline = output_manager.load_timeline(project_dir)
+        except (ValueError, FileNotFoundError) as e:
+            raise YouTubeAutomationError(str(e))
+
+        profile = RENDER_PROFILES['preview']
+        video_renderer = cls.create_renderer(renderer, timeline.get('subtitleStyle', 'highlighted_words'), 'preview')
+
+        # Формат основного видео (старые таймлайны - 16:9)
+        source_width, source_height = timeline.get('width', 1920), timeline.get('height', 1080)
+        scenes = cls.reframe_scenes(cls.sample_scenes(timeline['scenes'], scene_step), source_width, source_height)
+
+        # Короткая сторона - высота профиля (480p), стороны чётные (требование x264)
+        scale = profile['height'] / min(source_width, source_height)
+        width = round(source_width * scale / 2) * 2
+        height = round(source_height * scale / 2) * 2
+
+        print(f"\n👀 Черновой рендер: {len(scenes)} сцен, {width}x{height}, {profile['fps']} fps ({renderer})")
+
+        return video_renderer.render_video(
+            scenes=scenes,
+            audio_path=timeline.get('audioPath'),
+            output_path=str(project_dir / "preview.mp4"),
+            fps=profile['fps'],
+            width=width,
+            height=height,
+            on_progress=on_render_progress
+        )
@@ -449,9 +449,14 @@ class SafeAPIManager(APIKeyManager):
 
         return selected_key
 
-    async def get_safe_elevenlabs_key(self) -> Optional[str]:
+    async def get_safe_elevenlabs_key(self, required_chars: int = 0) -> Optional[str]:
         """
         Возвращает безопасный ElevenLabs ключ с проверкой лимитов
+
+        Args:
+            required_chars: Сколько символов нужно озвучить этим ключом.
+                Ключи с меньшим остатком месячного лимита пропускаются сразу,
+                а не после отказа API.
         """
 
         if not self.elevenlabs_keys:
@@ -476,6 +481,18 @@ class SafeAPIManager(APIKeyManager):
         if not available_keys:
             raise ValueError("❌ Нет доступных ElevenLabs ключей!")
 
+        # Отсекаем ключи, остатка которых не хватит на запрос
+        if required_chars > 0:
+            available_keys = [
+                key for key in available_keys
+                if self.get_elevenlabs_remaining(key) >= required_chars
+            ]
+
+            if not available_keys:
+                raise ValueError(
+                    f"❌ Ни у одного ElevenLabs ключа не осталось {required_chars} символов!"
+                )
+
         # Выбираем ключ с наименьшим использованием
         selected_key = self._select_least_used_key('elevenlabs', available_keys)
 
@@ -483,10 +500,111 @@ class SafeAPIManager(APIKeyManager):
         if self._check_monthly_limit('elevenlabs', selected_key):
             print(f"⚠️  Ключ достиг месячного лимита (10,000 символов), отправляю в waiting_list на 30 дней")
             self._add_to_waiting_list('elevenlabs', selected_key, days=30)
-            return await self.get_safe_elevenlabs_key()  # Рекурсивно
+            return await self.get_safe_elevenlabs_key(required_chars)  # Рекурсивно
 
         return selected_key
 
+    def get_elevenlabs_remaining(self, key: str) -> int:
+        """
+        Остаток месячного лимита символов ElevenLabs для ключа
+
+        Берёт лимит из последней синхронизации с API подписки
+        (sync_elevenlabs_quota), иначе из safety_config, и вычитает
+        локально отслеженное использование.
+        """
+        key_hash = self._get_key_hash(key)
+        key_data = self.key_status.get('elevenlabs', {}).get(key_hash)
+
+        if not key_data:
+            return self.safety_config['elevenlabs_limit']
+
+        # Сброс месячного счётчика по дате из API подписки
+        next_reset = key_data.get('next_reset_at')
+        if next_reset and datetime.now() >= datetime.fromisoformat(next_reset):
+            key_data['monthly_usage'] = 0
+            key_data['last_monthly_reset'] = datetime.now().isoformat()
+            key_data.pop('next_reset_at', None)
+            self._save_key_status()
+        else:
+            # Локальный 30-дневный сброс
+            self._check_monthly_limit('elevenlabs', key)
+
+        limit = key_data.get('character_limit', self.safety_config['elevenlabs_limit'])
+        return max(0, limit - key_data.get('monthly_usage', 0))
+
+    def sync_elevenlabs_quota(
+        self,
+        keys: Optional[List[str]] = None,
+        max_age_hours: float = 6,
+        timeout: int = 10
+    ) -> Dict[str, int]:
+        """
+        Синхронизирует остатки символов с API подписки ElevenLabs
+
+        GET /v1/user/subscription возвращает character_count и character_limit.
+        Ключи, синхронизированные менее max_age_hours назад, не запрашиваются.
+        При ошибке сети остаётся локальная оценка.
+
+        Returns:
+            {key_hash: остаток символов}
+        """
+        import requests
+
+        if keys is None:
+            keys = self.elevenlabs_keys
+
+        if 'elevenlabs' not in self.key_status:
+            self.key_status['elevenlabs'] = {}
+
+        remaining = {}
+        now = datetime.now()
+
+        for key in keys:
+            key_hash = self._get_key_hash(key)
+            key_data = self.key_status['elevenlabs'].setdefault(key_hash, {
+                'usage': 0,
+                'daily_usage': 0,
+                'monthly_usage': 0,
+                'last_used_date': now.isoformat(),
+                'last_monthly_reset': now.isoformat(),
+                'errors': 0
+            })
+
+            synced_at = key_data.get('quota_synced_at')
+            if synced_at and now - datetime.fromisoformat(synced_at) < timedelta(hours=max_age_hours):
+                remaining[key_hash] = self.get_elevenlabs_remaining(key)
+                continue
+
+            try:
+                response = requests.get(
+                    "https://api.elevenlabs.io/v1/user/subscription",
+                    headers={"xi-api-key": key},
+                    timeout=timeout
+                )
+
+                if response.status_code == 200:
+                    subscription = response.json()
+                    key_data['character_limit'] = subscription.get(
+                        'character_limit', self.safety_config['elevenlabs_limit']
+                    )
+                    key_data['monthly_usage'] = subscription.get('character_count', 0)
+                    key_data['quota_synced_at'] = now.isoformat()
+
+                    reset_unix = subscription.get('next_character_count_reset_unix')
+                    if reset_unix:
+                        key_data['next_reset_at'] = datetime.fromtimestamp(reset_unix).isoformat()
+                else:
+                    print(f"⚠️  Не удалось получить подписку для ключа {key_hash}: HTTP {response.status_code}")
+
+            except Exception as e:
+                print(f"⚠️  Ошибка синхронизации квоты {key_hash}: {e}")
+
+            remaining[key_hash] = self.get_elevenlabs_remaining(key)
+
+        self._save_key_status()
+
+        return remaining
+
     async def _human_like_delay(self):
         """Человекоподобная задержка между запросами"""
         delay = random.uniform(
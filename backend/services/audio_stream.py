@@ -0,0 +1,374 @@
+"""
+Потоковая обработка аудио для длинных озвучек
+Обрезка пауз, нормализация громкости и fade окнами фиксированного размера:
+WAV на диске читается через numpy.memmap, пиковая память не зависит от длительности
+"""
+
+import os
+import struct
+import subprocess
+import tempfile
+import wave
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class AudioStreamError(Exception):
+    """Ошибка потоковой обработки аудио"""
+    pass
+
+
+class StreamingAudioProcessor:
+    """
+    Потоковый аналог обработки pydub в VoiceManager
+
+    Два прохода по файлу окнами window_ms:
+    1. Анализ: RMS кадров по frame_ms, поиск длинных пауз и энергии речи
+    2. Рендер: склейка речевых участков с короткими паузами, усиление, fade
+
+    В памяти одновременно только одно окно (плюс список диапазонов речи).
+    Поддерживается 16-bit PCM WAV; MP3 декодируется/кодируется через ffmpeg.
+    """
+
+    def __init__(self, window_ms: int = 1000, frame_ms: int = 10):
+        """
+        Args:
+            window_ms: Размер окна чтения/записи (мс)
+            frame_ms: Шаг анализа тишины (мс), как seek_step в pydub
+        """
+        self.window_ms = window_ms
+        self.frame_ms = frame_ms
+
+    def process_file(
+        self,
+        input_path: str,
+        output_path: str,
+        remove_silence: bool = True,
+        normalize_volume: bool = True,
+        silence_thresh: int = -40,
+        min_silence_len: int = 500,
+        keep_silence: int = 200,
+        target_dBFS: float = -20.0,
+        fade_ms: int = 100,
+        bitrate: str = "192k"
+    ) -> float:
+        """
+        Обрабатывает аудио файл любого формата (через ffmpeg)
+
+        Args:
+            input_path: Исходный файл (mp3/wav)
+            output_path: Результат (mp3/wav по расширению)
+            remove_silence: Обрезать длинные паузы
+            normalize_volume: Нормализовать громкость
+            silence_thresh: Порог тишины в dBFS
+            min_silence_len: Минимальная длина паузы для обрезки (мс)
+            keep_silence: Сколько тишины оставлять между фрагментами (мс)
+            target_dBFS: Целевая громкость
+            fade_ms: Длительность fade in/out (мс)
+            bitrate: Битрейт MP3 на выходе
+
+        Returns:
+            Длительность результата в секундах
+        """
+
+        temp_files = []
+
+        try:
+            if input_path.lower().endswith('.wav'):
+                in_wav = input_path
+            else:
+                in_wav = self._temp_wav(temp_files)
+                self._run_ffmpeg(['-i', input_path, '-acodec', 'pcm_s16le', '-f', 'wav', in_wav])
+
+            if output_path.lower().endswith('.wav'):
+                out_wav = output_path
+            else:
+                out_wav = self._temp_wav(temp_files)
+
+            duration = self.process_wav(
+                in_wav, out_wav,
+                remove_silence=remove_silence,
+                normalize_volume=normalize_volume,
+                silence_thresh=silence_thresh,
+                min_silence_len=min_silence_len,
+                keep_silence=keep_silence,
+                target_dBFS=target_dBFS,
+                fade_ms=fade_ms
+            )
+
+            if out_wav != output_path:
+                self._run_ffmpeg(['-i', out_wav, '-codec:a', 'libmp3lame', '-b:a', bitrate, output_path])
+
+            return duration
+
+        finally:
+            for path in temp_files:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def process_wav(
+        self,
+        input_path: str,
+        output_path: str,
+        remove_silence: bool = True,
+        normalize_volume: bool = True,
+        silence_thresh: int = -40,
+        min_silence_len: int = 500,
+        keep_silence: int = 200,
+        target_dBFS: float = -20.0,
+        fade_ms: int = 100
+    ) -> float:
+        """
+        Обрабатывает 16-bit PCM WAV окнами фиксированного размера
+
+        Returns:
+            Длительность результата в секундах
+        """
+
+        channels, sample_rate, data_offset, n_frames = read_wav_header(input_path)
+
+        frame_len = max(1, sample_rate * self.frame_ms // 1000)
+        keep_frames = sample_rate * keep_silence // 1000
+
+        # ПРОХОД 1: анализ
+        ranges, sum_squares = self._analyze(
+            input_path, channels, sample_rate, data_offset, n_frames,
+            frame_len, silence_thresh, min_silence_len, remove_silence
+        )
+
+        if not ranges:
+            # Всё тихое - оставляем как есть (как _remove_long_silences)
+            ranges = [(0, n_frames)]
+            sum_squares = self._total_energy(input_path, channels, sample_rate, data_offset, n_frames)
+            keep_frames = 0
+
+        out_frames = sum(end - start for start, end in ranges) + keep_frames * (len(ranges) - 1)
+
+        # Усиление для нормализации (dBFS считаем по результату, с паузами)
+        gain = 1.0
+        if normalize_volume and out_frames > 0 and sum_squares > 0:
+            rms = np.sqrt(sum_squares / (out_frames * channels))
+            current_dBFS = 20 * np.log10(rms / 32768.0)
+            gain = 10 ** ((target_dBFS - current_dBFS) / 20)
+
+        # ПРОХОД 2: рендер
+        fade_frames = min(sample_rate * fade_ms // 1000, out_frames // 2)
+
+        with wave.open(output_path, 'wb') as out:
+            out.setnchannels(channels)
+            out.setsampwidth(2)
+            out.setframerate(sample_rate)
+
+            written = 0
+            silence_window = np.zeros(keep_frames * channels, dtype='<i2')
+
+            for i, (start, end) in enumerate(ranges):
+                if i > 0 and keep_frames:
+                    out.writeframes(silence_window.tobytes())
+                    written += keep_frames
+
+                for window_start, samples in self._iter_windows(
+                    input_path, channels, sample_rate, data_offset, start, end
+                ):
+                    window = samples.astype(np.float32) * gain
+                    count = window.shape[0]
+
+                    self._apply_fades(window, written, count, out_frames, fade_frames)
+
+                    np.clip(window, -32768, 32767, out=window)
+                    out.writeframes(window.astype('<i2').tobytes())
+                    written += count
+
+        return out_frames / sample_rate
+
+    def _analyze(
+        self,
+        path: str,
+        channels: int,
+        sample_rate: int,
+        data_offset: int,
+        n_frames: int,
+        frame_len: int,
+        silence_thresh: int,
+        min_silence_len: int,
+        remove_silence: bool
+    ) -> Tuple[List[Tuple[int, int]], float]:
+        """
+        Находит речевые диапазоны (в сэмплах) и их суммарную энергию
+
+        Пауза = подряд идущие кадры с RMS ниже порога длиной >= min_silence_len.
+        Энергия короткой паузы учитывается вместе с речью, длинной - отбрасывается.
+        """
+
+        if not remove_silence:
+            return [(0, n_frames)], self._total_energy(path, channels, sample_rate, data_offset, n_frames)
+
+        thresh_rms = 32768.0 * 10 ** (silence_thresh / 20)
+        min_silent_frames = max(1, min_silence_len // self.frame_ms)
+
+        ranges = []
+        sum_squares = 0.0
+
+        speech_start = None      # начало текущего речевого диапазона (сэмпл)
+        silent_start = None      # начало текущей серии тихих кадров (сэмпл)
+        silent_count = 0         # длина серии тихих кадров
+        silent_energy = 0.0      # энергия серии (пока она короче min_silence_len)
+
+        for window_start, samples in self._iter_windows(path, channels, sample_rate, data_offset, 0, n_frames):
+            data = samples.astype(np.float64)
+            count = data.shape[0]
+
+            for frame_start in range(0, count, frame_len):
+                frame = data[frame_start:frame_start + frame_len]
+                position = window_start + frame_start
+                energy = float(np.dot(frame.ravel(), frame.ravel()))
+                rms = np.sqrt(energy / frame.size)
+
+                if rms < thresh_rms:
+                    if silent_count == 0:
+                        silent_start = position
+                        silent_energy = 0.0
+                    silent_count += 1
+                    silent_energy += energy
+
+                    # Пауза стала длинной - закрываем речевой диапазон
+                    if silent_count == min_silent_frames and speech_start is not None:
+                        ranges.append((speech_start, silent_start))
+                        speech_start = None
+                    continue
+
+                # Речевой кадр
+                if silent_count:
+                    if silent_count < min_silent_frames:
+                        # Короткая пауза остаётся частью речи
+                        sum_squares += silent_energy
+                        if speech_start is None:
+                            speech_start = silent_start
+                    silent_count = 0
+
+                if speech_start is None:
+                    speech_start = position
+                sum_squares += energy
+
+        # Хвост: короткая пауза в конце остаётся частью речи
+        if speech_start is not None:
+            if silent_count:
+                sum_squares += silent_energy
+            ranges.append((speech_start, n_frames))
+
+        return ranges, sum_squares
+
+    def _total_energy(self, path: str, channels: int, sample_rate: int, data_offset: int, n_frames: int) -> float:
+        """Сумма квадратов всех сэмплов файла"""
+        total = 0.0
+        for _, samples in self._iter_windows(path, channels, sample_rate, data_offset, 0, n_frames):
+            data = samples.astype(np.float64).ravel()
+            total += float(np.dot(data, data))
+        return total
+
+    def _iter_windows(
+        self,
+        path: str,
+        channels: int,
+        sample_rate: int,
+        data_offset: int,
+        start: int,
+        end: int
+    ):
+        """
+        Читает диапазон сэмплов [start, end) окнами через numpy.memmap
+
+        Каждое окно отображается отдельно и освобождается после обработки,
+        поэтому в RSS не накапливаются страницы уже прочитанного файла.
+
+        Yields:
+            (номер первого сэмпла окна, массив shape=(n, channels))
+        """
+        window_frames = max(1, sample_rate * self.window_ms // 1000)
+        frame_bytes = 2 * channels
+
+        position = start
+        while position < end:
+            count = min(window_frames, end - position)
+            mapped = np.memmap(
+                path, dtype='<i2', mode='r',
+                offset=data_offset + position * frame_bytes,
+                shape=(count * channels,)
+            )
+            try:
+                yield position, np.array(mapped).reshape(count, channels)
+            finally:
+                del mapped
+            position += count
+
+    def _apply_fades(self, window: np.ndarray, written: int, count: int, total: int, fade_frames: int):
+        """Линейный fade in/out по абсолютной позиции окна в результате"""
+        if fade_frames <= 0:
+            return
+
+        positions = np.arange(written, written + count)
+
+        fade_in = positions < fade_frames
+        if fade_in.any():
+            window[fade_in] *= (positions[fade_in] / fade_frames)[:, None]
+
+        fade_out = positions >= total - fade_frames
+        if fade_out.any():
+            window[fade_out] *= ((total - positions[fade_out]) / fade_frames)[:, None]
+
+    def _temp_wav(self, temp_files: List[str]) -> str:
+        fd, path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        temp_files.append(path)
+        return path
+
+    def _run_ffmpeg(self, args: List[str]):
+        """Запускает ffmpeg (потоково, без загрузки аудио в Python)"""
+        try:
+            subprocess.run(['ffmpeg', '-y', '-v', 'error'] + args, check=True, capture_output=True)
+        except FileNotFoundError:
+            raise AudioStreamError("ffmpeg не найден! Установите: brew install ffmpeg")
+        except subprocess.CalledProcessError as e:
+            raise AudioStreamError(f"ffmpeg error: {e.stderr.decode(errors='ignore')[:300]}")
+
+
+def read_wav_header(path: str) -> Tuple[int, int, int, int]:
+    """
+    Читает заголовок 16-bit PCM WAV без загрузки данных
+
+    Returns:
+        (каналы, частота, смещение блока data в байтах, количество сэмплов)
+    """
+    with open(path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise AudioStreamError(f"Не WAV файл: {path}")
+
+        channels = sample_rate = bits = None
+        file_size = os.path.getsize(path)
+
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise AudioStreamError(f"Блок data не найден: {path}")
+
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                _, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                if chunk_size % 2:
+                    f.seek(1, 1)
+            elif chunk_id == b'data':
+                if channels is None:
+                    raise AudioStreamError(f"Блок fmt отсутствует: {path}")
+                if bits != 16:
+                    raise AudioStreamError(f"Поддерживается только 16-bit PCM, получено {bits}-bit")
+
+                data_offset = f.tell()
+                # ffmpeg при записи в pipe ставит размер 0xFFFFFFFF - берём по файлу
+                data_size = min(chunk_size, file_size - data_offset)
+                return channels, sample_rate, data_offset, data_size // (2 * channels)
+            else:
+                f.seek(chunk_size + chunk_size % 2, 1)
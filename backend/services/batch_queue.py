@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import List, Dict, Callable, Optional
 from enum import Enum
 
+from services.ollama_session import get_ollama_session
+
 
 class VideoStatus(Enum):
     PENDING = "pending"
@@ -50,7 +52,8 @@ class BatchQueue:
         topic: str,
         style: str,
         voice: str,
-        subtitle_style: str = "highlighted_words"
+        subtitle_style: str = "highlighted_words",
+        renderer: str = "remotion"
     ) -> str:
         """Добавляет видео в очередь"""
 
@@ -63,6 +66,7 @@ class BatchQueue:
             'style': style,
             'voice': voice,
             'subtitle_style': subtitle_style,
+            'renderer': renderer,
             'status': VideoStatus.PENDING.value,
             'created_at': datetime.now().isoformat(),
             'started_at': None,
@@ -116,18 +120,45 @@ class BatchQueue:
         print(f"👷 Воркеров: {parallel_workers}")
         print(f"=" * 80)
 
-        # Создаём воркеры
-        tasks = []
-        for i in range(parallel_workers):
-            task = asyncio.create_task(self._worker(i + 1))
-            tasks.append(task)
+        # Пока идёт батч, Ollama не выгружает модель между видео
+        with get_ollama_session().batch():
+            await self._prefetch_scripts(pending_videos)
+
+            # Создаём воркеры
+            tasks = []
+            for i in range(parallel_workers):
+                task = asyncio.create_task(self._worker(i + 1))
+                tasks.append(task)
 
-        # Ждём завершения всех воркеров
-        await asyncio.gather(*tasks)
+            # Ждём завершения всех воркеров
+            await asyncio.gather(*tasks)
 
         # Финальная статистика
         self._print_final_stats()
 
+    async def _prefetch_scripts(self, videos: List[Dict]):
+        """
+        Заранее генерирует сценарии всей очереди пакетными запросами
+
+        Сценарии попадают в кэш ScriptGenerator, и create_full_video
+        берёт их оттуда вместо отдельного запроса к LLM на каждое видео.
+        Ошибки не критичны - видео без сценария сгенерирует его само.
+        """
+        script_generator = getattr(self.orchestrator, 'script_generator', None)
+        if not script_generator or not getattr(script_generator, 'script_cache', None) or len(videos) < 2:
+            return
+
+        print(f"\n📝 Предварительная генерация сценариев ({len(videos)})...")
+
+        try:
+            await script_generator.generate_scripts_batch(
+                [video['topic'] for video in videos],
+                target_length=self.orchestrator.SCRIPT_TARGET_LENGTH,
+                language='ru'
+            )
+        except Exception as e:
+            print(f"⚠️  Предварительная генерация не удалась: {e}")
+
     async def _worker(self, worker_id: int):
         """Воркер для обработки видео"""
 
@@ -154,6 +185,7 @@ class BatchQueue:
                     style=video_task['style'],
                     voice=video_task['voice'],
                     subtitle_style=video_task['subtitle_style'],
+                    renderer=video_task.get('renderer', 'remotion'),
                     on_progress=lambda status: self._update_video_status(video_task['id'], status)
                 )
 
@@ -0,0 +1,259 @@
+"""
+Cancellation - отмена задачи генерации
+Токен отмены живёт в contextvars: его видят корутины задачи, рендереры
+и их потоки. Отмена снимает корутину, убивает группы процессов рендера
+(npx remotion, Chromium, ffmpeg) и вызывает зарегистрированные callbacks
+(прерывание HTTP-рендера на сервере и т.п.).
+"""
+
+import asyncio
+import contextvars
+import os
+import signal
+import subprocess
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+
+class TaskCancelledError(Exception):
+    """Задача отменена пользователем"""
+    pass
+
+
+class CancelToken:
+    """
+    Токен отмены одной задачи
+
+    Возможности:
+    - Процессы рендера регистрируются и при отмене убиваются всей группой
+    - Callbacks отмены (снять корутину, прервать рендер на сервере)
+    - check() - точка отмены для синхронного кода
+    """
+
+    def __init__(self, kill_timeout: float = 5.0):
+        """
+        Args:
+            kill_timeout: Сколько секунд ждать после SIGTERM перед SIGKILL
+        """
+        self.kill_timeout = kill_timeout
+
+        self._event = threading.Event()
+        self._processes: List[subprocess.Popen] = []
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self):
+        """
+        Raises:
+            TaskCancelledError: Задача уже отменена
+        """
+        if self.cancelled:
+            raise TaskCancelledError("Задача отменена")
+
+    def cancel(self) -> bool:
+        """
+        Отменяет задачу: callbacks, затем группы процессов
+
+        Returns:
+            False, если задача уже была отменена
+        """
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._event.set()
+            callbacks = list(self._callbacks)
+            processes = list(self._processes)
+
+        print(f"⏹️  Отмена задачи: {len(processes)} процессов рендера")
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"   ⚠️  Callback отмены: {e}")
+
+        for process in processes:
+            kill_process_group(process, self.kill_timeout)
+
+        return True
+
+    def add_callback(self, callback: Callable[[], None]):
+        """Callback при отмене (если задача уже отменена - вызывается сразу)"""
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def add_process(self, process: subprocess.Popen):
+        """Процесс (лидер своей группы) будет убит при отмене"""
+        with self._lock:
+            if not self.cancelled:
+                self._processes.append(process)
+                return
+        kill_process_group(process, self.kill_timeout)
+
+    def remove_process(self, process: subprocess.Popen):
+        with self._lock:
+            if process in self._processes:
+                self._processes.remove(process)
+
+
+_current_token: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar(
+    'cancel_token', default=None
+)
+
+
+def current_token() -> Optional[CancelToken]:
+    """Токен отмены текущей задачи (None вне задачи)"""
+    return _current_token.get()
+
+
+@contextmanager
+def cancel_scope(token: CancelToken):
+    """Код внутри блока (и созданные в нём корутины) отменяются через token"""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def run_cancellable(loop: asyncio.AbstractEventLoop, coro, token: CancelToken):
+    """
+    Выполняет корутину задачи в loop с токеном отмены
+
+    token.cancel() из другого потока снимает корутину (await HTTP-запросов
+    прерываются), синхронный рендер прерывается через убийство процессов.
+
+    Raises:
+        TaskCancelledError: Задача отменена
+    """
+    with cancel_scope(token):
+        # Задача копирует контекст при создании - токен виден всему пайплайну
+        task = loop.create_task(coro)
+
+    def cancel_task():
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(task.cancel)
+
+    token.add_callback(cancel_task)
+    try:
+        return loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        raise TaskCancelledError("Задача отменена")
+    finally:
+        token.remove_callback(cancel_task)
+
+
+def kill_process_group(process: subprocess.Popen, timeout: float = 5.0):
+    """
+    Останавливает процесс вместе с его группой (дочерние Chromium, ffmpeg):
+    SIGTERM, через timeout секунд - SIGKILL. После выхода лидера оставшиеся
+    в группе процессы добиваются SIGKILL
+
+    Процесс должен быть запущен с start_new_session=True
+    """
+    if process.poll() is not None:
+        return
+
+    if not hasattr(os, 'killpg'):
+        process.kill()
+        return
+
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            pass
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def run_process(
+    cmd: List[str],
+    cwd=None,
+    timeout: float = 600,
+    on_line: Optional[Callable[[str], None]] = None
+) -> subprocess.CompletedProcess:
+    """
+    Запуск процесса рендера, который можно отменить
+
+    Вне задачи и без on_line - обычный subprocess.run с capture_output.
+    Иначе процесс запускается в своей группе и регистрируется в токене
+    отмены. С on_line stdout и stderr читаются одним потоком построчно
+    (\\r тоже конец строки), хвост вывода попадает в stdout и stderr результата.
+
+    Raises:
+        TaskCancelledError: Задача отменена (процесс убит)
+        subprocess.TimeoutExpired: Процесс не уложился в timeout
+        FileNotFoundError: Нет исполняемого файла
+    """
+    token = current_token()
+
+    if token is None and on_line is None:
+        return subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, timeout=timeout)
+
+    if token:
+        token.check()
+
+    process = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT if on_line else subprocess.PIPE,
+        text=True,
+        bufsize=1,
+        start_new_session=True
+    )
+
+    if token:
+        token.add_process(process)
+
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        kill_process_group(process, timeout=1.0)
+
+    timer = threading.Timer(timeout, kill)
+    timer.daemon = True
+    timer.start()
+
+    try:
+        if on_line:
+            output = deque(maxlen=200)
+            try:
+                for line in process.stdout:
+                    output.append(line)
+                    on_line(line)
+                process.wait()
+            finally:
+                process.stdout.close()
+            stdout = stderr = ''.join(output)
+        else:
+            stdout, stderr = process.communicate()
+    finally:
+        timer.cancel()
+        if token:
+            token.remove_process(process)
+
+    if token:
+        token.check()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
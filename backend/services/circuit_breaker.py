@@ -0,0 +1,225 @@
+"""
+Circuit Breaker - автоматические предохранители для LLM провайдеров
+Провайдер/модель, которые падают подряд, временно исключаются из цепочки,
+чтобы каждая генерация не ждала их таймауты заново
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional
+
+
+class CircuitBreaker:
+    """
+    Предохранитель одного провайдера/модели
+
+    Состояния:
+    - closed: запросы идут как обычно, считаем ошибки подряд
+    - open: после failure_threshold ошибок - пропускаем до конца cooldown
+    - half_open: cooldown истёк - пропускаем ОДИН пробный запрос;
+      успех → closed, ошибка → снова open с удвоенным cooldown
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        cooldown: float = 300,
+        max_cooldown: float = 3600,
+        on_change=None
+    ):
+        """
+        Args:
+            name: Идентификатор ('groq:llama-3.1-70b-versatile')
+            failure_threshold: Ошибок подряд до размыкания
+            cooldown: Базовое время размыкания (сек)
+            max_cooldown: Максимальное время размыкания (сек)
+            on_change: Callback при смене состояния (для сохранения)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.on_change = on_change
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.last_error = None
+
+        # Пробный запрос в half_open уже выполняется (только в памяти)
+        self._trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Можно ли отправлять запрос сейчас"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if time.time() < self.opened_at + self.cooldown:
+                return False
+            self._set_state(self.HALF_OPEN)
+
+        # HALF_OPEN: только один пробный запрос одновременно
+        if self._trial_in_flight:
+            return False
+
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        """Запрос успешен - замыкаем"""
+        self._trial_in_flight = False
+        changed = self.state != self.CLOSED or self.failures > 0
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self.last_error = None
+
+        if changed and self.on_change:
+            self.on_change()
+
+    def record_failure(self, error: Optional[Exception] = None):
+        """Запрос упал - считаем и при необходимости размыкаем"""
+        self._trial_in_flight = False
+        self.failures += 1
+        self.last_error = str(error)[:200] if error else None
+
+        if self.state == self.HALF_OPEN:
+            # Пробный запрос не прошёл - размыкаем надольше
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+        elif self.on_change:
+            self.on_change()
+
+    def record_cancelled(self):
+        """Запрос отменён (проиграл гонку) - не успех и не ошибка"""
+        self._trial_in_flight = False
+
+    def seconds_until_retry(self) -> int:
+        """Сколько секунд осталось до пробного запроса (0 - если не open)"""
+        if self.state != self.OPEN:
+            return 0
+        return max(0, int(self.opened_at + self.cooldown - time.time()))
+
+    def _open(self):
+        self.opened_at = time.time()
+        self._set_state(self.OPEN)
+        print(f"   🔌 Circuit {self.name}: OPEN на {int(self.cooldown)}s ({self.failures} ошибок подряд)")
+
+    def _set_state(self, state: str):
+        self.state = state
+        if self.on_change:
+            self.on_change()
+
+    def to_dict(self) -> Dict:
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'cooldown': self.cooldown,
+            'opened_at': self.opened_at,
+            'last_error': self.last_error
+        }
+
+    def load(self, data: Dict):
+        self.state = data.get('state', self.CLOSED)
+        self.failures = data.get('failures', 0)
+        self.cooldown = data.get('cooldown', self.base_cooldown)
+        self.opened_at = data.get('opened_at', 0.0)
+        self.last_error = data.get('last_error')
+
+        # Пробный запрос прерванного процесса не завершился - начинаем заново
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+
+class CircuitBreakerRegistry:
+    """
+    Набор предохранителей с сохранением состояния между запусками
+
+    Состояние хранится в JSON (как статусы ключей в SafeAPIManager),
+    поэтому перезапуск сервера или батча не «забывает» упавших провайдеров.
+    """
+
+    def __init__(
+        self,
+        state_file: str = ".circuit_breakers.json",
+        failure_threshold: int = 3,
+        cooldown: float = 300,
+        max_cooldown: float = 3600
+    ):
+        """
+        Args:
+            state_file: Файл состояния
+            failure_threshold: Ошибок подряд до размыкания
+            cooldown: Базовое время размыкания (сек)
+            max_cooldown: Максимальное время размыкания (сек)
+        """
+        self.state_file = state_file
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._saved_state = self._load_state()
+
+    def get(self, name: str) -> CircuitBreaker:
+        """Предохранитель для провайдера/модели (создаётся при первом обращении)"""
+        if name not in self.breakers:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=self.failure_threshold,
+                cooldown=self.cooldown,
+                max_cooldown=self.max_cooldown,
+                on_change=self._save_state
+            )
+            if name in self._saved_state:
+                breaker.load(self._saved_state[name])
+            self.breakers[name] = breaker
+
+        return self.breakers[name]
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Состояние всех известных предохранителей"""
+        status = dict(self._saved_state)
+        for name, breaker in self.breakers.items():
+            status[name] = breaker.to_dict()
+            status[name]['retry_in'] = breaker.seconds_until_retry()
+        return status
+
+    def reset(self, name: Optional[str] = None):
+        """Ручное замыкание одного или всех предохранителей"""
+        names = [name] if name else list(set(self.breakers) | set(self._saved_state))
+        for breaker_name in names:
+            self.get(breaker_name).record_success()
+        self._save_state()
+
+    def _load_state(self) -> Dict:
+        """Загружает сохранённое состояние"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def _save_state(self):
+        """Сохраняет состояние всех предохранителей"""
+        for name, breaker in self.breakers.items():
+            self._saved_state[name] = breaker.to_dict()
+
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump(self._saved_state, f, indent=2)
+        except Exception as e:
+            print(f"⚠️  Ошибка сохранения circuit breakers: {e}")
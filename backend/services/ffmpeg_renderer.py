@@ -0,0 +1,360 @@
+"""
+FFmpeg Video Renderer
+Ken Burns рендер без браузера: zoompan по effect_params, xfade переходы, ASS субтитры
+"""
+
+import os
+import subprocess
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.cancellation import run_process
+from services.ken_burns import EffectType, KenBurnsEffect
+from services.render_progress import RenderProgress, count_frames, parse_ffmpeg_line, run_with_progress
+from services.subtitle_gen import SubtitleGenerator
+
+
+class FFmpegRenderer:
+    """
+    Рендер видео одним процессом ffmpeg
+
+    Интерфейс как у RemotionRenderer (те же сцены: imagePath, duration,
+    effect, effectParams, subtitle), но без Node, сборки webpack и Chromium:
+    сцены - неподвижные изображения, поэтому zoompan/xfade/ass в ffmpeg дают
+    ту же картинку на порядок быстрее на CPU.
+    """
+
+    # Плавность движения как в KenBurnsScene.tsx (easeInOutCubic), P - прогресс 0..1
+    EASING = 'if(lt(P,0.5),4*P*P*P,1-pow(2-2*P,3)/2)'
+
+    def __init__(
+        self,
+        transition: float = 0.5,
+        subtitle_style: str = 'highlighted_words',
+        preset: str = 'veryfast',
+        crf: int = 20,
+        supersample: int = 2,
+        timeout: int = 1800
+    ):
+        """
+        Args:
+            transition: Длительность fade между сценами (сек), 0 - склейка встык
+            subtitle_style: Стиль субтитров SubtitleGenerator
+            preset: Пресет x264
+            crf: Качество x264 (меньше - лучше)
+            supersample: Во сколько раз увеличивать кадр перед zoompan
+                (zoompan округляет координаты до пикселя - без запаса движение дрожит)
+            timeout: Максимальное время рендера (сек)
+        """
+        self.transition = transition
+        self.subtitle_style = subtitle_style
+        self.preset = preset
+        self.crf = crf
+        self.supersample = supersample
+        self.timeout = timeout
+
+        self.ken_burns = KenBurnsEffect()
+
+    def render_video(
+        self,
+        scenes: List[Dict],
+        audio_path: Optional[str] = None,
+        output_path: str = 'output.mp4',
+        fps: int = 30,
+        width: int = 1920,
+        height: int = 1080,
+        on_progress: Optional[Callable[[Dict], None]] = None
+    ) -> str:
+        """
+        Рендер видео
+
+        Args:
+            scenes: Список сцен с изображениями и эффектами
+            audio_path: Путь к аудио файлу
+            output_path: Путь для сохранения видео
+            fps: FPS видео
+            width: Ширина видео
+            height: Высота видео
+            on_progress: Callback прогресса рендера (кадры, fps, ETA - см. RenderProgress)
+
+        Returns:
+            Путь к готовому видео
+        """
+
+        print(f"\n{'=' * 80}")
+        print("🎬 FFMPEG RENDERER - KEN BURNS БЕЗ БРАУЗЕРА")
+        print(f"{'=' * 80}")
+        print(f"Сцен: {len(scenes)}")
+        print(f"FPS: {fps}")
+        print(f"Разрешение: {width}x{height}")
+
+        if not scenes:
+            raise RuntimeError("Нет сцен для рендера")
+
+        output_abs_path = Path(output_path).absolute()
+        output_abs_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Уникальное имя: параллельные рендеры в одну папку не затрут субтитры друг друга
+        subtitles_path = self.write_subtitles(
+            scenes, output_abs_path.parent / f"subtitles_{uuid.uuid4().hex[:8]}.ass", fps, width, height
+        )
+
+        cmd = self.build_command(scenes, audio_path, str(output_abs_path), fps, width, height, subtitles_path)
+
+        print("\n🎬 Запускаю рендер...")
+
+        progress = RenderProgress(count_frames(scenes, fps), on_progress) if on_progress else None
+
+        try:
+            result = run_with_progress(
+                cmd, parse_ffmpeg_line, progress,
+                cwd=output_abs_path.parent,
+                timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Рендер превысил таймаут ({self.timeout // 60} минут)")
+        except FileNotFoundError:
+            raise RuntimeError("FFmpeg не найден! Установите: brew install ffmpeg")
+        finally:
+            if subtitles_path:
+                Path(subtitles_path).unlink(missing_ok=True)
+
+        if result.returncode != 0:
+            print(f"\n❌ ОШИБКА РЕНДЕРА:")
+            print(result.stderr[-2000:])
+            raise RuntimeError(f"FFmpeg render failed: {result.stderr[-2000:]}")
+
+        print(f"\n✅ Видео готово: {output_abs_path}")
+        return str(output_abs_path)
+
+    def build_command(
+        self,
+        scenes: List[Dict],
+        audio_path: Optional[str],
+        output_path: str,
+        fps: int = 30,
+        width: int = 1920,
+        height: int = 1080,
+        subtitles_path: Optional[str] = None
+    ) -> List[str]:
+        """
+        Команда ffmpeg: по входу на изображение, zoompan на каждую сцену,
+        цепочка xfade, прожиг ASS и аудио дорожка
+
+        Файл субтитров передаётся фильтру по имени, без пути (экранирование путей
+        в filtergraph зависит от платформы) - команду запускают из его папки.
+        Остальные пути приводятся к абсолютным.
+
+        Returns:
+            Аргументы для subprocess
+        """
+        frames, offsets, transition_frames = self._timeline(scenes, fps)
+
+        # Прогресс рендера (frame=N) - блоками key=value в stdout
+        cmd = ['ffmpeg', '-y', '-v', 'error', '-progress', 'pipe:1', '-nostats']
+        for scene in scenes:
+            cmd += ['-i', str(Path(scene['imagePath']).absolute())]
+        if audio_path:
+            cmd += ['-i', str(Path(audio_path).absolute())]
+
+        filters = [
+            self._scene_filter(i, scene, scene_frames, fps, width, height)
+            for i, (scene, scene_frames) in enumerate(zip(scenes, frames))
+        ]
+
+        label = '[v0]'
+        if transition_frames:
+            transition = transition_frames / fps
+            for i in range(1, len(scenes)):
+                filters.append(
+                    f"{label}[v{i}]xfade=transition=fade:duration={transition:.3f}:"
+                    f"offset={offsets[i] / fps:.3f}[x{i}]"
+                )
+                label = f'[x{i}]'
+        elif len(scenes) > 1:
+            inputs = ''.join(f'[v{i}]' for i in range(len(scenes)))
+            filters.append(f"{inputs}concat=n={len(scenes)}:v=1:a=0[joined]")
+            label = '[joined]'
+
+        if subtitles_path:
+            filters.append(f"{label}ass={Path(subtitles_path).name}[vout]")
+        else:
+            filters.append(f"{label}null[vout]")
+
+        cmd += ['-filter_complex', ';'.join(filters), '-map', '[vout]']
+
+        if audio_path:
+            cmd += ['-map', f'{len(scenes)}:a', '-c:a', 'aac', '-b:a', '192k', '-shortest']
+
+        cmd += [
+            '-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf),
+            '-pix_fmt', 'yuv420p', '-r', str(fps),
+            '-movflags', '+faststart',
+            str(Path(output_path).absolute())
+        ]
+
+        return cmd
+
+    def burn_subtitles(
+        self,
+        scenes: List[Dict],
+        video_path: str,
+        output_path: str,
+        fps: int = 30,
+        width: int = 1920,
+        height: int = 1080
+    ) -> str:
+        """
+        Прожиг субтитров сцен в готовое видео (фильтр ass, звук копируется)
+
+        Для рендереров, которые рисуют только картинку (RemotionRenderer
+        с subtitles='ass'): текст растеризует libass, а не браузер на каждом кадре.
+
+        Returns:
+            Путь к видео с субтитрами
+
+        Raises:
+            RuntimeError: ffmpeg завершился с ошибкой
+        """
+        output_abs_path = Path(output_path).absolute()
+        subtitles_path = self.write_subtitles(
+            scenes, output_abs_path.parent / f"subtitles_{uuid.uuid4().hex[:8]}.ass", fps, width, height
+        )
+
+        if not subtitles_path:
+            os.replace(video_path, output_abs_path)
+            return str(output_abs_path)
+
+        print(f"\n📝 Прожиг субтитров ({self.subtitle_style})...")
+
+        cmd = [
+            'ffmpeg', '-y', '-v', 'error',
+            '-i', str(Path(video_path).absolute()),
+            '-vf', f"ass={Path(subtitles_path).name}",
+            '-map', '0',
+            '-c:v', 'libx264', '-preset', self.preset, '-crf', str(self.crf),
+            '-pix_fmt', 'yuv420p', '-c:a', 'copy',
+            '-movflags', '+faststart',
+            str(output_abs_path)
+        ]
+
+        try:
+            result = run_process(cmd, cwd=output_abs_path.parent, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Прожиг субтитров превысил таймаут ({self.timeout // 60} минут)")
+        finally:
+            Path(subtitles_path).unlink(missing_ok=True)
+
+        if result.returncode != 0:
+            raise RuntimeError(f"Прожиг субтитров не удался: {result.stderr[-2000:]}")
+
+        return str(output_abs_path)
+
+    def write_subtitles(
+        self,
+        scenes: List[Dict],
+        output_path: Path,
+        fps: int = 30,
+        width: int = 1920,
+        height: int = 1080
+    ) -> Optional[str]:
+        """
+        ASS файл из субтитров сцен (время субтитра в сцене -> время в видео)
+
+        Returns:
+            Путь к файлу или None, если субтитров нет
+        """
+        _, offsets, _ = self._timeline(scenes, fps)
+        cues = []
+
+        for scene, offset in zip(scenes, offsets):
+            subtitle = scene.get('subtitle')
+            if not subtitle or not subtitle.get('text'):
+                continue
+
+            scene_start = offset / fps
+            cues.append({
+                'start': scene_start + subtitle.get('startTime', 0),
+                'end': scene_start + subtitle.get('endTime', scene['duration']),
+                'text': subtitle['text'],
+                'highlighted': subtitle.get('highlighted', False)
+            })
+
+        if not cues:
+            return None
+
+        SubtitleGenerator().generate_ass(cues, width, height, self.subtitle_style, str(output_path))
+        return str(output_path)
+
+    def _timeline(self, scenes: List[Dict], fps: int) -> Tuple[List[int], List[int], int]:
+        """
+        Кадры каждого клипа, кадр начала каждой сцены и длина перехода (в кадрах)
+
+        Переход начинается в момент начала сцены (как fade in в Video.tsx),
+        поэтому каждый клип, кроме последнего, длиннее своей сцены на переход -
+        общая длина совпадает с суммой длительностей и не расходится с аудио.
+        """
+        durations = [max(1, round(scene['duration'] * fps)) for scene in scenes]
+
+        transition_frames = 0
+        if len(scenes) > 1 and self.transition > 0:
+            # Переход не длиннее половины самой короткой сцены
+            transition_frames = min(round(self.transition * fps), min(durations) // 2)
+
+        frames = [
+            duration + (transition_frames if i < len(scenes) - 1 else 0)
+            for i, duration in enumerate(durations)
+        ]
+
+        offsets = [0]
+        for duration in durations[:-1]:
+            offsets.append(offsets[-1] + duration)
+
+        return frames, offsets, transition_frames
+
+    def _scene_filter(self, index: int, scene: Dict, frames: int, fps: int, width: int, height: int) -> str:
+        """
+        Ken Burns одной сцены: кадрирование под формат, zoompan по effect_params, грейдинг
+
+        effect_params: start/end_scale - масштаб, start/end_position - центр окна (0..1)
+        """
+        params = self._effect_params(scene)
+        (start_x, start_y), (end_x, end_y) = params['start_position'], params['end_position']
+
+        progress = self.EASING.replace('P', f'(on/{max(frames - 1, 1)})')
+
+        zoom = f"{params['start_scale']}+({params['end_scale'] - params['start_scale']:g})*{progress}"
+        center_x = f"{start_x}+({end_x - start_x:g})*{progress}"
+        center_y = f"{start_y}+({end_y - start_y:g})*{progress}"
+
+        # Окно iw/zoom с центром в center, не выходящее за кадр
+        x = f"max(0,min(iw-iw/zoom,iw*({center_x})-iw/zoom/2))"
+        y = f"max(0,min(ih-ih/zoom,ih*({center_y})-ih/zoom/2))"
+
+        big_w, big_h = width * self.supersample, height * self.supersample
+
+        # Первая сцена клипа из середины видео (рендер по сценам, сегменты) -
+        # fade in из чёрного, как в Video.tsx: переходить не из чего
+        fade = ''
+        if index == 0 and scene.get('fadeIn') and self.transition > 0:
+            fade = f"fade=t=in:st=0:d={min(self.transition, scene['duration'] / 2):.3f},"
+
+        return (
+            f"[{index}:v]scale={big_w}:{big_h}:force_original_aspect_ratio=increase,crop={big_w}:{big_h},"
+            f"zoompan=z='{zoom}':x='{x}':y='{y}':d={frames}:s={width}x{height}:fps={fps},"
+            # Лёгкий color grading, как filter в KenBurnsScene.tsx
+            f"eq=contrast=1.1:brightness=0.02,setsar=1,{fade}format=yuv420p[v{index}]"
+        )
+
+    def _effect_params(self, scene: Dict) -> Dict:
+        """Параметры эффекта сцены (из KenBurnsEffect, если сцена их не несёт)"""
+        if scene.get('effectParams'):
+            return scene['effectParams']
+
+        try:
+            effect = EffectType(scene.get('effect', 'zoom_in'))
+        except ValueError:
+            effect = EffectType.STATIC
+
+        return self.ken_burns.get_effect_params(effect)
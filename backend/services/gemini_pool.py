@@ -0,0 +1,119 @@
+"""
+Gemini Client Pool - пул клиентов Gemini по одному на ключ
+Запросы распределяются на наименее загруженный ключ, поэтому
+параллельные генерации (батч) не упираются в лимиты одного ключа
+"""
+
+import hashlib
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from google import genai
+
+
+class GeminiPoolError(Exception):
+    """Нет доступных Gemini ключей"""
+    pass
+
+
+class GeminiClientPool:
+    """
+    Пул клиентов google-genai
+
+    Выбор ключа: меньше всего запросов в работе, при равенстве - меньше
+    всего запросов всего. Ключ, упёршийся в квоту (429 / RESOURCE_EXHAUSTED),
+    на время cooldown исключается из выбора.
+
+    Клиенты создаются лениво и переиспользуются (одно HTTP соединение на ключ).
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        quota_cooldown: float = 60,
+        client_factory: Optional[Callable[[str], object]] = None
+    ):
+        """
+        Args:
+            keys: Gemini API ключи (GOOGLE_API_KEY_1..10)
+            quota_cooldown: На сколько секунд убирать ключ после ошибки квоты
+            client_factory: Создание клиента по ключу (по умолчанию genai.Client)
+        """
+        if not keys:
+            raise GeminiPoolError(
+                "Нет доступных Google Gemini ключей!\n"
+                "Добавьте в .env: GOOGLE_API_KEY_1=your_key"
+            )
+
+        # Порядок сохраняем, дубликаты убираем
+        self.keys = list(dict.fromkeys(keys))
+        self.quota_cooldown = quota_cooldown
+        self.client_factory = client_factory or (lambda key: genai.Client(api_key=key))
+
+        self._clients: Dict[str, object] = {}
+        self._in_flight = {key: 0 for key in self.keys}
+        self._requests = {key: 0 for key in self.keys}
+        self._cooldown_until = {key: 0.0 for key in self.keys}
+
+    def client_for(self, key: str):
+        """Клиент для конкретного ключа (создаётся при первом обращении)"""
+        if key not in self._clients:
+            self._clients[key] = self.client_factory(key)
+        return self._clients[key]
+
+    def select_key(self) -> str:
+        """
+        Наименее загруженный ключ
+
+        Если все ключи в cooldown - тот, что освободится раньше всех
+        """
+        now = time.time()
+        available = [key for key in self.keys if self._cooldown_until[key] <= now]
+
+        if not available:
+            return min(self.keys, key=lambda key: self._cooldown_until[key])
+
+        return min(available, key=lambda key: (self._in_flight[key], self._requests[key]))
+
+    @asynccontextmanager
+    async def client(self) -> AsyncIterator[object]:
+        """
+        Клиент наименее загруженного ключа на время одного запроса
+
+        Пример:
+            async with pool.client() as client:
+                response = await client.aio.models.generate_content(...)
+        """
+        key = self.select_key()
+        self._in_flight[key] += 1
+        self._requests[key] += 1
+
+        try:
+            yield self.client_for(key)
+        except Exception as e:
+            if self._is_quota_error(e):
+                self._cooldown_until[key] = time.time() + self.quota_cooldown
+                print(f"   ⏳ Gemini ключ {self._key_hash(key)}: квота, пауза {int(self.quota_cooldown)}s")
+            raise
+        finally:
+            self._in_flight[key] -= 1
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Загрузка по ключам (ключи - хэши, как в кэше APIKeyManager)"""
+        now = time.time()
+        return {
+            self._key_hash(key): {
+                'in_flight': self._in_flight[key],
+                'requests': self._requests[key],
+                'cooldown': max(0, int(self._cooldown_until[key] - now))
+            }
+            for key in self.keys
+        }
+
+    def _is_quota_error(self, error: Exception) -> bool:
+        message = str(error)
+        return '429' in message or 'RESOURCE_EXHAUSTED' in message
+
+    def _key_hash(self, key: str) -> str:
+        return hashlib.md5(key.encode()).hexdigest()[:8]
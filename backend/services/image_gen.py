@@ -265,7 +265,8 @@ class ImageGenerator:
                 'path': image_path,
                 'timestamp': prompt_data['timestamp'],
                 'duration': prompt_data['duration'],
-                'scene_description': prompt_data['scene_description']
+                'scene_description': prompt_data['scene_description'],
+                'text': prompt_data.get('text', '')
             })
 
             # Человекоподобная задержка
@@ -378,7 +379,9 @@ class ImageGenerator:
             payload['parameters']['strength'] = 0.7
 
         try:
-            response = requests.post(
+            # Синхронный клиент - в отдельном потоке: отмена задачи не ждёт ответа API
+            response = await asyncio.to_thread(
+                requests.post,
                 self.api_url,
                 headers=headers,
                 json=payload,
@@ -282,6 +282,49 @@ class KenBurnsEffect:
         """
         return self.effect_params[effect_type].copy()
 
+    def reframe_params(
+        self,
+        params: Dict,
+        width: int,
+        height: int,
+        source_aspect: float = 16 / 9
+    ) -> Dict:
+        """
+        Параметры эффекта для другого формата кадра (9:16, 1:1) из того же изображения
+
+        Позиции в effect_params - центры окна в кадре, обрезанном под формат
+        (cover). Узкий кадр видит только часть изображения 16:9, поэтому центры
+        пересчитываются в координаты этой обрезки: окно проходит по тем же
+        местам изображения, что и в 16:9 (рендерер ограничивает его краями кадра).
+
+        Args:
+            params: Параметры для исходного формата (get_effect_params)
+            width: Ширина целевого кадра
+            height: Высота целевого кадра
+            source_aspect: Соотношение сторон изображений (ImageGenerator - 16:9)
+
+        Returns:
+            Новый словарь параметров (масштаб не меняется)
+        """
+        target_aspect = width / height
+
+        # Доля ширины / высоты изображения, попадающая в кадр после обрезки
+        visible_x = min(1.0, target_aspect / source_aspect)
+        visible_y = min(1.0, source_aspect / target_aspect)
+
+        def reframe(position) -> Tuple[float, float]:
+            x, y = position
+            return (
+                round(min(1.0, max(0.0, 0.5 + (x - 0.5) / visible_x)), 4),
+                round(min(1.0, max(0.0, 0.5 + (y - 0.5) / visible_y)), 4)
+            )
+
+        return {
+            **params,
+            'start_position': reframe(params['start_position']),
+            'end_position': reframe(params['end_position'])
+        }
+
     def process_scenes(
         self,
         scenes: List[Dict],
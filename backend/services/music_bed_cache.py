@@ -0,0 +1,210 @@
+"""
+Music Bed Cache - заранее подготовленные подложки фоновой музыки
+Каждый трек из BACKGROUND_MUSIC один раз приводится к целевой громкости,
+частоте дискретизации и зацикливается до стандартной длительности.
+Финальный монтаж после этого - только обрезка и сложение.
+"""
+
+import os
+import hashlib
+import json
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+
+from config.background_music import BACKGROUND_MUSIC, get_music_path, get_music_volume
+
+
+# Стандартные длительности подложек (секунды): от Shorts до часовых роликов
+DURATION_BUCKETS = [60, 180, 300, 600, 900, 1200, 1800, 2700, 3600]
+
+
+class MusicBedCache:
+    """
+    Кэш музыкальных подложек
+
+    Подложка = трек с применённой громкостью (volume dB из конфига),
+    пересэмплированный под аудио ролика, зацикленный до ближайшей
+    стандартной длительности и с fade in в начале. Хранится во FLAC
+    (без потерь, декодирование почти бесплатное).
+
+    Fade out зависит от точки обрезки, поэтому добавляется при сведении.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        fade_in: float = 2.0,
+        fade_out: float = 3.0
+    ):
+        """
+        Args:
+            cache_dir: Папка для подложек (по умолчанию backend/assets/music/beds)
+            fade_in: Длительность плавного входа музыки (сек)
+            fade_out: Длительность плавного затухания в конце ролика (сек)
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(__file__), '..', 'assets', 'music', 'beds')
+
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.fade_in = fade_in
+        self.fade_out = fade_out
+
+    def get_bucket(self, duration: float) -> int:
+        """
+        Ближайшая стандартная длительность, не короче ролика
+
+        Для роликов длиннее последнего бакета - округление вверх до 10 минут
+        """
+        for bucket in DURATION_BUCKETS:
+            if bucket >= duration:
+                return bucket
+
+        return int(-(-duration // 600) * 600)
+
+    def get_bed(self, music_key: str, duration: float, sample_rate: int = 48000) -> Optional[str]:
+        """
+        Возвращает подложку для трека (строит при первом обращении)
+
+        Args:
+            music_key: Ключ трека из BACKGROUND_MUSIC
+            duration: Длительность ролика (сек)
+            sample_rate: Частота дискретизации аудио ролика
+
+        Returns:
+            Путь к FLAC подложке или None, если трека нет на диске
+        """
+        music_path = get_music_path(music_key)
+        if not music_path or not os.path.exists(music_path):
+            return None
+
+        bucket = self.get_bucket(duration)
+        bed_path = self.cache_dir / self._bed_filename(music_key, music_path, bucket, sample_rate)
+
+        if bed_path.exists():
+            print(f"   ⚡ Подложка из кэша: {bed_path.name}")
+            return str(bed_path)
+
+        print(f"   🎼 Подготовка подложки {music_key} ({bucket}s, {sample_rate} Hz)...")
+        self._build_bed(music_path, get_music_volume(music_key), bucket, sample_rate, bed_path)
+
+        return str(bed_path)
+
+    def warm_all(
+        self,
+        buckets: Optional[List[int]] = None,
+        sample_rate: int = 48000
+    ) -> int:
+        """
+        Заранее строит подложки для всех треков, лежащих в assets/music
+
+        Args:
+            buckets: Какие длительности готовить (по умолчанию все стандартные)
+            sample_rate: Частота дискретизации
+
+        Returns:
+            Количество готовых подложек
+        """
+        ready = 0
+
+        for music_key in BACKGROUND_MUSIC:
+            for bucket in buckets or DURATION_BUCKETS:
+                try:
+                    if self.get_bed(music_key, bucket, sample_rate):
+                        ready += 1
+                except Exception as e:
+                    print(f"   ⚠️  Подложка {music_key} ({bucket}s) не создана: {e}")
+
+        print(f"✅ Подложек готово: {ready}")
+        return ready
+
+    def build_mix_command(
+        self,
+        video_path: str,
+        bed_path: str,
+        duration: float,
+        output_path: str
+    ) -> List[str]:
+        """
+        FFmpeg команда сведения: обрезка подложки + fade out + сложение с голосом
+
+        Видео копируется без перекодирования, как и раньше
+        """
+        fade_start = max(0.0, duration - self.fade_out)
+
+        return [
+            'ffmpeg', '-i', video_path, '-i', bed_path,
+            '-filter_complex',
+            f'[1:a]atrim=0:{duration:.3f},afade=t=out:st={fade_start:.3f}:d={self.fade_out}[music];'
+            '[0:a][music]amix=inputs=2:duration=first:dropout_transition=2',
+            '-c:v', 'copy', '-c:a', 'aac',
+            '-shortest',
+            '-y',
+            output_path
+        ]
+
+    def clear(self) -> int:
+        """Удаляет все подложки. Returns: количество удалённых файлов"""
+        removed = 0
+        for bed in self.cache_dir.glob('*.flac'):
+            bed.unlink()
+            removed += 1
+        return removed
+
+    def _bed_filename(self, music_key: str, music_path: str, bucket: int, sample_rate: int) -> str:
+        """
+        Имя подложки включает всё, от чего она зависит:
+        громкость, частоту, длительность, fade in и версию исходного файла
+        """
+        stat = os.stat(music_path)
+        source = json.dumps({
+            'size': stat.st_size,
+            'mtime': int(stat.st_mtime),
+            'volume': get_music_volume(music_key),
+            'fade_in': self.fade_in
+        }, sort_keys=True)
+        version = hashlib.md5(source.encode()).hexdigest()[:8]
+
+        return f"{music_key}_{bucket}s_{sample_rate}hz_{version}.flac"
+
+    def _build_bed(self, music_path: str, volume_db: int, bucket: int, sample_rate: int, bed_path: Path):
+        """Зацикливание + громкость + ресэмплинг + fade in одним проходом ffmpeg"""
+        temp_path = bed_path.with_suffix('.tmp.flac')
+
+        cmd = [
+            'ffmpeg', '-y', '-v', 'error',
+            '-stream_loop', '-1', '-i', music_path,
+            '-t', str(bucket),
+            '-af', f'volume={volume_db}dB,aresample={sample_rate},afade=t=in:st=0:d={self.fade_in}',
+            '-ar', str(sample_rate), '-ac', '2',
+            '-c:a', 'flac',
+            str(temp_path)
+        ]
+
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+            # Атомарная замена: параллельные задачи не увидят недописанный файл
+            os.replace(temp_path, bed_path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+
+def probe_sample_rate(media_path: str, default: int = 48000) -> int:
+    """
+    Частота дискретизации первой аудиодорожки (через ffprobe)
+
+    Returns:
+        Частота в Гц или default, если определить не удалось
+    """
+    try:
+        result = subprocess.run([
+            'ffprobe', '-v', 'quiet', '-print_format', 'json',
+            '-select_streams', 'a:0', '-show_streams', media_path
+        ], capture_output=True, text=True)
+        streams = json.loads(result.stdout).get('streams', [])
+        return int(streams[0]['sample_rate']) if streams else default
+    except Exception:
+        return default
@@ -0,0 +1,201 @@
+"""
+Ollama Session - управление локальной моделью Ollama
+Прогрев модели при старте, keep_alive на время батча,
+постоянный HTTP клиент и статус загрузки модели для /api/health
+"""
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+import httpx
+
+
+class OllamaSession:
+    """
+    Сессия работы с Ollama
+
+    Ollama выгружает модель после простоя (по умолчанию 5 минут), и первый
+    запрос после этого ждёт загрузку весов - на CPU дольше самой генерации.
+    Сессия:
+    - прогревает модель заранее (пустой промпт = только загрузка)
+    - передаёт keep_alive в каждом запросе: длинный, пока идёт батч,
+      обычный - в остальное время
+    - держит один httpx.AsyncClient на event loop (переиспользование соединений)
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "llama3.1:8b",
+        keep_alive: str = "10m",
+        batch_keep_alive: str = "2h",
+        timeout: float = 120.0
+    ):
+        """
+        Args:
+            base_url: Адрес Ollama сервера
+            model: Модель для генерации сценариев
+            keep_alive: Сколько держать модель в памяти после запроса (обычный режим)
+            batch_keep_alive: То же, пока активен батч
+            timeout: Таймаут запросов генерации (сек)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.keep_alive = keep_alive
+        self.batch_keep_alive = batch_keep_alive
+        self.timeout = timeout
+
+        self._active_batches = 0
+        self._lock = threading.Lock()
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+
+        self.last_warm_up: Optional[Dict] = None
+
+    @property
+    def current_keep_alive(self) -> str:
+        """keep_alive для следующего запроса"""
+        return self.batch_keep_alive if self._active_batches else self.keep_alive
+
+    def client(self) -> httpx.AsyncClient:
+        """
+        Постоянный клиент для текущего event loop
+
+        Flask сервер запускает каждую задачу в своём event loop, а соединения
+        httpx привязаны к loop - поэтому клиент пересоздаётся при смене loop.
+        """
+        loop = asyncio.get_running_loop()
+
+        if self._client is None or self._client_loop is not loop or self._client.is_closed:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout)
+            self._client_loop = loop
+
+        return self._client
+
+    def generate_payload(self, prompt: str, stream: bool, options: Optional[Dict] = None) -> Dict:
+        """Тело запроса /api/generate с актуальным keep_alive"""
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.current_keep_alive,
+            "options": options or {}
+        }
+
+    async def warm_up(self) -> bool:
+        """
+        Загружает модель в память (пустой промпт - Ollama только грузит веса)
+
+        Returns:
+            True, если модель загружена
+        """
+        started = datetime.now()
+        print(f"🔥 Прогрев Ollama ({self.model})...")
+
+        try:
+            async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout) as client:
+                response = await client.post('/api/generate', json={
+                    "model": self.model,
+                    "prompt": "",
+                    "keep_alive": self.current_keep_alive
+                })
+                response.raise_for_status()
+        except Exception as e:
+            self.last_warm_up = {'ok': False, 'error': str(e)[:200], 'at': started.isoformat()}
+            print(f"   ⚠️  Ollama не прогрета: {e}")
+            return False
+
+        seconds = (datetime.now() - started).total_seconds()
+        self.last_warm_up = {'ok': True, 'seconds': round(seconds, 1), 'at': started.isoformat()}
+        print(f"   ✅ Ollama готова за {seconds:.1f}s")
+        return True
+
+    def warm_up_in_background(self) -> threading.Thread:
+        """Прогрев в фоновом потоке (не задерживает старт сервера/оркестратора)"""
+        thread = threading.Thread(target=lambda: asyncio.run(self.warm_up()), daemon=True)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def batch(self):
+        """
+        На время батча модель держится в памяти дольше
+
+        Пример:
+            with get_ollama_session().batch():
+                await queue.process_queue()
+        """
+        with self._lock:
+            self._active_batches += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._active_batches -= 1
+                finished = self._active_batches == 0
+
+            if finished:
+                self._apply_keep_alive(self.keep_alive)
+
+    def status(self) -> Dict:
+        """
+        Состояние Ollama для /api/health
+
+        Returns:
+            Dict: reachable, model, resident (модель в памяти), expires_at,
+            size_vram, keep_alive, batch_active, last_warm_up
+        """
+        status = {
+            'reachable': False,
+            'model': self.model,
+            'resident': False,
+            'expires_at': None,
+            'size_vram': None,
+            'keep_alive': self.current_keep_alive,
+            'batch_active': self._active_batches > 0,
+            'last_warm_up': self.last_warm_up
+        }
+
+        try:
+            response = httpx.get(f"{self.base_url}/api/ps", timeout=2.0)
+            response.raise_for_status()
+        except Exception:
+            return status
+
+        status['reachable'] = True
+
+        for loaded in response.json().get('models', []):
+            if loaded.get('name') == self.model or loaded.get('model') == self.model:
+                status['resident'] = True
+                status['expires_at'] = loaded.get('expires_at')
+                status['size_vram'] = loaded.get('size_vram')
+                break
+
+        return status
+
+    def _apply_keep_alive(self, keep_alive: str):
+        """Сообщает Ollama новый keep_alive загруженной модели (без генерации)"""
+        try:
+            httpx.post(
+                f"{self.base_url}/api/generate",
+                json={"model": self.model, "prompt": "", "keep_alive": keep_alive},
+                timeout=5.0
+            )
+        except Exception:
+            # Ollama не запущена - нечего обновлять
+            pass
+
+
+_session: Optional[OllamaSession] = None
+
+
+def get_ollama_session() -> OllamaSession:
+    """Общая сессия процесса (ScriptGenerator, сервер, батч)"""
+    global _session
+    if _session is None:
+        _session = OllamaSession()
+    return _session
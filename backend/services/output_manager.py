@@ -4,10 +4,11 @@ Output Manager - управление структурой выходных фа
 """
 
 import os
+import json
 import shutil
 from pathlib import Path
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 
 
 class OutputManager:
@@ -97,6 +98,76 @@ class OutputManager:
 
         return final_video_path
 
+    def save_timeline(
+        self,
+        project_dir: Path,
+        scenes: List[Dict],
+        audio_path: str,
+        duration: float = 0,
+        subtitle_style: str = "highlighted_words",
+        width: int = 1920,
+        height: int = 1080
+    ) -> Path:
+        """
+        Сохраняет таймлайн проекта: сцены (картинки, эффекты, субтитры), озвучку
+        и формат основного видео
+
+        По нему проект можно перерендерить (например, черновиком) без
+        повторной генерации изображений и TTS
+
+        Returns:
+            Путь к timeline.json
+        """
+        timeline_path = Path(project_dir) / "timeline.json"
+
+        with open(timeline_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'scenes': scenes,
+                'audioPath': str(audio_path),
+                'duration': duration,
+                'subtitleStyle': subtitle_style,
+                'width': width,
+                'height': height
+            }, f, indent=2, ensure_ascii=False)
+
+        return timeline_path
+
+    def resolve_project_dir(self, project_dir) -> Path:
+        """
+        Абсолютный путь к папке проекта внутри базовой директории
+
+        Относительный путь считается от базовой директории
+
+        Raises:
+            ValueError: Папка вне базовой директории (в т.ч. через '..' или симлинк)
+        """
+        path = Path(project_dir).expanduser()
+        if not path.is_absolute():
+            path = self.base_output_dir / path
+
+        path = path.resolve()
+        base_dir = self.base_output_dir.resolve()
+
+        if base_dir not in path.parents:
+            raise ValueError(f"Папка проекта должна быть внутри {base_dir}: {project_dir}")
+
+        return path
+
+    def load_timeline(self, project_dir: Path) -> Dict:
+        """
+        Загружает таймлайн проекта (см. save_timeline)
+
+        Raises:
+            FileNotFoundError: У проекта нет timeline.json
+        """
+        timeline_path = Path(project_dir) / "timeline.json"
+
+        if not timeline_path.exists():
+            raise FileNotFoundError(f"Таймлайн проекта не найден: {timeline_path}")
+
+        with open(timeline_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def _create_seo_file(self, project_dir: Path, metadata: Dict):
         """Создаёт файл с SEO метаданными"""
 
@@ -140,6 +211,7 @@ YOUTUBE VIDEO PROJECT
 video.mp4           - Готовое видео для загрузки на YouTube
 SEO_METADATA.txt    - Заголовки, описание, теги для YouTube
 script.txt          - Текст скрипта (если сохранён)
+timeline.json       - Сцены и озвучка для повторного рендера
 audio.mp3           - Аудио файл (если сохранён)
 images/             - Изображения использованные в видео
 
@@ -0,0 +1,138 @@
+"""
+Provider Router - адаптивный порядок LLM провайдеров
+Хранит EWMA задержки и доли успехов по каждому провайдеру/модели
+и выбирает порядок с минимальным ожидаемым временем до успеха
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+
+class ProviderRouter:
+    """
+    Маршрутизатор провайдеров генерации сценариев
+
+    Для последовательных попыток ожидаемое время до успеха минимально,
+    если кандидаты отсортированы по latency / success_rate (по возрастанию):
+    быстрый, но ненадёжный провайдер уступает чуть более медленному,
+    который почти всегда отвечает.
+
+    Статистика сглаживается EWMA (свежие замеры важнее: скорость провайдеров
+    сильно меняется в течение дня) и сохраняется в JSON между запусками.
+    EWMA стартует с априорных значений, а без новых замеров статистика
+    возвращается к ним с периодом полураспада half_life: провайдер,
+    опущенный вниз после сбоев, со временем снова пробуется.
+    """
+
+    def __init__(
+        self,
+        state_file: str = ".provider_stats.json",
+        alpha: float = 0.3,
+        default_latency: float = 30.0,
+        default_success: float = 0.5,
+        half_life: float = 3600.0
+    ):
+        """
+        Args:
+            state_file: Файл статистики
+            alpha: Вес нового замера в EWMA (0..1)
+            default_latency: Априорная задержка для провайдера без замеров (сек)
+            default_success: Априорная доля успехов для провайдера без замеров
+            half_life: За сколько секунд без замеров отклонение от априорных
+                значений уменьшается вдвое
+        """
+        self.state_file = state_file
+        self.alpha = alpha
+        self.default_latency = default_latency
+        self.default_success = default_success
+        self.half_life = half_life
+
+        self.stats: Dict[str, Dict] = self._load_stats()
+
+    def record(self, key: str, latency: float, success: bool):
+        """
+        Учитывает результат попытки
+
+        Args:
+            key: Провайдер/модель ('groq:llama-3.1-70b-versatile')
+            latency: Сколько длилась попытка (сек), включая неудачные
+            success: Получен ли валидный сценарий
+        """
+        value = 1.0 if success else 0.0
+        prior_latency, prior_success = self._current(key)
+        samples = self.stats.get(key, {}).get('samples', 0)
+
+        # Первый замер смешивается с априорными значениями, а не заменяет их:
+        # один таймаут не должен отправлять провайдера в конец очереди навсегда
+        self.stats[key] = {
+            'latency': self.alpha * latency + (1 - self.alpha) * prior_latency,
+            'success_rate': self.alpha * value + (1 - self.alpha) * prior_success,
+            'samples': samples + 1,
+            'updated_at': time.time()
+        }
+        self._save_stats()
+
+    def expected_cost(self, key: str) -> float:
+        """Ожидаемое время до успеха при повторных попытках этого кандидата (сек)"""
+        latency, success = self._current(key)
+        return latency / max(success, 0.01)
+
+    def _current(self, key: str) -> Tuple[float, float]:
+        """(задержка, доля успехов) с затуханием к априорным значениям"""
+        entry = self.stats.get(key)
+
+        if entry is None:
+            return self.default_latency, self.default_success
+
+        age = max(0.0, time.time() - entry.get('updated_at', time.time()))
+        weight = 0.5 ** (age / self.half_life) if self.half_life > 0 else 1.0
+
+        latency = self.default_latency + (entry['latency'] - self.default_latency) * weight
+        success = self.default_success + (entry['success_rate'] - self.default_success) * weight
+        return latency, success
+
+    def order(self, candidates: List[Dict]) -> List[Dict]:
+        """
+        Сортирует кандидатов по ожидаемому времени до успеха
+
+        Сортировка устойчивая: без статистики сохраняется исходный приоритет.
+
+        Args:
+            candidates: Список словарей с ключом 'key'
+
+        Returns:
+            Новый список в порядке попыток
+        """
+        ordered = sorted(candidates, key=lambda candidate: self.expected_cost(candidate['key']))
+
+        if [c['key'] for c in ordered] != [c['key'] for c in candidates]:
+            print(f"🧭 Порядок провайдеров: {' → '.join(c['name'] for c in ordered[:4])}...")
+
+        return ordered
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Статистика с ожидаемым временем до успеха"""
+        return {
+            key: {**entry, 'expected_cost': round(self.expected_cost(key), 1)}
+            for key, entry in self.stats.items()
+        }
+
+    def _load_stats(self) -> Dict:
+        """Загружает статистику"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def _save_stats(self):
+        """Сохраняет статистику"""
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump(self.stats, f, indent=2)
+        except Exception as e:
+            print(f"⚠️  Ошибка сохранения статистики провайдеров: {e}")
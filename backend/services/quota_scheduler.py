@@ -0,0 +1,139 @@
+"""
+Quota Scheduler - распределение фрагментов озвучки по ElevenLabs ключам
+Знает остаток символов каждого ключа и раскладывает фрагменты заранее,
+чтобы ни один запрос не ушёл на ключ, который гарантированно откажет
+"""
+
+from typing import Dict, List, Optional
+
+
+class QuotaSchedulerError(ValueError):
+    """Фрагменты не помещаются в оставшиеся лимиты ключей"""
+    pass
+
+
+class ElevenLabsQuotaScheduler:
+    """
+    Планировщик ElevenLabs ключей по остатку месячных символов
+
+    Возможности:
+    - Остатки из API подписки (sync) или локального учёта SafeAPIManager
+    - Bin-packing фрагментов по ключам (best-fit decreasing)
+    - Резервирование символов до фактической отправки запроса
+    - Освобождение резерва при ошибке или отмене
+    """
+
+    def __init__(self, api_key_manager, sync_with_api: bool = False):
+        """
+        Args:
+            api_key_manager: SafeAPIManager instance
+            sync_with_api: Запрашивать остатки у /v1/user/subscription перед планированием
+        """
+        self.key_manager = api_key_manager
+        self.sync_with_api = sync_with_api
+
+        # Зарезервированные, но ещё не отправленные символы: {key_hash: chars}
+        self.reservations: Dict[str, int] = {}
+
+    def get_budgets(self) -> Dict[str, int]:
+        """
+        Свободный остаток символов для каждого доступного ключа
+
+        Returns:
+            {key: остаток минус резерв} для ключей не в waiting_list и не заблокированных
+        """
+        manager = self.key_manager
+        manager._check_waiting_list('elevenlabs')
+
+        available_keys = [
+            key for key in manager.elevenlabs_keys
+            if manager._get_key_hash(key) not in manager.key_status['permanently_blocked']
+            and manager._get_key_hash(key) not in manager.key_status['waiting_list']
+        ]
+
+        if self.sync_with_api:
+            manager.sync_elevenlabs_quota(available_keys)
+
+        budgets = {}
+        for key in available_keys:
+            key_hash = manager._get_key_hash(key)
+            free = manager.get_elevenlabs_remaining(key) - self.reservations.get(key_hash, 0)
+            if free > 0:
+                budgets[key] = free
+
+        return budgets
+
+    def plan(self, chunk_lengths: List[int], reserve: bool = True) -> List[str]:
+        """
+        Распределяет фрагменты по ключам до начала озвучки
+
+        Крупные фрагменты раскладываются первыми, каждый - на ключ
+        с наименьшим достаточным остатком. Так большие остатки
+        сохраняются для длинных фрагментов, а почти пустые ключи
+        дорабатываются короткими.
+
+        Args:
+            chunk_lengths: Длины фрагментов в символах (в порядке озвучки)
+            reserve: Зарезервировать символы под план
+
+        Returns:
+            Список ключей той же длины, что и chunk_lengths
+
+        Raises:
+            QuotaSchedulerError: Если какой-то фрагмент не помещается ни в один ключ
+        """
+        budgets = self.get_budgets()
+        assignment: List[Optional[str]] = [None] * len(chunk_lengths)
+
+        order = sorted(range(len(chunk_lengths)), key=lambda i: chunk_lengths[i], reverse=True)
+
+        for i in order:
+            length = chunk_lengths[i]
+            candidates = [key for key, budget in budgets.items() if budget >= length]
+
+            if not candidates:
+                total_free = sum(budgets.values())
+                raise QuotaSchedulerError(
+                    f"❌ Фрагмент {i + 1} ({length} символов) не помещается ни в один ElevenLabs ключ "
+                    f"(свободно всего: {total_free} символов)"
+                )
+
+            selected_key = min(candidates, key=lambda key: budgets[key])
+            budgets[selected_key] -= length
+            assignment[i] = selected_key
+
+        if reserve:
+            for key, length in zip(assignment, chunk_lengths):
+                self._reserve(key, length)
+
+        used_keys = len(set(assignment))
+        print(f"🗂️  План озвучки: {len(chunk_lengths)} фрагментов → {used_keys} ключей")
+
+        return assignment
+
+    async def wait_turn(self):
+        """Человекоподобная задержка перед запросом по заранее выбранному ключу"""
+        await self.key_manager._human_like_delay()
+
+    def commit(self, key: str, chars: int):
+        """Фрагмент озвучен: снимаем резерв и учитываем расход"""
+        self.release(key, chars)
+        self.key_manager.track_usage('elevenlabs', key, chars)
+
+    def release(self, key: str, chars: int):
+        """Снимает резерв (после ошибки, отмены или commit)"""
+        key_hash = self.key_manager._get_key_hash(key)
+        left = self.reservations.get(key_hash, 0) - chars
+
+        if left > 0:
+            self.reservations[key_hash] = left
+        else:
+            self.reservations.pop(key_hash, None)
+
+    def release_all(self):
+        """Снимает все резервы планировщика"""
+        self.reservations = {}
+
+    def _reserve(self, key: str, chars: int):
+        key_hash = self.key_manager._get_key_hash(key)
+        self.reservations[key_hash] = self.reservations.get(key_hash, 0) + chars
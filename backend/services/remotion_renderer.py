@@ -6,17 +6,71 @@ Remotion Video Renderer
 import os
 import json
 import subprocess
-from typing import List, Dict, Optional
+import uuid
+from typing import Callable, List, Dict, Optional
 from pathlib import Path
 
+from services.ffmpeg_renderer import FFmpegRenderer
+from services.remotion_server import RemotionServerError, get_render_server, remotion_source_hash
+from services.render_progress import RenderProgress, count_frames, parse_remotion_line, run_with_progress
+
+
+# Профили рендера: 'final' - как раньше, 'preview' - черновик для быстрого просмотра
+RENDER_PROFILES = {
+    'final': {
+        'height': 1080,
+        'fps': 30,
+        'x264_preset': None,         # Значение Remotion по умолчанию
+        'crf': None,
+        'simple_transitions': False
+    },
+    'preview': {
+        'height': 480,
+        'fps': 15,
+        'x264_preset': 'ultrafast',
+        'crf': 32,
+        'simple_transitions': True   # Склейка встык вместо fade
+    }
+}
+
 class RemotionRenderer:
-    """Рендер видео через Remotion с профессиональными эффектами"""
+    """
+    Рендер видео через Remotion с профессиональными эффектами
+
+    Сцены передаются каждому запуску своим файлом props (--props), композиция
+    Video (src/Root.tsx) берёт из них длительность и формат - поэтому
+    одновременные рендеры из BatchQueue и сервера не мешают друг другу.
+    """
 
-    def __init__(self, remotion_dir: str = None):
+    # Композиция в src/Root.tsx
+    COMPOSITION_ID = 'Video'
+
+    # Кто рисует субтитры: AnimatedSubtitle в браузере или libass после рендера
+    SUBTITLE_MODES = ('remotion', 'ass')
+
+    def __init__(
+        self,
+        remotion_dir: str = None,
+        use_server: bool = True,
+        profile: str = 'final',
+        subtitles: str = 'remotion',
+        subtitle_style: str = 'highlighted_words'
+    ):
         """
         Args:
             remotion_dir: Путь к Remotion проекту
+            use_server: Рендерить через постоянный render server (bundle и браузер
+                переиспользуются); при его недоступности - через CLI, как раньше
+            profile: Профиль рендера из RENDER_PROFILES (пресет x264, crf, переходы)
+            subtitles: 'remotion' - AnimatedSubtitle на каждом кадре в Chromium,
+                'ass' - Remotion рендерит только сцены, субтитры один раз
+                прожигаются ffmpeg из ASS файла
+            subtitle_style: Стиль субтитров SubtitleGenerator (для subtitles='ass')
         """
+        if profile not in RENDER_PROFILES:
+            raise ValueError(f"Неизвестный профиль рендера: {profile}")
+        if subtitles not in self.SUBTITLE_MODES:
+            raise ValueError(f"Неизвестный режим субтитров: {subtitles}")
         if remotion_dir is None:
             # По умолчанию ищем в соседней папке
             project_root = Path(__file__).parent.parent.parent
@@ -27,6 +81,16 @@ class RemotionRenderer:
         if not self.remotion_dir.exists():
             raise FileNotFoundError(f"Remotion проект не найден: {self.remotion_dir}")
 
+        self.server = get_render_server(str(self.remotion_dir)) if use_server else None
+
+        self.profile = profile
+        self.x264_preset = RENDER_PROFILES[profile]['x264_preset']
+        self.crf = RENDER_PROFILES[profile]['crf']
+        self.simple_transitions = RENDER_PROFILES[profile]['simple_transitions']
+
+        self.subtitles = subtitles
+        self.subtitle_style = subtitle_style
+
         print(f"✅ RemotionRenderer инициализирован: {self.remotion_dir}")
 
     def render_video(
@@ -36,7 +100,8 @@ class RemotionRenderer:
         output_path: str = 'output.mp4',
         fps: int = 30,
         width: int = 1920,
-        height: int = 1080
+        height: int = 1080,
+        on_progress: Optional[Callable[[Dict], None]] = None
     ) -> str:
         """
         Рендер видео с профессиональными эффектами
@@ -48,6 +113,7 @@ class RemotionRenderer:
             fps: FPS видео
             width: Ширина видео
             height: Высота видео
+            on_progress: Callback прогресса рендера (кадры, fps, ETA - см. RenderProgress)
 
         Returns:
             Путь к готовому видео
@@ -59,41 +125,52 @@ class RemotionRenderer:
         print(f"Сцен: {len(scenes)}")
         print(f"FPS: {fps}")
         print(f"Разрешение: {width}x{height}")
+        if self.profile != 'final':
+            print(f"Профиль: {self.profile}")
 
-        # Генерируем конфиг для Remotion
-        config = {
-            'scenes': scenes,
-            'audioPath': audio_path,
-            'fps': fps,
-            'width': width,
-            'height': height
-        }
+        output_abs_path = Path(output_path).absolute()
+        output_abs_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.subtitles == 'ass' and any(scene.get('subtitle') for scene in scenes):
+            return self._render_with_ass_subtitles(
+                scenes, audio_path, output_abs_path, fps, width, height, on_progress
+            )
 
-        config_path = self.remotion_dir / 'src' / 'config.json'
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        progress = RenderProgress(count_frames(scenes, fps), on_progress) if on_progress else None
 
-        print(f"\n✅ Конфиг создан: {config_path}")
+        if self.server:
+            try:
+                print("\n🎬 Рендер через render server...")
+                output = self.server.render(
+                    self.build_props(scenes, audio_path, fps, width, height),
+                    str(output_abs_path),
+                    progress=progress,
+                    x264_preset=self.x264_preset,
+                    crf=self.crf
+                )
+                print(f"\n✅ Видео готово: {output}")
+                return output
+            except RemotionServerError as e:
+                print(f"   ⚠️  {e}")
+                print("   ↩️  Рендер через Remotion CLI")
+
+        # Props задачи - отдельный файл рядом с результатом (не общий src/config.json)
+        props_path = self.write_props(
+            scenes, audio_path, fps, width, height,
+            output_abs_path.parent / f"remotion_props_{uuid.uuid4().hex[:8]}.json"
+        )
+
+        print(f"\n✅ Props задачи: {props_path}")
 
         # Рендер через Remotion CLI
         print("\n🎬 Запускаю рендер...")
 
-        output_abs_path = Path(output_path).absolute()
-
-        cmd = [
-            'npx', 'remotion', 'render',
-            'src/index.tsx',
-            str(output_abs_path),
-            '--codec', 'h264',
-            '--concurrency', '4'
-        ]
+        cmd = self.build_command(props_path, str(output_abs_path))
 
         try:
-            result = subprocess.run(
-                cmd,
+            result = run_with_progress(
+                cmd, parse_remotion_line, progress,
                 cwd=self.remotion_dir,
-                capture_output=True,
-                text=True,
                 timeout=600  # 10 минут максимум
             )
 
@@ -111,3 +188,99 @@ class RemotionRenderer:
             raise RuntimeError(
                 "Remotion не найден! Установите: npm install -g @remotion/cli"
             )
+        finally:
+            props_path.unlink(missing_ok=True)
+
+    def _render_with_ass_subtitles(
+        self,
+        scenes: List[Dict],
+        audio_path: Optional[str],
+        output_path: Path,
+        fps: int,
+        width: int,
+        height: int,
+        on_progress: Optional[Callable[[Dict], None]]
+    ) -> str:
+        """Сцены без субтитров через Remotion, затем прожиг ASS через ffmpeg"""
+        video_path = output_path.parent / f"video_nosubs_{uuid.uuid4().hex[:8]}.mp4"
+
+        burner = FFmpegRenderer(
+            subtitle_style=self.subtitle_style,
+            preset=self.x264_preset or 'veryfast',
+            crf=self.crf if self.crf is not None else 18
+        )
+
+        try:
+            self.render_video(
+                [{**scene, 'subtitle': None} for scene in scenes],
+                audio_path, str(video_path), fps, width, height, on_progress
+            )
+            output = burner.burn_subtitles(scenes, str(video_path), str(output_path), fps, width, height)
+        finally:
+            video_path.unlink(missing_ok=True)
+
+        print(f"\n✅ Видео с субтитрами: {output}")
+        return output
+
+    def write_props(
+        self,
+        scenes: List[Dict],
+        audio_path: Optional[str],
+        fps: int,
+        width: int,
+        height: int,
+        props_path: Path
+    ) -> Path:
+        """
+        Файл props для композиции Video
+
+        Returns:
+            Путь к файлу
+        """
+        with open(props_path, 'w', encoding='utf-8') as f:
+            json.dump(self.build_props(scenes, audio_path, fps, width, height), f, indent=2, ensure_ascii=False)
+
+        return props_path
+
+    def source_hash(self) -> str:
+        """Версия исходников композиции (src/ и package.json): другие исходники - другие кадры"""
+        return remotion_source_hash(self.remotion_dir)
+
+    def build_props(
+        self,
+        scenes: List[Dict],
+        audio_path: Optional[str],
+        fps: int,
+        width: int,
+        height: int
+    ) -> Dict:
+        """Props композиции Video: {'config': VideoConfig}"""
+        return {
+            'config': {
+                'scenes': scenes,
+                'audioPath': audio_path,
+                'fps': fps,
+                'width': width,
+                'height': height,
+                'simpleTransitions': self.simple_transitions
+            }
+        }
+
+    def build_command(self, props_path: Path, output_path: str) -> List[str]:
+        """Команда Remotion CLI для одной задачи"""
+        cmd = [
+            'npx', 'remotion', 'render',
+            'src/index.tsx',
+            self.COMPOSITION_ID,
+            str(output_path),
+            f'--props={Path(props_path).absolute()}',
+            '--codec', 'h264',
+            '--concurrency', '4'
+        ]
+
+        if self.x264_preset:
+            cmd += ['--x264-preset', self.x264_preset]
+        if self.crf is not None:
+            cmd += ['--crf', str(self.crf)]
+
+        return cmd
@@ -0,0 +1,340 @@
+"""
+Remotion Render Server - постоянный Node процесс рендера
+Bundle собирается один раз, браузер остаётся прогретым; Python запускает
+сервер, следит за ним и перезапускает, если процесс упал
+"""
+
+import atexit
+import hashlib
+import os
+import socket
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from services.cancellation import current_token
+
+
+class RemotionServerError(Exception):
+    """Render server недоступен или рендер через него не удался"""
+    pass
+
+
+def remotion_source_hash(remotion_dir) -> str:
+    """Хэш исходников композиции Remotion: src/ и package.json"""
+    remotion_dir = Path(remotion_dir)
+    digest = hashlib.md5()
+
+    files = sorted(path for path in (remotion_dir / 'src').rglob('*') if path.is_file())
+    files.append(remotion_dir / 'package.json')
+
+    for path in files:
+        if path.exists():
+            digest.update(str(path.relative_to(remotion_dir)).encode())
+            digest.update(path.read_bytes())
+
+    return digest.hexdigest()[:12]
+
+
+class RemotionRenderServer:
+    """
+    Супервизор remotion-renderer/server.mjs
+
+    `npx remotion render` на каждое видео заново ищет npx, собирает TSX проект
+    webpack'ом и запускает браузер - десятки секунд постоянных затрат.
+    Сервер делает это один раз; Python общается с ним по HTTP на 127.0.0.1.
+
+    Хэш исходников (src/, package.json) отправляется с каждым запросом:
+    сервер пересобирает bundle, только если исходники изменились.
+
+    По умолчанию порт свободный и выбирается при каждом запуске: API сервер
+    и CLI batch в соседнем процессе держат каждый свой сервер. /health
+    возвращает pid, и супервизор принимает только свой процесс.
+    Хвост вывода сервера хранится в памяти и попадает в ошибки запуска.
+    """
+
+    def __init__(
+        self,
+        remotion_dir: str,
+        port: Optional[int] = None,
+        command: Optional[List[str]] = None,
+        startup_timeout: float = 60,
+        render_timeout: float = 1800,
+        retry_cooldown: float = 300
+    ):
+        """
+        Args:
+            remotion_dir: Папка Remotion проекта
+            port: Локальный порт сервера (None - свободный порт при каждом запуске)
+            command: Команда запуска (по умолчанию node server.mjs)
+            startup_timeout: Сколько ждать, пока сервер начнёт отвечать (сек)
+            render_timeout: Максимальное время одного рендера (сек)
+            retry_cooldown: Пауза перед повторным запуском после неудачного старта (сек)
+        """
+        self.remotion_dir = Path(remotion_dir)
+        self.port = port
+        self.command = command or ['node', 'server.mjs']
+        self.startup_timeout = startup_timeout
+        self.render_timeout = render_timeout
+        self.retry_cooldown = retry_cooldown
+
+        self.base_url = f"http://127.0.0.1:{port}" if port else None
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+
+        self._lock = threading.Lock()
+        self._failed_at = 0.0
+        self._last_error: Optional[str] = None
+        self._output = deque(maxlen=50)
+
+    def source_hash(self) -> str:
+        """Хэш исходников композиции: src/ и package.json"""
+        return remotion_source_hash(self.remotion_dir)
+
+    def ensure_running(self):
+        """
+        Запускает сервер, если он не запущен или процесс завершился
+
+        Raises:
+            RemotionServerError: Сервер не поднялся (или недавно не поднялся)
+        """
+        with self._lock:
+            if self.process and self.process.poll() is None:
+                return
+
+            if self._failed_at and time.time() - self._failed_at < self.retry_cooldown:
+                raise RemotionServerError(f"Render server недоступен: {self._last_error}")
+
+            if self.process:
+                self.restarts += 1
+                print(f"   🔁 Render server завершился (код {self.process.returncode}), перезапуск #{self.restarts}")
+                log_tail = self.log_tail()
+                if log_tail:
+                    print(f"   {log_tail}")
+
+            self._start()
+
+    def start_in_background(self) -> threading.Thread:
+        """Запуск и прогрев в фоновом потоке (ошибка старта - только в лог)"""
+        def start():
+            try:
+                self.ensure_running()
+            except RemotionServerError as e:
+                print(f"   ⚠️  {e}")
+
+        thread = threading.Thread(target=start, daemon=True)
+        thread.start()
+        return thread
+
+    def render(
+        self,
+        props: Dict,
+        output_path: str,
+        codec: str = 'h264',
+        concurrency: int = 4,
+        progress=None,
+        x264_preset: Optional[str] = None,
+        crf: Optional[int] = None
+    ) -> str:
+        """
+        Рендер через сервер
+
+        Args:
+            props: Props композиции Video ({'config': ...})
+            output_path: Куда сохранить видео
+            codec: Кодек Remotion
+            concurrency: Сколько вкладок браузера рендерят кадры одновременно
+            progress: RenderProgress - пока идёт рендер, кадры раз в секунду
+                забираются с GET /progress
+            x264_preset: Пресет x264 (None - по умолчанию Remotion)
+            crf: Качество x264 (None - по умолчанию Remotion)
+
+        Returns:
+            Путь к готовому видео
+
+        Raises:
+            RemotionServerError: Сервер недоступен или вернул ошибку
+            TaskCancelledError: Задача отменена (рендер на сервере прерван)
+        """
+        self.ensure_running()
+
+        output_path = str(Path(output_path).absolute())
+        done = threading.Event()
+
+        def poll_progress():
+            while not done.wait(1.0):
+                try:
+                    state = httpx.get(
+                        f"{self.base_url}/progress", params={'outputPath': output_path}, timeout=2.0
+                    ).json()
+                except Exception:
+                    continue
+                if state.get('renderedFrames') is not None:
+                    progress.update(state['renderedFrames'], state.get('totalFrames'))
+
+        if progress:
+            threading.Thread(target=poll_progress, daemon=True).start()
+
+        # Отмена задачи прерывает renderMedia на сервере - POST /render вернёт ошибку
+        def cancel_render():
+            try:
+                httpx.post(f"{self.base_url}/cancel", json={'outputPath': output_path}, timeout=5.0)
+            except httpx.HTTPError as e:
+                print(f"   ⚠️  Render server не принял отмену: {e}")
+
+        token = current_token()
+        if token:
+            token.check()
+            token.add_callback(cancel_render)
+
+        try:
+            response = httpx.post(
+                f"{self.base_url}/render",
+                json={
+                    'props': props,
+                    'outputPath': output_path,
+                    'sourceHash': self.source_hash(),
+                    'codec': codec,
+                    'concurrency': concurrency,
+                    'x264Preset': x264_preset,
+                    'crf': crf
+                },
+                timeout=self.render_timeout
+            )
+        except httpx.HTTPError as e:
+            if token:
+                token.check()
+            raise RemotionServerError(f"Render server не ответил: {e}")
+        finally:
+            done.set()
+            if token:
+                token.remove_callback(cancel_render)
+
+        if token:
+            token.check()
+
+        if response.status_code != 200:
+            raise RemotionServerError(f"Render server: {response.text[:2000]}")
+
+        result = response.json()
+        print(f"   ⚡ Render server: {result.get('seconds', 0):.1f}s")
+        return result['outputPath']
+
+    def status(self) -> Dict:
+        """Состояние сервера: running, bundled, sourceHash, rendering, restarts"""
+        status = {
+            'running': bool(self.process and self.process.poll() is None),
+            'restarts': self.restarts,
+            'last_error': self._last_error
+        }
+
+        if status['running']:
+            try:
+                status.update(httpx.get(f"{self.base_url}/health", timeout=2.0).json())
+            except Exception:
+                pass
+
+        return status
+
+    def stop(self):
+        """Останавливает сервер (SIGTERM, затем kill)"""
+        with self._lock:
+            if not self.process or self.process.poll() is not None:
+                return
+
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def log_tail(self, lines: int = 20) -> str:
+        """Последние строки вывода сервера (stdout и stderr)"""
+        return ''.join(list(self._output)[-lines:]).strip()
+
+    def _start(self):
+        """Запуск процесса и ожидание /health от этого процесса"""
+        port = self.port or _free_port()
+        self.base_url = f"http://127.0.0.1:{port}"
+
+        print(f"🚀 Запуск Remotion render server (порт {port})...")
+
+        env = {**os.environ, 'RENDER_SERVER_PORT': str(port), 'SOURCE_HASH': self.source_hash()}
+
+        try:
+            # Своя группа процессов: браузер и воркеры сервера останавливаются вместе с ним
+            self.process = subprocess.Popen(
+                self.command,
+                cwd=self.remotion_dir,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors='replace',
+                start_new_session=True
+            )
+        except FileNotFoundError as e:
+            self._fail(f"не найден {self.command[0]}: {e}")
+
+        # Вывод читается всё время работы: и для диагностики, и чтобы не заполнился pipe
+        self._output.clear()
+        reader = threading.Thread(target=self._read_output, args=(self.process,), daemon=True)
+        reader.start()
+
+        deadline = time.time() + self.startup_timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                reader.join(timeout=2)
+                self._fail(
+                    f"процесс завершился с кодом {self.process.returncode} (npm install в remotion-renderer?)\n"
+                    f"{self.log_tail()}"
+                )
+
+            try:
+                response = httpx.get(f"{self.base_url}/health", timeout=1.0)
+                # Порт может быть занят сервером другого процесса - принимаем только свой
+                if response.status_code == 200 and response.json().get('pid') == self.process.pid:
+                    self._failed_at = 0.0
+                    self._last_error = None
+                    print(f"   ✅ Render server готов")
+                    return
+            except (httpx.HTTPError, ValueError):
+                pass
+
+            time.sleep(0.2)
+
+        self.process.kill()
+        self._fail(f"не ответил за {self.startup_timeout:.0f}s\n{self.log_tail()}")
+
+    def _read_output(self, process: subprocess.Popen):
+        for line in process.stdout:
+            self._output.append(line)
+
+    def _fail(self, error: str):
+        self._failed_at = time.time()
+        self._last_error = error
+        raise RemotionServerError(f"Render server не запущен: {error}")
+
+
+def _free_port() -> int:
+    """Свободный локальный порт (выбирает ОС)"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+_servers: Dict[str, RemotionRenderServer] = {}
+
+
+def get_render_server(remotion_dir: str) -> RemotionRenderServer:
+    """Общий render server процесса для Remotion проекта"""
+    key = str(Path(remotion_dir).absolute())
+    if key not in _servers:
+        _servers[key] = RemotionRenderServer(key)
+        atexit.register(_servers[key].stop)
+    return _servers[key]
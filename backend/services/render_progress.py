@@ -0,0 +1,164 @@
+"""
+Render Progress - реальный прогресс рендера
+Вывод рендерера читается построчно, из него берутся отрендеренные кадры;
+по ним считаются скорость (кадров/сек) и оставшееся время.
+"""
+
+import re
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.cancellation import run_process
+
+
+# Remotion CLI: "Rendered 120/900, time remaining: 1m"
+REMOTION_PROGRESS = re.compile(r'Rendered (\d+)/(\d+)')
+
+# ffmpeg -progress pipe:1: строки key=value, кадры - "frame=120"
+FFMPEG_PROGRESS = re.compile(r'^frame=(\d+)')
+
+
+def count_frames(scenes: List[Dict], fps: int) -> int:
+    """Кадров в видео из сцен (как считают рендереры: не меньше кадра на сцену)"""
+    return sum(max(1, round(scene['duration'] * fps)) for scene in scenes)
+
+
+def parse_remotion_line(line: str) -> Optional[Tuple[int, Optional[int]]]:
+    """(кадры, всего кадров) из строки Remotion CLI или None"""
+    match = REMOTION_PROGRESS.search(line)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def parse_ffmpeg_line(line: str) -> Optional[Tuple[int, Optional[int]]]:
+    """(кадры, None) из строки ffmpeg -progress или None"""
+    match = FFMPEG_PROGRESS.match(line.strip())
+    return (int(match.group(1)), None) if match else None
+
+
+class RenderProgress:
+    """
+    Счётчик кадров рендера: скорость и ETA
+
+    Callback получает словарь:
+        frames, totalFrames, percent, fps, eta (сек, None пока скорость неизвестна),
+        elapsed (сек), updatedAt (unix time последнего прироста кадров -
+        если он давно не меняется, рендер завис)
+
+    Скорость считается от первого отрендеренного кадра: запуск браузера
+    и сборка bundle не занижают fps.
+    """
+
+    def __init__(
+        self,
+        total_frames: int,
+        callback: Optional[Callable[[Dict], None]] = None,
+        min_interval: float = 1.0
+    ):
+        """
+        Args:
+            total_frames: Ожидаемое количество кадров
+            callback: Куда отправлять прогресс
+            min_interval: Не чаще одного callback за столько секунд
+        """
+        self.total_frames = max(1, total_frames)
+        self.callback = callback
+        self.min_interval = min_interval
+
+        self.frames = 0
+        self.started_at = time.time()
+        self.updated_at = self.started_at
+
+        self._first_frame: Optional[Tuple[int, float]] = None
+        self._parts: Dict = {}
+        self._reported_at = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, frames: int, total_frames: Optional[int] = None):
+        """Новое количество отрендеренных кадров (от рендерера)"""
+        with self._lock:
+            now = time.time()
+
+            if total_frames:
+                self.total_frames = total_frames
+            if frames > self.frames:
+                self.frames = min(frames, self.total_frames)
+                self.updated_at = now
+                if self._first_frame is None:
+                    self._first_frame = (self.frames, now)
+
+            done = self.frames >= self.total_frames
+            if not self.callback or (not done and now - self._reported_at < self.min_interval):
+                return
+
+            self._reported_at = now
+            stats = self.stats()
+
+        self.callback(stats)
+
+    def part_callback(self, key) -> Callable[[Dict], None]:
+        """
+        Callback для части рендера (сегмента, сцены), которая рендерится
+        отдельным процессом: кадры всех частей суммируются
+        """
+        def callback(stats: Dict):
+            with self._lock:
+                self._parts[key] = stats['frames']
+                frames = sum(self._parts.values())
+            self.update(frames)
+
+        return callback
+
+    def stats(self) -> Dict:
+        """Текущий прогресс"""
+        now = time.time()
+        fps = 0.0
+        eta = None
+
+        if self._first_frame:
+            first_frames, first_time = self._first_frame
+            if now > first_time and self.frames > first_frames:
+                fps = (self.frames - first_frames) / (now - first_time)
+                eta = round((self.total_frames - self.frames) / fps)
+
+        return {
+            'frames': self.frames,
+            'totalFrames': self.total_frames,
+            'percent': round(self.frames / self.total_frames * 100, 1),
+            'fps': round(fps, 1),
+            'eta': eta if self.frames < self.total_frames else 0,
+            'elapsed': round(now - self.started_at),
+            'updatedAt': self.updated_at
+        }
+
+
+def run_with_progress(
+    cmd: List[str],
+    parse_line: Callable[[str], Optional[Tuple[int, Optional[int]]]],
+    progress: Optional[RenderProgress],
+    cwd=None,
+    timeout: float = 600
+) -> subprocess.CompletedProcess:
+    """
+    Запуск рендера с чтением вывода по мере появления
+
+    Без progress - обычный subprocess.run с capture_output, как раньше.
+    С progress - stdout и stderr читаются одним потоком (\\r прогресс-баров
+    тоже считается концом строки), хвост вывода попадает в stderr результата.
+    Внутри отменяемой задачи процесс убивается вместе с группой (см. run_process).
+
+    Raises:
+        subprocess.TimeoutExpired: Рендер не уложился в timeout
+        FileNotFoundError: Нет исполняемого файла
+        TaskCancelledError: Задача отменена
+    """
+    on_line = None
+
+    if progress is not None:
+        def on_line(line: str):
+            parsed = parse_line(line)
+            if parsed:
+                progress.update(*parsed)
+
+    return run_process(cmd, cwd=cwd, timeout=timeout, on_line=on_line)
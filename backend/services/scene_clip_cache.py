@@ -0,0 +1,294 @@
+"""
+Scene Clip Cache - покадровый рендер по сценам с кэшем готовых клипов
+Каждая сцена рендерится отдельным клипом; ключ клипа - хэш всего, от чего
+зависят его кадры. После частичной перегенерации (одна картинка, один
+субтитр) перерендериваются только изменившиеся сцены.
+Рендер склеивает не файлы кэша, а их жёсткие ссылки (копии) в своей рабочей
+папке: вытеснение кэша параллельной задачей не ломает склейку.
+"""
+
+import contextvars
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.render_progress import RenderProgress, count_frames
+from services.segment_renderer import concat_clips
+
+
+class SceneClipCache:
+    """
+    Хранилище клипов сцен с ограничением размера
+
+    Клипы лежат файлами <ключ>.mp4; при обращении mtime обновляется,
+    при превышении лимита удаляются давно не использованные.
+    """
+
+    def __init__(self, cache_dir: str = '.scene_clips', max_size_mb: int = 2048):
+        """
+        Args:
+            cache_dir: Папка кэша клипов
+            max_size_mb: Максимальный размер кэша (МБ)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size_mb * 1024 * 1024
+
+        # Хэши картинок: (путь, размер, mtime) -> md5 содержимого
+        self._file_hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def file_hash(self, path: str) -> str:
+        """md5 содержимого файла (пересчитывается, только если файл изменился)"""
+        stat = os.stat(path)
+        marker = (str(Path(path).absolute()), stat.st_size, stat.st_mtime_ns)
+
+        if marker not in self._file_hashes:
+            digest = hashlib.md5()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            self._file_hashes[marker] = digest.hexdigest()
+
+        return self._file_hashes[marker]
+
+    def scene_key(self, scene: Dict, fps: int, width: int, height: int, renderer_tag: str = '') -> str:
+        """
+        Ключ клипа сцены
+
+        Картинка учитывается по содержимому, а не по пути: перегенерированная
+        картинка под тем же именем даёт новый ключ
+        """
+        payload = json.dumps({
+            'image': self.file_hash(scene['imagePath']),
+            'effect': scene.get('effect'),
+            'effectParams': scene.get('effectParams'),
+            'duration': scene['duration'],
+            'subtitle': scene.get('subtitle'),
+            'fadeIn': scene.get('fadeIn'),
+            'fps': fps,
+            'size': [width, height],
+            'renderer': renderer_tag
+        }, sort_keys=True, ensure_ascii=False, default=str)
+
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:20]
+
+    def get(self, key: str) -> Optional[str]:
+        """Путь к клипу или None (попадание обновляет mtime для вытеснения)"""
+        path = self.cache_dir / f"{key}.mp4"
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return str(path)
+
+    def checkout(self, key: str, dest: Path) -> bool:
+        """
+        Жёсткая ссылка (или копия) клипа в рабочую папку рендера
+
+        Ссылка переживает удаление клипа из кэша другой задачей
+
+        Returns:
+            False, если клипа в кэше нет
+        """
+        path = self.cache_dir / f"{key}.mp4"
+        try:
+            os.utime(path)
+            link_or_copy(path, dest)
+        except FileNotFoundError:
+            return False
+
+        return True
+
+    def put(self, key: str, clip_path: str) -> str:
+        """Кладёт готовый клип в кэш (сам клип остаётся на месте). Returns: путь в кэше"""
+        path = self.cache_dir / f"{key}.mp4"
+        temp_path = self.cache_dir / f"{key}.{uuid.uuid4().hex[:8]}.tmp"
+
+        # Атомарная замена: параллельные задачи не увидят недописанный клип
+        link_or_copy(Path(clip_path), temp_path)
+        os.replace(temp_path, path)
+        return str(path)
+
+    def evict(self, keep: Optional[List[str]] = None) -> int:
+        """
+        Удаляет давно не использованные клипы, пока кэш больше лимита
+
+        Args:
+            keep: Ключи, которые удалять нельзя (клипы текущего рендера)
+
+        Returns:
+            Количество удалённых клипов
+        """
+        keep = set(keep or [])
+        clips = sorted(self.cache_dir.glob('*.mp4'), key=lambda path: path.stat().st_mtime)
+        total = sum(path.stat().st_size for path in clips)
+        removed = 0
+
+        for path in clips:
+            if total <= self.max_size:
+                break
+            if path.stem in keep:
+                continue
+
+            total -= path.stat().st_size
+            path.unlink()
+            removed += 1
+
+        return removed
+
+    def get_status(self) -> Dict:
+        """Состояние кэша: количество клипов и размер"""
+        clips = list(self.cache_dir.glob('*.mp4'))
+        return {
+            'clips': len(clips),
+            'size_mb': round(sum(path.stat().st_size for path in clips) / 1024 / 1024, 1),
+            'max_size_mb': self.max_size // 1024 // 1024
+        }
+
+
+def link_or_copy(src: Path, dest: Path):
+    """
+    Жёсткая ссылка src -> dest, копия - если ссылки не поддерживаются
+    (другая файловая система)
+
+    Raises:
+        FileNotFoundError: Нет src
+    """
+    try:
+        os.link(src, dest)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class SceneCachedRenderer:
+    """
+    Обёртка над RemotionRenderer / FFmpegRenderer с тем же render_video()
+
+    Каждая сцена рендерится отдельным клипом без звука (через кэш),
+    клипы склеиваются -c copy, озвучка накладывается один раз.
+    Сцены без клипа в кэше рендерятся параллельно.
+
+    Кадры клипа не зависят от соседних сцен, иначе изменение одной сцены
+    инвалидировало бы и соседей. Поэтому переход - fade in сцены из чёрного
+    (флаг fadeIn у всех сцен, кроме первой), как в полном рендере Video.tsx;
+    перекрёстный xfade FFmpegRenderer в этом режиме не воспроизводится.
+    """
+
+    def __init__(
+        self,
+        renderer,
+        cache: Optional[SceneClipCache] = None,
+        max_workers: Optional[int] = None,
+        threads_per_scene: int = 4
+    ):
+        """
+        Args:
+            renderer: Рендерер клипов (RemotionRenderer / FFmpegRenderer)
+            cache: Кэш клипов (по умолчанию .scene_clips в рабочей папке)
+            max_workers: Сколько сцен рендерить одновременно
+                (по умолчанию ядра / threads_per_scene)
+            threads_per_scene: Сколько ядер занимает один процесс рендера
+        """
+        self.renderer = renderer
+        self.cache = cache or SceneClipCache()
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // threads_per_scene)
+
+    def renderer_tag(self) -> str:
+        """
+        Рендерер и его настройки - часть ключа (другой рендерер = другие кадры)
+
+        Рендерер с source_hash() (RemotionRenderer) добавляет версию своих
+        исходников: после правки композиции старые клипы не склеиваются в новое видео
+        """
+        settings = {
+            name: value for name, value in sorted(vars(self.renderer).items())
+            if isinstance(value, (str, int, float, bool)) and not name.startswith('_')
+        }
+        if hasattr(self.renderer, 'source_hash'):
+            settings['source_hash'] = self.renderer.source_hash()
+        return f"{type(self.renderer).__name__}:{json.dumps(settings, sort_keys=True)}"
+
+    def render_video(
+        self,
+        scenes: List[Dict],
+        audio_path: Optional[str] = None,
+        output_path: str = 'output.mp4',
+        fps: int = 30,
+        width: int = 1920,
+        height: int = 1080,
+        on_progress: Optional[Callable[[Dict], None]] = None
+    ) -> str:
+        """
+        Рендер видео из клипов сцен (интерфейс как у RemotionRenderer.render_video)
+
+        Returns:
+            Путь к готовому видео
+        """
+        tag = self.renderer_tag()
+
+        # Клип - как сцена в полном рендере: все, кроме первой, появляются с fade in
+        scenes = [{**scene, 'fadeIn': index > 0} for index, scene in enumerate(scenes)]
+        keys = [self.cache.scene_key(scene, fps, width, height, tag) for scene in scenes]
+
+        output_abs_path = Path(output_path).absolute()
+        work_dir = output_abs_path.parent / f"scene_clips_{uuid.uuid4().hex[:8]}"
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        def clip_path(key: str) -> Path:
+            return work_dir / f"{key}.mp4"
+
+        def render_scene(key: str) -> str:
+            path = self.renderer.render_video(
+                [missing[key]], None, str(clip_path(key)), fps, width, height,
+                on_progress=progress.part_callback(key) if progress else None
+            )
+            return self.cache.put(key, path)
+
+        try:
+            # Одинаковые сцены внутри видео рендерятся один раз; клипы из кэша -
+            # ссылками в рабочую папку, пока их не вытеснила другая задача
+            missing = {}
+            hits = set()
+            for key, scene in zip(keys, scenes):
+                if key in missing or key in hits:
+                    continue
+                if self.cache.checkout(key, clip_path(key)):
+                    hits.add(key)
+                else:
+                    missing[key] = scene
+
+            cached = sum(1 for key in keys if key not in missing)
+            print(f"\n🧱 Рендер по сценам: {cached}/{len(scenes)} клипов из кэша")
+
+            # Прогресс - только по сценам, которые действительно рендерятся
+            progress = RenderProgress(count_frames(list(missing.values()), fps), on_progress) if on_progress else None
+
+            if missing:
+                print(f"   🎞️  Рендер {len(missing)} сцен, до {self.max_workers} одновременно")
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    # Потоки - с контекстом задачи: отмена доходит до процессов каждой сцены
+                    futures = [executor.submit(contextvars.copy_context().run, render_scene, key) for key in missing]
+                    for future in futures:
+                        future.result()
+
+            clip_paths = [str(clip_path(key)) for key in keys]
+
+            print(f"\n🔗 Склейка {len(clip_paths)} клипов (без перекодирования)...")
+            concat_clips(clip_paths, audio_path, str(output_abs_path), work_dir / 'clips.txt')
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        removed = self.cache.evict(keep=keys)
+        if removed:
+            print(f"   🧹 Из кэша клипов удалено: {removed}")
+
+        print(f"\n✅ Видео готово: {output_abs_path}")
+        return str(output_abs_path)
@@ -0,0 +1,273 @@
+"""
+Scene Planner - локальная раскадровка сценария без LLM
+Делит сценарий на сцены по границам предложений, оценивает тайминги
+и подбирает визуальное описание каждой сцены по ключевым словам
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from services.text_normalizer import TextNormalizer
+
+
+# Основы слов (ru/en) -> визуальный образ для промпта изображения.
+# Совпадение по началу слова, поэтому 'мозг' ловит 'мозга', 'мозгом' и т.д.
+# Основы не короче MIN_STEM: короткие ловят посторонние слова ('дом' -> 'домашние',
+# 'вод' -> 'водитель'), такие слова перечислены формами в VISUAL_WORD_FORMS.
+VISUAL_KEYWORDS = {
+    # Психология и эмоции
+    'мозг': 'human brain', 'brain': 'human brain',
+    'мысл': 'thought bubbles', 'дума': 'person thinking', 'think': 'person thinking',
+    'страх': 'frightened person in shadows', 'боит': 'frightened person', 'боят': 'frightened person',
+    'fear': 'frightened person in shadows',
+    'тревог': 'anxious person, swirling thoughts', 'anxi': 'anxious person, swirling thoughts',
+    'стресс': 'stressed person holding head', 'stress': 'stressed person holding head',
+    'депресс': 'lonely person under grey cloud', 'depress': 'lonely person under grey cloud',
+    'счаст': 'happy smiling person, warm light', 'радост': 'joyful person', 'happ': 'happy smiling person, warm light',
+    'злост': 'angry person', 'гнев': 'angry person', 'anger': 'angry person',
+    'одиноч': 'lonely person on a bench', 'lonel': 'lonely person on a bench',
+    'любов': 'couple holding hands, heart', 'love': 'couple holding hands, heart',
+    'памят': 'memories as floating photographs', 'memor': 'memories as floating photographs',
+    'sleep': 'person sleeping at night',
+    'привыч': 'daily routine checklist', 'habit': 'daily routine checklist',
+    'мотивац': 'person climbing a mountain', 'motiv': 'person climbing a mountain',
+    'goal': 'target with arrow',
+    'успех': 'person on top of stairs, trophy', 'success': 'person on top of stairs, trophy',
+    'ошибк': 'person looking at a mistake', 'mistak': 'person looking at a mistake',
+    'манипул': 'puppet on strings', 'manipul': 'puppet on strings',
+    'отношен': 'two people talking', 'relationsh': 'two people talking',
+
+    # Люди
+    'ребён': 'child', 'ребен': 'child', 'child': 'child',
+    'родител': 'parents with child', 'parent': 'parents with child',
+    'друзь': 'group of friends', 'друзе': 'group of friends', 'friend': 'group of friends',
+    'учён': 'scientist in laboratory', 'учены': 'scientist in laboratory', 'scientist': 'scientist in laboratory',
+    'врач': 'doctor', 'doctor': 'doctor',
+    'people': 'crowd of people',
+    'мужчин': 'man', 'женщин': 'woman',
+
+    # Наука и знания
+    'исследован': 'research charts and papers', 'research': 'research charts and papers',
+    'эксперимент': 'scientific experiment', 'experiment': 'scientific experiment',
+    'статистик': 'statistics chart', 'процент': 'percentage chart', 'percent': 'percentage chart',
+    'книг': 'stack of books', 'book': 'stack of books',
+    'школ': 'classroom', 'school': 'classroom', 'университет': 'university campus',
+    'истори': 'old historical scene', 'histor': 'old historical scene',
+
+    # Деньги и работа
+    'деньг': 'money and coins', 'денег': 'money and coins', 'money': 'money and coins',
+    'бизнес': 'business meeting', 'business': 'business meeting',
+    'работ': 'person working at a desk', 'work': 'person working at a desk',
+    'офис': 'office interior', 'office': 'office interior',
+    'компьютер': 'computer screen', 'computer': 'computer screen',
+    'телефон': 'smartphone in hand', 'смартфон': 'smartphone in hand', 'phone': 'smartphone in hand',
+    'соцсет': 'social media feed', 'social': 'social media feed',
+    'часы': 'clock', 'clock': 'clock',
+
+    # Места и природа
+    'home': 'cozy home interior', 'house': 'house',
+    'город': 'city skyline', 'city': 'city skyline',
+    'природ': 'nature landscape', 'nature': 'nature landscape',
+    'forest': 'forest', 'морск': 'sea waves', 'океан': 'ocean', 'ocean': 'ocean',
+    'mountain': 'mountains',
+    'солнц': 'sunrise', 'night': 'night sky with stars',
+    'космос': 'outer space, planets', 'space': 'outer space, planets',
+    'путь': 'winding path', 'road': 'road to the horizon',
+
+    # Здоровье
+    'здоров': 'healthy lifestyle', 'health': 'healthy lifestyle',
+    'спорт': 'person exercising', 'sport': 'person exercising', 'exercis': 'person exercising',
+    'food': 'healthy food on a table',
+    'water': 'glass of water',
+    'сердц': 'heart', 'heart': 'heart',
+}
+
+# Короткие или многозначные слова - только перечисленные формы ('друг', но не 'другой';
+# 'дорога', но не 'дорогой'; 'горы', но не 'город' и 'горе')
+VISUAL_WORD_FORMS = {
+    'person sleeping at night': ('сон', 'сна', 'сну', 'сном', 'сне', 'сны', 'снов'),
+    'target with arrow': ('цель', 'цели', 'целью', 'целей', 'целям', 'целями'),
+    'child': ('дети', 'детей', 'детям', 'детьми', 'детях'),
+    'two friends': ('друг', 'друга', 'другу', 'другом', 'друге'),
+    'crowd of people': ('люди', 'людей', 'людям', 'людьми', 'людях'),
+    'cozy home interior': ('дом', 'дома', 'дому', 'домом', 'доме', 'домой'),
+    'forest': ('лес', 'леса', 'лесу', 'лесом', 'лесе', 'лесов'),
+    'sea waves': ('море', 'моря', 'морю', 'морем', 'морей'),
+    'mountains': ('гора', 'горы', 'гор', 'гору', 'горой', 'горах', 'горам'),
+    'sunrise': ('sun', 'sunny', 'sunlight', 'sunrise'),
+    'night sky with stars': ('ночь', 'ночи', 'ночью', 'ночей'),
+    'road to the horizon': ('дорога', 'дороги', 'дороге', 'дорогу', 'дорог'),
+    'healthy food on a table': ('еда', 'еды', 'еде', 'еду', 'едой'),
+    'glass of water': ('вода', 'воды', 'воде', 'воду', 'водой'),
+}
+
+VISUAL_WORDS = {form: visual for visual, forms in VISUAL_WORD_FORMS.items() for form in forms}
+
+MIN_STEM = 4
+
+# Стоп-основы: слова, которые начинаются с визуальной основы, но образа не несут
+NON_VISUAL_WORDS = ('здорово', 'страхов', 'работоспособ', 'памятк')
+
+_MAX_STEM = max(len(stem) for stem in VISUAL_KEYWORDS)
+
+# Слова-маркеры смены темы: с них лучше начинать новую сцену
+SCENE_BREAK_MARKERS = ('во-первых', 'во-вторых', 'в-третьих', 'однако', 'но ', 'итак', 'например', 'first', 'second', 'however', 'for example')
+
+
+class ScenePlanner:
+    """
+    Планировщик сцен для генерации изображений
+
+    Работает детерминированно и за миллисекунды: сцены - группы соседних
+    предложений длительностью около 60 / images_per_minute секунд,
+    тайминги - по скорости речи (или по реальным длительностям фрагментов TTS),
+    описание - по словарю визуальных ключевых слов.
+    """
+
+    _WORD = re.compile(r'\w+(?:-\w+)*')
+
+    def __init__(self, language: str = 'ru', words_per_second: float = 2.5):
+        """
+        Args:
+            language: Язык сценария
+            words_per_second: Скорость речи диктора (2.5 слова/сек ≈ 150 слов/мин)
+        """
+        self.language = language
+        self.words_per_second = words_per_second
+        self._splitter = TextNormalizer(language=language)
+
+    def plan(
+        self,
+        script: str,
+        images_per_minute: int = 15,
+        sentence_durations: Optional[List[float]] = None,
+        total_duration: Optional[float] = None
+    ) -> List[Dict]:
+        """
+        Раскадровка сценария
+
+        Args:
+            script: Текст сценария
+            images_per_minute: Сколько изображений на минуту ролика
+            sentence_durations: Реальные длительности предложений (сек), например
+                по фрагментам TTS из normalize_sentences - точнее оценки по словам
+            total_duration: Реальная длительность озвучки (сек) - оценки
+                масштабируются так, чтобы сцены покрыли её целиком
+
+        Returns:
+            Список сцен: prompt, timestamp, duration, scene_description, text
+        """
+        sentences = [script[start:end] for start, end in self._splitter.split_sentences(script)]
+        if not sentences:
+            return []
+
+        durations = self._sentence_durations(sentences, sentence_durations, total_duration)
+        target = 60.0 / max(1, images_per_minute)
+
+        scenes = []
+        timestamp = 0.0
+
+        for group in self._group_sentences(sentences, durations, target):
+            text = ' '.join(sentences[i] for i in group)
+            duration = sum(durations[i] for i in group)
+            description = self.describe(text)
+
+            scenes.append({
+                'prompt': description,
+                'timestamp': round(timestamp, 2),
+                'duration': round(duration, 2),
+                'scene_description': description,
+                'text': text
+            })
+            timestamp += duration
+
+        return scenes
+
+    def describe(self, text: str) -> str:
+        """
+        Визуальное описание сцены по ключевым словам
+
+        Образы берутся в порядке появления в тексте (максимум 3);
+        если ничего не нашлось - нейтральная метафорическая сцена.
+        """
+        visuals = []
+
+        for word in self._WORD.findall(text.lower()):
+            if len(visuals) == 3:
+                break
+            if word.startswith(NON_VISUAL_WORDS):
+                continue
+
+            visual = self._match_keyword(word)
+            if visual and visual not in visuals:
+                visuals.append(visual)
+
+        if not visuals:
+            return 'person reflecting, symbolic abstract background'
+
+        return ', '.join(visuals)
+
+    def _match_keyword(self, word: str) -> Optional[str]:
+        """Форма из VISUAL_WORDS или самая длинная основа из VISUAL_KEYWORDS, с которой начинается слово"""
+        if word in VISUAL_WORDS:
+            return VISUAL_WORDS[word]
+
+        for length in range(min(len(word), _MAX_STEM), MIN_STEM - 1, -1):
+            visual = VISUAL_KEYWORDS.get(word[:length])
+            if visual:
+                return visual
+        return None
+
+    def _sentence_durations(
+        self,
+        sentences: List[str],
+        sentence_durations: Optional[List[float]],
+        total_duration: Optional[float]
+    ) -> List[float]:
+        """Длительность каждого предложения (сек)"""
+        if sentence_durations and len(sentence_durations) == len(sentences):
+            durations = list(sentence_durations)
+        else:
+            if sentence_durations:
+                print(f"   ⚠️  Длительностей {len(sentence_durations)}, предложений {len(sentences)} - оцениваю по словам")
+            durations = [
+                max(1, len(self._WORD.findall(sentence))) / self.words_per_second
+                for sentence in sentences
+            ]
+
+        if total_duration:
+            scale = total_duration / sum(durations)
+            durations = [duration * scale for duration in durations]
+
+        return durations
+
+    def _group_sentences(self, sentences: List[str], durations: List[float], target: float) -> List[List[int]]:
+        """
+        Жадная группировка предложений в сцены длительностью ~target
+
+        Сцена закрывается, когда набрала target, или раньше (от 0.6 target),
+        если следующее предложение начинает новую мысль ('Однако', 'Например'...).
+        Длинное предложение остаётся одной сценой - резать посреди фразы нельзя.
+        """
+        groups = []
+        current: List[int] = []
+        current_duration = 0.0
+
+        for i, sentence in enumerate(sentences):
+            starts_new_thought = sentence.lower().startswith(SCENE_BREAK_MARKERS)
+
+            if current and (
+                current_duration >= target
+                or (starts_new_thought and current_duration >= target * 0.6)
+                or current_duration + durations[i] > target * 1.5
+            ):
+                groups.append(current)
+                current, current_duration = [], 0.0
+
+            current.append(i)
+            current_duration += durations[i]
+
+        if current:
+            groups.append(current)
+
+        return groups
@@ -4,17 +4,28 @@ Script Generator - генерация YouTube сценариев
 """
 
 import os
-from typing import Dict, List, Optional
+import re
+import json
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 import time
 import httpx
 
 # Новая библиотека Gemini
-from google import genai
 from google.genai import types
 
 # OpenAI для fallback
 from openai import OpenAI
 
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.provider_router import ProviderRouter
+from services.gemini_pool import GeminiClientPool
+from services.ollama_session import get_ollama_session
+from services.script_stream import ScriptStreamParser, parse_titles
+from services.scene_planner import ScenePlanner
+from services.token_budget import TokenBudgetEstimator, current_output, expected_output
+from utils.cache import YouTubeCache
+
 class ScriptGeneratorError(Exception):
     """Ошибка генерации скрипта"""
     pass
@@ -22,24 +33,66 @@ class ScriptGeneratorError(Exception):
 class ScriptGenerator:
     """Генератор YouTube сценариев"""
 
-    def __init__(self, api_key_manager, provider: str = 'gemini'):
+    # Лучшие бесплатные модели Hugging Face для генерации текста
+    HF_MODELS = [
+        "meta-llama/Llama-3.1-8B-Instruct",      # Быстрая и умная
+        "Qwen/Qwen2.5-72B-Instruct",             # Очень умная
+        "mistralai/Mistral-7B-Instruct-v0.3"     # Надёжная
+    ]
+
+    # С какой длины (слов) сценарий пишется по плану: план + разделы параллельно
+    LONG_FORM_WORDS = 2500
+
+    # Примерный объём одного раздела длинного сценария (слов)
+    LONG_FORM_SECTION_WORDS = 450
+
+    # Сколько слов сценариев помещается в один ответ при упаковке нескольких тем
+    BATCH_OUTPUT_WORDS = 1200
+
+    # Служебные слова на одну тему в пакете (hook, CTA, заголовки, разделители)
+    BATCH_TOPIC_OVERHEAD_WORDS = 80
+
+    # Служебные слова обычного сценария сверх target_length (hook, CTA, заголовки, подзаголовки)
+    SCRIPT_OVERHEAD_WORDS = 150
+
+    OLLAMA_CONNECT_HELP = (
+        "Не удалось подключиться к Ollama!\n"
+        "Убедитесь что:\n"
+        "1. Ollama установлена: brew install ollama\n"
+        "2. Сервер запущен: ollama serve\n"
+        "3. Модель скачана: ollama pull llama3.1:8b"
+    )
+
+    def __init__(
+        self,
+        api_key_manager,
+        provider: str = 'gemini',
+        cache_ttl: int = 24 * 3600,
+        cache_db: Optional[str] = "script_cache.db"
+    ):
         """
         Args:
             api_key_manager: SafeAPIManager instance
             provider: 'gemini' или 'openai'
+            cache_ttl: Время жизни кэша сценариев в секундах (по умолчанию сутки)
+            cache_db: Путь к БД кэша сценариев (None - без кэша)
         """
         self.key_manager = api_key_manager
         self.provider = provider.lower()
 
+        self.gemini_pool = None
+
         # Gemini setup (новая библиотека)
         if self.provider == 'gemini':
             gemini_key = self.key_manager.get_gemini_key()
             if not gemini_key:
                 raise ScriptGeneratorError("Нет доступных Gemini API ключей")
 
-            self.client = genai.Client(api_key=gemini_key)
+            # Пул клиентов по всем ключам: запросы идут на наименее загруженный
+            self.gemini_pool = GeminiClientPool(getattr(self.key_manager, 'gemini_keys', None) or [gemini_key])
+            self.client = self.gemini_pool.client_for(gemini_key)
             self.model_id = 'gemini-2.0-flash-exp'
-            print(f"✅ ScriptGenerator: используется Gemini 2.0 Flash")
+            print(f"✅ ScriptGenerator: используется Gemini 2.0 Flash ({len(self.gemini_pool.keys)} ключей)")
 
         # OpenAI setup (fallback)
         elif self.provider == 'openai':
@@ -53,6 +106,24 @@ class ScriptGenerator:
         else:
             raise ScriptGeneratorError(f"Неизвестный provider: {provider}")
 
+        # Предохранители по провайдерам/моделям (состояние переживает перезапуск)
+        self.circuit_breakers = CircuitBreakerRegistry()
+
+        # Порядок провайдеров по EWMA задержки и успехов
+        self.router = ProviderRouter()
+
+        # Лимит токенов ответа по запрошенной длине (вместо фиксированных 3000-4000)
+        self.token_budget = TokenBudgetEstimator()
+
+        # Общая сессия Ollama: прогрев, keep_alive, постоянный HTTP клиент
+        self.ollama = get_ollama_session()
+
+        # Кэш готовых сценариев: повтор после ошибки на поздних этапах - без запроса к LLM
+        self.script_cache = YouTubeCache(cache_db) if cache_db else None
+        self.cache_ttl = cache_ttl
+        if self.script_cache:
+            self.script_cache.clear_expired()
+
     async def _generate_with_ollama(self, prompt: str) -> str:
         """
         Генерация через локальную Ollama модель
@@ -66,52 +137,155 @@ class ScriptGenerator:
         print("   🖥️ Генерация через локальную Ollama (Llama 3.1 8B)...")
 
         try:
-            # Ollama API endpoint (локальный)
-            url = "http://localhost:11434/api/generate"
-
-            payload = {
-                "model": "llama3.1:8b",
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "num_predict": 4000,  # Максимум токенов
-                }
-            }
-
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(url, json=payload)
+            # Ollama API endpoint (локальный), клиент переиспользуется между запросами
+            payload = self._ollama_payload(prompt, stream=False)
+            response = await self.ollama.client().post('/api/generate', json=payload)
 
-                if response.status_code == 200:
-                    result = response.json()
-                    generated_text = result.get('response', '')
+            if response.status_code == 200:
+                result = response.json()
+                generated_text = result.get('response', '')
 
-                    if generated_text:
-                        print(f"   ✅ Ollama сгенерировала {len(generated_text)} символов")
-                        return generated_text
-                    else:
-                        raise Exception("Ollama вернула пустой ответ")
+                if generated_text:
+                    print(f"   ✅ Ollama сгенерировала {len(generated_text)} символов")
+                    return generated_text
                 else:
-                    raise Exception(f"Ollama API error: {response.status_code}")
+                    raise Exception("Ollama вернула пустой ответ")
+            else:
+                raise Exception(f"Ollama API error: {response.status_code}")
 
         except httpx.ConnectError:
-            raise Exception(
-                "Не удалось подключиться к Ollama!\n"
-                "Убедитесь что:\n"
-                "1. Ollama установлена: brew install ollama\n"
-                "2. Сервер запущен: ollama serve\n"
-                "3. Модель скачана: ollama pull llama3.1:8b"
-            )
+            raise Exception(self.OLLAMA_CONNECT_HELP)
         except Exception as e:
             raise Exception(f"Ошибка Ollama: {str(e)}")
 
-    async def generate_script(
+    async def _stream_with_ollama(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Потоковая генерация через Ollama: фрагменты текста по мере готовности
+
+        Ollama отдаёт NDJSON - по строке на фрагмент, последняя с "done": true
+        """
+
+        print("   🖥️ Потоковая генерация через локальную Ollama (Llama 3.1 8B)...")
+
+        payload = self._ollama_payload(prompt, stream=True)
+        received = 0
+
+        try:
+            async with self.ollama.client().stream('POST', '/api/generate', json=payload) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Ollama API error: {response.status_code}")
+
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+
+                    data = json.loads(line)
+                    if data.get('error'):
+                        raise Exception(data['error'])
+
+                    fragment = data.get('response', '')
+                    if fragment:
+                        received += len(fragment)
+                        yield fragment
+
+                    if data.get('done'):
+                        break
+
+        except httpx.ConnectError:
+            raise Exception(self.OLLAMA_CONNECT_HELP)
+
+        if not received:
+            raise Exception("Ollama вернула пустой ответ")
+
+        print(f"   ✅ Ollama сгенерировала {received} символов")
+
+    def _max_tokens(self, model: str, default: int) -> int:
+        """
+        Лимит ответа для модели по объёму текущего запроса (см. expected_output)
+
+        Вне expected_output (произвольный вызов провайдера) - прежний default.
+        """
+        output = current_output()
+        if output is None:
+            return default
+
+        target_words, language, extra_words = output
+        return self.token_budget.estimate(target_words, language, model, extra_words=extra_words)
+
+    def _ollama_payload(self, prompt: str, stream: bool) -> Dict:
+        """Параметры запроса к Ollama /api/generate (keep_alive - из сессии)"""
+        return self.ollama.generate_payload(prompt, stream=stream, options={
+            "temperature": 0.7,
+            "num_predict": self._max_tokens(self.ollama.model, 4000),  # Максимум токенов
+        })
+
+    async def stream_script(
         self,
         topic: str,
         target_length: int = 1000,
         language: str = 'ru',
         niche: str = 'psychology',
         use_ollama: bool = True
+    ) -> AsyncIterator[Dict]:
+        """
+        Потоковая генерация сценария: события по мере готовности текста
+
+        Пример:
+            async for event in generator.stream_script(topic):
+                if event['type'] == 'sentence' and event['section'] == 'hook':
+                    ...  # можно начинать озвучку / промпты для первых сцен
+                elif event['type'] == 'done':
+                    script = event['result']
+
+        События - см. generate_script(on_event=...). Последнее событие - 'done'.
+
+        Raises:
+            ScriptGeneratorError: Если все провайдеры недоступны
+        """
+
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        async def produce():
+            try:
+                await self.generate_script(
+                    topic=topic,
+                    target_length=target_length,
+                    language=language,
+                    niche=niche,
+                    use_ollama=use_ollama,
+                    on_event=queue.put_nowait
+                )
+            finally:
+                queue.put_nowait(finished)
+
+        task = asyncio.create_task(produce())
+
+        try:
+            while True:
+                event = await queue.get()
+                if event is finished:
+                    break
+                yield event
+        finally:
+            if not task.done():
+                task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        # Ошибку генерации отдаём потребителю
+        task.result()
+
+    async def generate_script(
+        self,
+        topic: str,
+        target_length: int = 1000,
+        language: str = 'ru',
+        niche: str = 'psychology',
+        use_ollama: bool = True,
+        race: bool = False,
+        on_event: Optional[Callable[[Dict], None]] = None,
+        use_cache: bool = True,
+        long_form: Optional[bool] = None
     ) -> Dict:
         """
         Генерация сценария с приоритетом на Ollama
@@ -123,103 +297,359 @@ class ScriptGenerator:
         4. Gemini 2.0 Flash
         5. OpenAI GPT-4o-mini
 
+        Это приоритет по умолчанию: по мере накопления статистики ProviderRouter
+        переставляет провайдеров по ожидаемому времени до успеха.
+        Провайдер/модель, упавшие несколько раз подряд, пропускаются до конца
+        cooldown (circuit breaker, состояние в .circuit_breakers.json).
+
         Args:
             topic: Тема видео
             target_length: Целевая длина в словах
             language: Язык ('ru' или 'en')
             niche: Ниша
             use_ollama: Использовать локальную Ollama (по умолчанию True)
+            race: Запустить два лучших провайдера одновременно и взять первый валидный ответ
+            on_event: Callback потокового режима. Получает события по мере генерации:
+                - {'type': 'sentence', 'section', 'index', 'text'} - готовое предложение hook/script/cta
+                - {'type': 'section', 'section', 'text'} - готовая секция (для titles ещё 'titles')
+                - {'type': 'reset', 'provider', 'error'} - провайдер упал посреди ответа,
+                  всё полученное ранее нужно отбросить (дальше пойдёт следующий провайдер)
+                - {'type': 'done', 'result'} - итоговый сценарий
+                Гонка в потоковом режиме не используется.
+            use_cache: Брать готовый сценарий из кэша (False - сгенерировать заново,
+                результат всё равно перезапишет кэш)
+            long_form: Писать по плану с параллельными разделами (generate_long_script).
+                None - автоматически, начиная с LONG_FORM_WORDS слов
 
         Returns:
             Dict с ключами: hook, script, cta, title_suggestions, word_count, provider, model
         """
 
+        if long_form is None:
+            long_form = target_length >= self.LONG_FORM_WORDS and on_event is None
+
+        if long_form:
+            return await self.generate_long_script(
+                topic=topic,
+                target_length=target_length,
+                language=language,
+                niche=niche,
+                use_ollama=use_ollama,
+                use_cache=use_cache
+            )
+
         prompt = self._build_prompt(topic, target_length, language, niche)
 
-        # Пробуем провайдеры по порядку: Ollama -> HF -> Groq -> Gemini -> OpenAI
-        errors = []
+        # Лимит ответа каждого провайдера - по target_length (см. _max_tokens)
+        with expected_output(target_length, language, extra_words=self.SCRIPT_OVERHEAD_WORDS):
+            # Пробуем провайдеры по порядку (адаптивному, см. ProviderRouter)
+            errors = []
+            pending = self.router.order(self._get_provider_candidates(use_ollama))
+
+            if use_cache:
+                cached = self._get_cached_script(prompt, pending, on_event)
+                if cached:
+                    return cached
+
+            # Гонка: два лучших провайдера параллельно, первый валидный ответ побеждает
+            if race and on_event is None:
+                racers = self._take_allowed(pending, 2, errors)
+                if racers:
+                    result = await self._race(racers, prompt, errors)
+                    if result:
+                        return result
+
+            while pending:
+                racers = self._take_allowed(pending, 1, errors)
+                if not racers:
+                    break
+
+                try:
+                    return await self._attempt(racers[0], prompt, on_event=on_event)
+                except Exception as e:
+                    print(f"⚠️  {racers[0]['name']} failed: {e}")
+                    errors.append(f"{racers[0]['name']}: {e}")
+
+            # Все провайдеры упали
+            raise ScriptGeneratorError(f"Все API провайдеры недоступны:\n" + "\n".join(errors))
+
+    def _take_allowed(self, pending: List[Dict], count: int, errors: List[str]) -> List[Dict]:
+        """
+        Забирает из pending до count кандидатов с замкнутым предохранителем
 
-        # 0. Попытка через Ollama (если включена)
-        if use_ollama:
-            try:
-                print("🖥️ Пробуем Ollama (локальная Llama 3.1 8B)...")
-                content = await self._generate_with_ollama(prompt)
-                result = self._parse_response(content)
-                result['word_count'] = len(result['script'].split())
-                result['provider'] = 'ollama'
-                result['model'] = 'llama3.1:8b'
-                print("✅ Скрипт сгенерирован через Ollama (БЕСПЛАТНО!)")
-                return result
-            except Exception as e:
-                print(f"⚠️  Ollama не доступна: {e}")
-                print(f"   🔄 Переключаемся на облачные API...")
-                errors.append(f"Ollama: {e}")
+        Кандидаты с разомкнутым предохранителем выбрасываются с пометкой в errors.
+        """
+        taken = []
 
-        # 1. Попытка через Hugging Face (БЕСПЛАТНО! 125 ключей!)
-        try:
-            print("🤗 Пробуем Hugging Face API (Llama 3.1 / Qwen / Mistral)...")
-            content = await self._generate_with_huggingface(prompt)
-            result = self._parse_response(content)
-            result['word_count'] = len(result['script'].split())
-            result['provider'] = 'huggingface'
-            result['model'] = 'llama-3.1-8b'
-            print("✅ Скрипт сгенерирован через Hugging Face")
-            return result
-        except Exception as e:
-            print(f"⚠️  Hugging Face failed: {e}")
-            errors.append(f"Hugging Face: {e}")
+        while pending and len(taken) < count:
+            candidate = pending.pop(0)
+            breaker = self.circuit_breakers.get(candidate['key'])
 
-        # 2. Попытка через Groq (бесплатно)
-        try:
-            print("🚀 Пробуем Groq API (Llama 3.1 70B)...")
-            content = await self._generate_with_groq(prompt)
-            result = self._parse_response(content)
-            result['word_count'] = len(result['script'].split())
-            result['provider'] = 'groq'
-            result['model'] = 'llama-3.1-70b'
-            print("✅ Скрипт сгенерирован через Groq")
-            return result
-        except Exception as e:
-            print(f"⚠️  Groq failed: {e}")
-            errors.append(f"Groq: {e}")
+            # Провайдер недавно падал подряд - не ждём его таймаут снова
+            if not breaker.allow_request():
+                print(f"⏭️  {candidate['name']}: circuit open, пропускаем (ещё {breaker.seconds_until_retry()}s)")
+                errors.append(f"{candidate['name']}: circuit open ({breaker.last_error})")
+                continue
+
+            taken.append(candidate)
+
+        return taken
+
+    async def _attempt(
+        self,
+        candidate: Dict,
+        prompt: str,
+        on_event: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Одна попытка генерации: вызов провайдера + парсинг
+
+        Результат учитывается в предохранителе и статистике роутера.
+
+        Raises:
+            Exception: Ошибка провайдера или невалидный ответ
+        """
+        breaker = self.circuit_breakers.get(candidate['key'])
+        start_time = time.time()
+        parser = ScriptStreamParser() if on_event else None
 
-        # 3. Попытка через Gemini
         try:
-            print("🔄 Пробуем Gemini API (Gemini 2.0 Flash)...")
-            content = await self._generate_with_gemini(prompt)
+            print(f"{candidate['emoji']} Пробуем {candidate['name']}...")
+            if parser:
+                content = await self._generate_streaming(candidate, prompt, parser, on_event)
+            else:
+                content = await candidate['generate'](prompt)
             result = self._parse_response(content)
-            result['word_count'] = len(result['script'].split())
-            result['provider'] = 'gemini'
-            result['model'] = 'gemini-2.0-flash'
-            print("✅ Скрипт сгенерирован через Gemini")
-            return result
+        except asyncio.CancelledError:
+            breaker.record_cancelled()
+            raise
         except Exception as e:
-            print(f"⚠️  Gemini failed: {e}")
-            errors.append(f"Gemini: {e}")
+            breaker.record_failure(e)
+            self.router.record(candidate['key'], time.time() - start_time, success=False)
+            if parser and parser.events_emitted:
+                on_event({'type': 'reset', 'provider': candidate['provider'], 'error': str(e)})
+            raise
+
+        breaker.record_success()
+        self.router.record(candidate['key'], time.time() - start_time, success=True)
+
+        result['word_count'] = len(result['script'].split())
+        result['provider'] = candidate['provider']
+        result['model'] = candidate['model']
+
+        # Фактическая длина уточняет следующие лимиты токенов этой модели
+        output = current_output()
+        if output:
+            target_words, language, _ = output
+            self.token_budget.observe(candidate['model'], language, target_words, result['word_count'])
+        print(f"✅ Скрипт сгенерирован через {candidate['name']} ({time.time() - start_time:.1f}s)")
+
+        if self.script_cache:
+            self.script_cache.set(self._script_cache_key(prompt, candidate), result, ttl=self.cache_ttl)
+
+        if on_event:
+            for event in parser.close():
+                on_event(event)
+            on_event({'type': 'done', 'result': result})
+
+        return result
+
+    def _script_cache_key(self, prompt: str, candidate: Dict) -> str:
+        """Ключ кэша: хэш готового промпта + провайдер + модель"""
+        return self.script_cache._generate_key(
+            'script',
+            prompt=prompt,
+            provider=candidate['provider'],
+            model=candidate['model']
+        )
+
+    def _get_cached_script(
+        self,
+        prompt: str,
+        candidates: List[Dict],
+        on_event: Optional[Callable[[Dict], None]] = None
+    ) -> Optional[Dict]:
+        """
+        Ищет сценарий для этого промпта от любого из кандидатов (в порядке попыток)
+
+        В потоковом режиме события восстанавливаются из сохранённых секций.
+
+        Returns:
+            Распарсенный сценарий или None
+        """
+        if not self.script_cache:
+            return None
+
+        for candidate in candidates:
+            cached = self.script_cache.get(self._script_cache_key(prompt, candidate))
+            if not cached:
+                continue
+
+            print(f"⚡ Сценарий из кэша ({candidate['name']}), запрос к LLM не нужен")
+
+            if on_event:
+                parser = ScriptStreamParser()
+                content = (
+                    f"[HOOK]\n{cached['hook']}\n[SCRIPT]\n{cached['script']}\n"
+                    f"[CTA]\n{cached['cta']}\n[TITLES]\n" + '\n'.join(cached['title_suggestions'])
+                )
+                for event in parser.feed(content) + parser.close():
+                    on_event(event)
+                on_event({'type': 'done', 'result': cached})
+
+            return cached
+
+        return None
+
+    async def _generate_streaming(
+        self,
+        candidate: Dict,
+        prompt: str,
+        parser: ScriptStreamParser,
+        on_event: Callable[[Dict], None]
+    ) -> str:
+        """
+        Генерация с разбором по мере поступления текста
+
+        Провайдеры без потокового API ('stream' в кандидате) отдают
+        весь ответ одним фрагментом - события приходят сразу после ответа.
+
+        Returns:
+            Полный текст ответа
+        """
+        chunks = []
+
+        if candidate.get('stream'):
+            async for chunk in candidate['stream'](prompt):
+                chunks.append(chunk)
+                for event in parser.feed(chunk):
+                    on_event(event)
+        else:
+            content = await candidate['generate'](prompt)
+            chunks.append(content)
+            for event in parser.feed(content):
+                on_event(event)
+
+        return ''.join(chunks)
+
+    async def _race(self, racers: List[Dict], prompt: str, errors: List[str]) -> Optional[Dict]:
+        """
+        Запускает кандидатов одновременно, возвращает первый валидный сценарий
+
+        Проигравшие запросы отменяются. Если упали все - None.
+        """
+        if len(racers) > 1:
+            print(f"🏁 Гонка: {' vs '.join(c['name'] for c in racers)}")
+
+        tasks = {asyncio.create_task(self._attempt(candidate, prompt)): candidate for candidate in racers}
+        running = set(tasks)
 
-        # 4. Попытка через OpenAI (последний fallback)
         try:
-            print("🔄 Пробуем OpenAI API (GPT-4o-mini)...")
-            openai_key = os.getenv('OPENAI_API_KEY')
-            if not openai_key:
-                raise ValueError("OPENAI_API_KEY не найден в .env")
+            while running:
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
 
-            content = await self._generate_with_openai_direct(prompt, openai_key)
-            result = self._parse_response(content)
-            result['word_count'] = len(result['script'].split())
-            result['provider'] = 'openai'
-            result['model'] = 'gpt-4o-mini'
-            print("✅ Скрипт сгенерирован через OpenAI")
-            return result
-        except Exception as e:
-            print(f"⚠️  OpenAI failed: {e}")
-            errors.append(f"OpenAI: {e}")
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
 
-        # Все провайдеры упали
-        raise ScriptGeneratorError(f"Все API провайдеры недоступны:\n" + "\n".join(errors))
+                    candidate = tasks[task]
+                    print(f"⚠️  {candidate['name']} failed: {task.exception()}")
+                    errors.append(f"{candidate['name']}: {task.exception()}")
+        finally:
+            # Проигравшие - и все участники, если отменили саму гонку: запросы не остаются висеть
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        return None
+
+    def _get_provider_candidates(self, use_ollama: bool = True) -> List[Dict]:
+        """
+        Провайдеры и модели в порядке приоритета
 
-    async def _generate_with_huggingface(self, prompt: str) -> str:
-        """Генерация через Hugging Face Inference API (БЕСПЛАТНО!)"""
+        Каждая модель Hugging Face - отдельный кандидат со своим предохранителем.
+
+        Returns:
+            Список словарей: key (имя предохранителя), name, emoji, provider, model, generate
+            и, если провайдер умеет отдавать текст потоком, stream
+        """
+
+        candidates = []
+
+        # 0. Ollama (локально, бесплатно)
+        if use_ollama:
+            candidates.append({
+                'key': 'ollama:llama3.1:8b',
+                'name': 'Ollama (Llama 3.1 8B)',
+                'emoji': '🖥️',
+                'provider': 'ollama',
+                'model': 'llama3.1:8b',
+                'generate': self._generate_with_ollama,
+                'stream': self._stream_with_ollama
+            })
+
+        # 1. Hugging Face (БЕСПЛАТНО! 125 ключей!)
+        for hf_model in self.HF_MODELS:
+            short_name = hf_model.split('/')[-1]
+            candidates.append({
+                'key': f'huggingface:{hf_model}',
+                'name': f'Hugging Face ({short_name})',
+                'emoji': '🤗',
+                'provider': 'huggingface',
+                'model': short_name.lower(),
+                'generate': lambda prompt, model=hf_model: self._generate_with_huggingface(prompt, models=[model])
+            })
+
+        # 2. Groq (бесплатно)
+        candidates.append({
+            'key': 'groq:llama-3.1-70b-versatile',
+            'name': 'Groq (Llama 3.1 70B)',
+            'emoji': '🚀',
+            'provider': 'groq',
+            'model': 'llama-3.1-70b',
+            'generate': self._generate_with_groq,
+            'stream': self._stream_with_groq
+        })
+
+        # 3. Gemini
+        candidates.append({
+            'key': f"gemini:{getattr(self, 'model_id', 'gemini-2.0-flash-exp')}",
+            'name': 'Gemini (Gemini 2.0 Flash)',
+            'emoji': '🔄',
+            'provider': 'gemini',
+            'model': 'gemini-2.0-flash',
+            'generate': self._generate_with_gemini,
+            'stream': self._stream_with_gemini
+        })
+
+        # 4. OpenAI (последний fallback)
+        candidates.append({
+            'key': 'openai:gpt-4o-mini',
+            'name': 'OpenAI (GPT-4o-mini)',
+            'emoji': '🔄',
+            'provider': 'openai',
+            'model': 'gpt-4o-mini',
+            'generate': self._generate_with_openai_fallback
+        })
+
+        return candidates
+
+    async def _generate_with_openai_fallback(self, prompt: str) -> str:
+        """OpenAI с ключом из .env (последний fallback)"""
+        openai_key = os.getenv('OPENAI_API_KEY')
+        if not openai_key:
+            raise ValueError("OPENAI_API_KEY не найден в .env")
+
+        return await self._generate_with_openai_direct(prompt, openai_key)
+
+    async def _generate_with_huggingface(self, prompt: str, models: Optional[List[str]] = None) -> str:
+        """
+        Генерация через Hugging Face Inference API (БЕСПЛАТНО!)
+
+        Args:
+            prompt: Промпт
+            models: Модели по порядку (по умолчанию все HF_MODELS)
+        """
 
         # Детальное логирование для отладки
         print(f"   📊 HF Keys статистика:")
@@ -231,14 +661,10 @@ class ScriptGenerator:
         hf_key = self.key_manager.get_hf_key()
         print(f"      Используется ключ: {hf_key[:8]}...{hf_key[-4:]}")
 
-        # Лучшие бесплатные модели для генерации текста
-        models = [
-            "meta-llama/Llama-3.1-8B-Instruct",      # Быстрая и умная
-            "Qwen/Qwen2.5-72B-Instruct",             # Очень умная
-            "mistralai/Mistral-7B-Instruct-v0.3"     # Надёжная
-        ]
+        models = models or self.HF_MODELS
 
-        print(f"      Пробуем {len(models)} модели по порядку...")
+        if len(models) > 1:
+            print(f"      Пробуем {len(models)} модели по порядку...")
 
         for model in models:
             try:
@@ -252,7 +678,7 @@ class ScriptGenerator:
                 data = {
                     "inputs": prompt,
                     "parameters": {
-                        "max_new_tokens": 4000,
+                        "max_new_tokens": self._max_tokens(model, 4000),
                         "temperature": 0.7,
                         "top_p": 0.9,
                         "return_full_text": False
@@ -290,6 +716,39 @@ class ScriptGenerator:
     async def _generate_with_groq(self, prompt: str) -> str:
         """Генерация через Groq API (Llama 3.1 70B)"""
 
+        url, headers, data = self._groq_request(prompt, stream=False)
+
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            response = await client.post(url, headers=headers, json=data)
+            response.raise_for_status()
+            result = response.json()
+            return result['choices'][0]['message']['content']
+
+    async def _stream_with_groq(self, prompt: str) -> AsyncIterator[str]:
+        """Потоковая генерация через Groq (OpenAI-совместимый SSE: строки 'data: {...}')"""
+
+        url, headers, data = self._groq_request(prompt, stream=True)
+
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            async with client.stream('POST', url, headers=headers, json=data) as response:
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line.startswith('data:'):
+                        continue
+
+                    payload = line[len('data:'):].strip()
+                    if payload == '[DONE]':
+                        break
+
+                    choices = json.loads(payload).get('choices') or [{}]
+                    fragment = choices[0].get('delta', {}).get('content')
+                    if fragment:
+                        yield fragment
+
+    def _groq_request(self, prompt: str, stream: bool):
+        """URL, заголовки и тело запроса к Groq chat completions"""
+
         groq_key = self.key_manager.get_groq_key()
         if not groq_key:
             raise ValueError("Нет доступных Groq API ключей!")
@@ -307,30 +766,50 @@ class ScriptGenerator:
                 {"role": "user", "content": prompt}
             ],
             "temperature": 0.7,
-            "max_tokens": 4000
+            "max_tokens": self._max_tokens("llama-3.1-70b-versatile", 4000),
+            "stream": stream
         }
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            result = response.json()
-            return result['choices'][0]['message']['content']
+        return url, headers, data
 
     async def _generate_with_gemini(self, prompt: str) -> str:
-        """Генерация через новый Gemini API"""
-
-        response = self.client.models.generate_content(
-            model=self.model_id,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.9,
-                max_output_tokens=3000,
-                response_modalities=['TEXT']
+        """Генерация через новый Gemini API (асинхронный клиент из пула ключей)"""
+
+        if not self.gemini_pool:
+            raise ValueError("Gemini не настроен (ScriptGenerator создан с provider='openai')")
+
+        async with self.gemini_pool.client() as client:
+            response = await client.aio.models.generate_content(
+                model=self.model_id,
+                contents=prompt,
+                config=self._gemini_config()
             )
-        )
 
         return response.text
 
+    async def _stream_with_gemini(self, prompt: str) -> AsyncIterator[str]:
+        """Потоковая генерация через Gemini (ключ из пула держится до конца ответа)"""
+
+        if not self.gemini_pool:
+            raise ValueError("Gemini не настроен (ScriptGenerator создан с provider='openai')")
+
+        async with self.gemini_pool.client() as client:
+            stream = await client.aio.models.generate_content_stream(
+                model=self.model_id,
+                contents=prompt,
+                config=self._gemini_config()
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+
+    def _gemini_config(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            temperature=0.9,
+            max_output_tokens=self._max_tokens(self.model_id, 3000),
+            response_modalities=['TEXT']
+        )
+
     async def _generate_with_openai(self, prompt: str) -> str:
         """Генерация через OpenAI"""
 
@@ -341,7 +820,7 @@ class ScriptGenerator:
                 {"role": "user", "content": prompt}
             ],
             temperature=0.9,
-            max_tokens=3000
+            max_tokens=self._max_tokens("gpt-4o-mini", 3000)
         )
 
         return response.choices[0].message.content
@@ -351,18 +830,601 @@ class ScriptGenerator:
 
         client = OpenAI(api_key=api_key)
 
-        response = client.chat.completions.create(
+        # Синхронный клиент - в отдельном потоке, чтобы не блокировать event loop
+        response = await asyncio.to_thread(
+            client.chat.completions.create,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "Ты профессиональный YouTube сценарист."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.9,
-            max_tokens=3000
+            max_tokens=self._max_tokens("gpt-4o-mini", 3000)
         )
 
         return response.choices[0].message.content
 
+    async def generate_image_prompts(
+        self,
+        script: str,
+        style: str = 'minimalist_stick_figure',
+        images_per_minute: int = 15,
+        sentence_durations: Optional[List[float]] = None,
+        total_duration: Optional[float] = None,
+        refine_with_llm: bool = False,
+        use_ollama: bool = True,
+        language: str = 'ru'
+    ) -> List[Dict]:
+        """
+        Промпты изображений для сцен сценария
+
+        Раскадровка строится локально (ScenePlanner) - без запроса к LLM,
+        за миллисекунды и одинаково при повторном запуске.
+
+        Args:
+            script: Текст сценария
+            style: Стиль изображений (применяет ImageGenerator через get_style_prompt)
+            images_per_minute: Сколько изображений на минуту ролика
+            sentence_durations: Реальные длительности предложений из TTS (сек)
+            total_duration: Реальная длительность озвучки (сек)
+            refine_with_llm: Дополнительно переписать промпты одним запросом к LLM
+                (при ошибке остаются локальные промпты)
+            use_ollama: Использовать Ollama для уточнения
+            language: Язык сценария (границы предложений)
+
+        Returns:
+            Список dict: prompt, timestamp, duration, scene_description, text
+        """
+
+        start_time = time.time()
+        scenes = ScenePlanner(language=language).plan(
+            script,
+            images_per_minute=images_per_minute,
+            sentence_durations=sentence_durations,
+            total_duration=total_duration
+        )
+        print(f"🎬 Раскадровка: {len(scenes)} сцен за {(time.time() - start_time) * 1000:.0f} ms (стиль: {style})")
+
+        if refine_with_llm and scenes:
+            await self._refine_image_prompts(scenes, use_ollama)
+
+        return scenes
+
+    async def _refine_image_prompts(self, scenes: List[Dict], use_ollama: bool = True):
+        """
+        Уточняет промпты сцен одним запросом к LLM (на месте)
+
+        Ответ - строки "N. prompt"; сцены без строки в ответе сохраняют локальный промпт.
+        """
+
+        scene_lines = '\n'.join(
+            f"{i}. {scene['text'][:300]} (черновик: {scene['prompt']})"
+            for i, scene in enumerate(scenes, 1)
+        )
+        prompt = (
+            "Для каждой сцены видео напиши короткий промпт для генерации изображения на английском "
+            "(что изображено, без стиля). Ответ строго в формате 'N. prompt', по строке на сцену.\n\n"
+            f"{scene_lines}"
+        )
+
+        try:
+            # Промпт изображения - около 25 английских слов на сцену
+            with expected_output(len(scenes) * 25, 'en'):
+                content, candidate = await self._generate_text(prompt, use_ollama)
+        except ScriptGeneratorError as e:
+            print(f"   ⚠️  Уточнение промптов недоступно, оставляем локальные: {str(e)[:200]}")
+            return
+
+        refined = 0
+        for line in content.split('\n'):
+            number, _, text = line.strip().partition('.')
+            if number.isdigit() and text.strip() and 1 <= int(number) <= len(scenes):
+                scenes[int(number) - 1]['prompt'] = text.strip()
+                refined += 1
+
+        print(f"   ✨ {candidate['name']} уточнил {refined}/{len(scenes)} промптов")
+
+    async def _generate_text(
+        self,
+        prompt: str,
+        use_ollama: bool = True,
+        validate: Optional[Callable[[str], None]] = None,
+        start_offset: int = 0
+    ) -> Tuple[str, Dict]:
+        """
+        Произвольный запрос к цепочке провайдеров (с предохранителями и статистикой)
+
+        Args:
+            prompt: Промпт
+            use_ollama: Использовать Ollama
+            validate: Проверка ответа - исключение считается ошибкой провайдера
+            start_offset: Начать с N-го кандидата (остальные - после, по кругу);
+                параллельные запросы так расходятся по разным провайдерам
+
+        Returns:
+            (текст ответа, кандидат)
+
+        Raises:
+            ScriptGeneratorError: Если все провайдеры недоступны
+        """
+
+        errors = []
+        pending = self.router.order(self._get_provider_candidates(use_ollama))
+        if pending and start_offset:
+            start_offset %= len(pending)
+            pending = pending[start_offset:] + pending[:start_offset]
+
+        while pending:
+            allowed = self._take_allowed(pending, 1, errors)
+            if not allowed:
+                break
+
+            candidate = allowed[0]
+            breaker = self.circuit_breakers.get(candidate['key'])
+            start_time = time.time()
+
+            try:
+                content = await candidate['generate'](prompt)
+                if validate:
+                    validate(content)
+            except asyncio.CancelledError:
+                breaker.record_cancelled()
+                raise
+            except Exception as e:
+                breaker.record_failure(e)
+                self.router.record(candidate['key'], time.time() - start_time, success=False)
+                print(f"⚠️  {candidate['name']} failed: {e}")
+                errors.append(f"{candidate['name']}: {e}")
+                continue
+
+            breaker.record_success()
+            self.router.record(candidate['key'], time.time() - start_time, success=True)
+            return content, candidate
+
+        raise ScriptGeneratorError(f"Все API провайдеры недоступны:\n" + "\n".join(errors))
+
+    async def generate_scripts_batch(
+        self,
+        topics: List[str],
+        target_length: int = 150,
+        language: str = 'ru',
+        niche: str = 'psychology',
+        use_ollama: bool = True,
+        max_parallel: int = 3,
+        use_cache: bool = True
+    ) -> List[Dict]:
+        """
+        Сценарии для нескольких тем с минимумом запросов к LLM
+
+        Короткие сценарии (Shorts) упаковываются по несколько в один запрос
+        (секции каждой темы между разделителями === ВИДЕО N ===), сколько
+        помещается в BATCH_OUTPUT_WORDS. Длинные - отдельными запросами
+        одновременно. Тема, которую не удалось разобрать из общего ответа,
+        догенерируется отдельным запросом.
+
+        Каждый сценарий кладётся в кэш под ключом обычного generate_script,
+        поэтому последующая генерация видео по этим темам не ходит в LLM.
+
+        Args:
+            topics: Темы видео
+            target_length: Целевая длина каждого сценария в словах
+            language: Язык ('ru' или 'en')
+            niche: Ниша
+            use_ollama: Использовать локальную Ollama
+            max_parallel: Сколько запросов выполнять одновременно
+            use_cache: Брать готовые сценарии из кэша
+
+        Returns:
+            Список в порядке topics: dict как у generate_script (+ topic)
+            или {'topic', 'error'} для темы, которую сгенерировать не удалось
+        """
+
+        results: List[Optional[Dict]] = [None] * len(topics)
+        candidates = self.router.order(self._get_provider_candidates(use_ollama))
+
+        # Уже готовые сценарии из кэша
+        pending = []
+        for i, topic in enumerate(topics):
+            prompt = self._build_prompt(topic, target_length, language, niche)
+            cached = self._get_cached_script(prompt, candidates) if use_cache else None
+            if cached:
+                results[i] = {**cached, 'topic': topic}
+            else:
+                pending.append(i)
+
+        per_request = max(1, self.BATCH_OUTPUT_WORDS // (target_length + self.BATCH_TOPIC_OVERHEAD_WORDS))
+        packs = [pending[start:start + per_request] for start in range(0, len(pending), per_request)]
+
+        print(f"📦 Пакетная генерация: {len(topics)} тем, из кэша {len(topics) - len(pending)}, "
+              f"запросов {len(packs)} (до {per_request} тем в запросе)")
+
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def generate_single(i: int):
+            try:
+                result = await self.generate_script(
+                    topics[i], target_length, language, niche, use_ollama, use_cache=False
+                )
+                results[i] = {**result, 'topic': topics[i]}
+            except Exception as e:
+                print(f"   ❌ {topics[i]}: {e}")
+                results[i] = {'topic': topics[i], 'error': str(e)}
+
+        async def generate_pack(pack: List[int]):
+            async with semaphore:
+                if len(pack) == 1:
+                    await generate_single(pack[0])
+                    return
+
+                prompt = self._build_batch_prompt([topics[i] for i in pack], target_length, language, niche)
+
+                try:
+                    with expected_output(
+                        target_length * len(pack),
+                        language,
+                        extra_words=self.BATCH_TOPIC_OVERHEAD_WORDS * len(pack)
+                    ):
+                        content, candidate = await self._generate_text(
+                            prompt,
+                            use_ollama,
+                            validate=lambda text: self._validate_batch_response(text, len(pack))
+                        )
+                    parsed = self._parse_batch_response(content, len(pack))
+                except ScriptGeneratorError as e:
+                    print(f"   ⚠️  Пакет не сгенерирован ({e}), темы пойдут по одной")
+                    parsed, candidate = {}, None
+
+                missing = []
+                for number, i in enumerate(pack, 1):
+                    if number not in parsed:
+                        missing.append(i)
+                        continue
+
+                    result = parsed[number]
+                    result['word_count'] = len(result['script'].split())
+                    result['provider'] = candidate['provider']
+                    result['model'] = candidate['model']
+
+                    if self.script_cache:
+                        single_prompt = self._build_prompt(topics[i], target_length, language, niche)
+                        self.script_cache.set(self._script_cache_key(single_prompt, candidate), result, ttl=self.cache_ttl)
+
+                    results[i] = {**result, 'topic': topics[i]}
+
+                if missing and candidate:
+                    print(f"   ⚠️  {candidate['name']}: не разобрано тем {len(missing)} из {len(pack)}, догенерирую по одной")
+
+            # Догенерация - вне семафора пакета, чтобы не занимать слот дважды
+            for i in missing:
+                async with semaphore:
+                    await generate_single(i)
+
+        await asyncio.gather(*[generate_pack(pack) for pack in packs])
+
+        failed = sum(1 for result in results if 'error' in result)
+        print(f"✅ Пакетная генерация: готово {len(topics) - failed}/{len(topics)}")
+
+        return results
+
+    def _build_batch_prompt(
+        self,
+        topics: List[str],
+        target_length: int,
+        language: str,
+        niche: str
+    ) -> str:
+        """Промпт пакета: несколько тем, у каждой свои [HOOK]/[SCRIPT]/[CTA]/[TITLES]"""
+
+        lang_instruction = "на русском языке" if language == 'ru' else "in English"
+        topic_lines = '\n'.join(f'{i}. "{topic}"' for i, topic in enumerate(topics, 1))
+
+        prompt = f"""
+Создай {len(topics)} отдельных коротких YouTube сценариев {lang_instruction}, по одному на каждую тему:
+{topic_lines}
+
+НИША: {niche}
+ЦЕЛЕВАЯ ДЛИНА КАЖДОГО: ~{target_length} слов
+
+Для КАЖДОЙ темы по порядку выведи блок строго в таком формате:
+
+=== ВИДЕО N ===
+[HOOK]
+(Цепляющий hook на 1-2 предложения)
+[SCRIPT]
+(Основной сценарий ~{target_length} слов)
+[CTA]
+(Призыв к действию в одно предложение)
+[TITLES]
+(3 варианта заголовков)
+
+где N - номер темы из списка. Не объединяй темы и не пропускай их.
+
+ВАЖНО:
+- Пиши разговорным языком
+- Используй короткие предложения
+- Избегай сложных терминов
+"""
+
+        return prompt.strip()
+
+    def _parse_batch_response(self, content: str, count: int) -> Dict[int, Dict]:
+        """
+        Разбор ответа пакета по разделителям === ВИДЕО N ===
+
+        Блоки с неверным номером или без сценария пропускаются.
+
+        Returns:
+            {номер темы (с 1): распарсенный сценарий}
+        """
+
+        parsed = {}
+        matches = list(re.finditer(r'=+\s*(?:ВИДЕО|VIDEO)\s*(\d+)\s*=+', content, flags=re.IGNORECASE))
+
+        for i, match in enumerate(matches):
+            number = int(match.group(1))
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+
+            if not 1 <= number <= count or number in parsed:
+                continue
+
+            try:
+                parsed[number] = self._parse_response(content[match.end():end])
+            except ScriptGeneratorError:
+                continue
+
+        return parsed
+
+    def _validate_batch_response(self, content: str, count: int):
+        """Ответ пакета содержит хотя бы половину сценариев - иначе это ошибка провайдера"""
+        if len(self._parse_batch_response(content, count)) * 2 < count:
+            raise ScriptGeneratorError("Ответ пакета не разбирается по темам")
+
+    async def generate_long_script(
+        self,
+        topic: str,
+        target_length: int = 3000,
+        language: str = 'ru',
+        niche: str = 'psychology',
+        use_ollama: bool = True,
+        sections: Optional[int] = None,
+        max_parallel: int = 4,
+        spread: int = 2,
+        use_cache: bool = True
+    ) -> Dict:
+        """
+        Длинный сценарий (15-30 минут): план, затем разделы параллельно
+
+        1. Короткий запрос - hook, план из N разделов, CTA и заголовки
+        2. Каждый раздел пишется отдельным запросом с общим контекстом (весь план +
+           соседние разделы), запросы идут одновременно и расходятся по провайдерам/ключам
+        3. Разделы склеиваются и проверяются
+
+        Время генерации определяется самым долгим разделом, а не общей длиной,
+        и ни один ответ не упирается в max_tokens.
+
+        Args:
+            topic: Тема видео
+            target_length: Целевая длина в словах
+            language: Язык ('ru' или 'en')
+            niche: Ниша
+            use_ollama: Использовать локальную Ollama
+            sections: Количество разделов (по умолчанию target_length / LONG_FORM_SECTION_WORDS)
+            max_parallel: Сколько разделов генерировать одновременно
+            spread: По скольким лучшим провайдерам распределять разделы
+            use_cache: Брать готовый сценарий из кэша
+
+        Returns:
+            Dict как у generate_script + sections (список разделов: title, summary, text, provider)
+
+        Raises:
+            ScriptGeneratorError: План или один из разделов не удалось сгенерировать
+        """
+
+        sections = sections or max(3, round(target_length / self.LONG_FORM_SECTION_WORDS))
+        outline_prompt = self._build_outline_prompt(topic, target_length, language, niche, sections)
+
+        cache_key = None
+        if self.script_cache:
+            cache_key = self._script_cache_key(outline_prompt, {'provider': 'long_form', 'model': str(sections)})
+            if use_cache:
+                cached = self.script_cache.get(cache_key)
+                if cached:
+                    print(f"⚡ Длинный сценарий из кэша, запрос к LLM не нужен")
+                    return cached
+
+        start_time = time.time()
+        print(f"📑 Длинный сценарий: план из {sections} разделов (~{target_length} слов)...")
+
+        # План: ~25 слов на строку раздела + hook, CTA и заголовки
+        with expected_output(sections * 25, language, extra_words=self.SCRIPT_OVERHEAD_WORDS):
+            content, outline_candidate = await self._generate_text(
+                outline_prompt,
+                use_ollama,
+                validate=lambda text: self._parse_outline(text)
+            )
+        outline = self._parse_outline(content)
+        section_words = max(150, target_length // len(outline['sections']))
+
+        print(f"   ✅ План от {outline_candidate['name']}: {len(outline['sections'])} разделов")
+        print(f"   ✍️  Разделы параллельно (до {max_parallel} одновременно)...")
+
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def write_section(index: int) -> Dict:
+            async with semaphore:
+                prompt = self._build_section_prompt(topic, language, niche, outline, index, section_words)
+                with expected_output(section_words, language):
+                    text, candidate = await self._generate_text(
+                        prompt,
+                        use_ollama,
+                        validate=self._validate_section,
+                        start_offset=index % max(1, spread)
+                    )
+                print(f"      ✅ Раздел {index + 1}/{len(outline['sections'])} ({candidate['name']})")
+                return {
+                    **outline['sections'][index],
+                    'text': self._clean_section(text),
+                    'provider': candidate['provider']
+                }
+
+        written = await asyncio.gather(*[write_section(i) for i in range(len(outline['sections']))])
+
+        script = '\n\n'.join(section['text'] for section in written)
+        word_count = len(script.split())
+
+        if word_count < target_length * 0.6:
+            print(f"   ⚠️  Сценарий короче цели: {word_count} из ~{target_length} слов")
+
+        result = {
+            'hook': outline['hook'],
+            'script': script,
+            'cta': outline['cta'],
+            'title_suggestions': outline['title_suggestions'],
+            'word_count': word_count,
+            'provider': outline_candidate['provider'],
+            'model': outline_candidate['model'],
+            'sections': written
+        }
+
+        if cache_key:
+            self.script_cache.set(cache_key, result, ttl=self.cache_ttl)
+
+        print(f"✅ Длинный сценарий: {word_count} слов за {time.time() - start_time:.1f}s")
+        return result
+
+    def _build_outline_prompt(
+        self,
+        topic: str,
+        target_length: int,
+        language: str,
+        niche: str,
+        sections: int
+    ) -> str:
+        """Промпт плана длинного сценария"""
+
+        lang_instruction = "на русском языке" if language == 'ru' else "in English"
+
+        prompt = f"""
+Составь план длинного YouTube видео {lang_instruction} на тему:
+"{topic}"
+
+НИША: {niche}
+ОБЩАЯ ДЛИНА СЦЕНАРИЯ: ~{target_length} слов
+КОЛИЧЕСТВО РАЗДЕЛОВ: {sections}
+
+СТРУКТУРА ОТВЕТА:
+
+[HOOK]
+(Цепляющий hook на 2-3 предложения)
+
+[OUTLINE]
+(Ровно {sections} строк в формате: N. Название раздела | о чём раздел в одном предложении.
+Разделы должны логично продолжать друг друга и не повторяться)
+
+[CTA]
+(Призыв к действию на 2-3 предложения)
+
+[TITLES]
+(3 варианта заголовков для видео)
+"""
+
+        return prompt.strip()
+
+    def _build_section_prompt(
+        self,
+        topic: str,
+        language: str,
+        niche: str,
+        outline: Dict,
+        index: int,
+        section_words: int
+    ) -> str:
+        """Промпт одного раздела: весь план как общий контекст + место раздела в нём"""
+
+        lang_instruction = "на русском языке" if language == 'ru' else "in English"
+        sections = outline['sections']
+        section = sections[index]
+
+        plan = '\n'.join(
+            f"{i}. {item['title']} - {item['summary']}" + ("  ← ЭТОТ РАЗДЕЛ" if i == index + 1 else "")
+            for i, item in enumerate(sections, 1)
+        )
+
+        if index == 0:
+            position = f"Это первый раздел, он идёт сразу после hook: \"{outline['hook']}\""
+        elif index == len(sections) - 1:
+            position = "Это последний раздел, после него будет призыв к действию. Подведи итог."
+        else:
+            position = f"Предыдущий раздел: \"{sections[index - 1]['title']}\", следующий: \"{sections[index + 1]['title']}\""
+
+        prompt = f"""
+Ты пишешь один раздел длинного YouTube сценария {lang_instruction}.
+
+ТЕМА ВИДЕО: "{topic}"
+НИША: {niche}
+
+ПЛАН ВСЕГО ВИДЕО:
+{plan}
+
+РАЗДЕЛ {index + 1}: {section['title']}
+О ЧЁМ: {section['summary']}
+{position}
+
+Напиши текст этого раздела длиной ~{section_words} слов.
+- Только текст для диктора, без заголовков, маркеров и пометок
+- Не пересказывай другие разделы и не здоровайся заново
+- Разговорный язык, короткие предложения, конкретные примеры
+"""
+
+        return prompt.strip()
+
+    def _parse_outline(self, content: str) -> Dict:
+        """
+        Парсинг плана: hook, sections [{title, summary}], cta, title_suggestions
+
+        Raises:
+            ScriptGeneratorError: В плане меньше двух разделов
+        """
+
+        parts = {}
+        matches = list(re.finditer(r'\[(HOOK|OUTLINE|CTA|TITLES)\]', content))
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(content)
+            parts[match.group(1)] = content[match.end():end].strip()
+
+        sections = []
+        for line in parts.get('OUTLINE', '').split('\n'):
+            line = line.strip()
+            if not line or not line[0].isdigit():
+                continue
+
+            line = line.lstrip('0123456789.-) ').strip()
+            title, _, summary = line.partition('|')
+            title = title.strip().strip('*').strip()
+            if title:
+                sections.append({'title': title, 'summary': summary.strip() or title})
+
+        if len(sections) < 2:
+            raise ScriptGeneratorError("Не удалось распарсить план сценария")
+
+        return {
+            'hook': parts.get('HOOK', ''),
+            'sections': sections,
+            'cta': parts.get('CTA', ''),
+            'title_suggestions': parse_titles(parts.get('TITLES', ''))
+        }
+
+    def _validate_section(self, text: str):
+        """Раздел не пустой и не обрезан на первых словах"""
+        if len(self._clean_section(text).split()) < 30:
+            raise ScriptGeneratorError("Раздел слишком короткий")
+
+    def _clean_section(self, text: str) -> str:
+        """Убирает маркеры и заголовок 'Раздел N', если модель их всё же добавила"""
+        text = re.sub(r'\[(HOOK|SCRIPT|CTA|TITLES|OUTLINE)\]', '', text)
+        text = re.sub(r'^\s*(#+\s*)?(Раздел|Section)\s*\d+[^\n]*\n', '', text, flags=re.IGNORECASE)
+        return text.strip()
+
     def _build_prompt(
         self,
         topic: str,
@@ -450,14 +1512,7 @@ class ScriptGenerator:
 
                 if key == 'titles':
                     # Парсинг заголовков
-                    lines = [line.strip() for line in section_text.split('\n') if line.strip()]
-                    titles = []
-                    for line in lines:
-                        # Убираем номера и маркеры
-                        clean_line = line.lstrip('0123456789.-) ').strip()
-                        if clean_line:
-                            titles.append(clean_line)
-                    result['title_suggestions'] = titles[:3]
+                    result['title_suggestions'] = parse_titles(section_text)
                 else:
                     result[key] = section_text
 
@@ -0,0 +1,165 @@
+"""
+Script Stream - разбор ответа LLM по мере генерации
+Секции [HOOK]/[SCRIPT]/[CTA]/[TITLES] и готовые предложения отдаются
+событиями, пока остальной сценарий ещё генерируется
+"""
+
+from typing import Dict, List, Optional
+
+from services.text_normalizer import TextNormalizer
+
+
+# Маркер -> ключ секции (как в ScriptGenerator._parse_response)
+SECTION_MARKERS = {
+    '[HOOK]': 'hook',
+    '[SCRIPT]': 'script',
+    '[CTA]': 'cta',
+    '[TITLES]': 'titles'
+}
+
+
+def parse_titles(section_text: str) -> List[str]:
+    """Заголовки из секции [TITLES]: без номеров и маркеров, максимум 3"""
+    lines = [line.strip() for line in section_text.split('\n') if line.strip()]
+    titles = []
+    for line in lines:
+        # Убираем номера и маркеры
+        clean_line = line.lstrip('0123456789.-) ').strip()
+        if clean_line:
+            titles.append(clean_line)
+    return titles[:3]
+
+
+class ScriptStreamParser:
+    """
+    Инкрементальный парсер сценария
+
+    feed() принимает очередной фрагмент ответа и возвращает события:
+    - {'type': 'sentence', 'section', 'index', 'text'} - предложение закончено
+      (только для hook/script/cta; последнее предложение секции считается
+      законченным, когда начинается следующее или закрывается секция)
+    - {'type': 'section', 'section', 'text'} - секция закончена
+      (для titles дополнительно 'titles': список заголовков)
+
+    Итоговый словарь сценария по-прежнему строит _parse_response по полному
+    тексту - события нужны только для раннего старта следующих этапов.
+    """
+
+    def __init__(self, language: str = 'ru'):
+        """
+        Args:
+            language: Язык сценария (для разбиения на предложения)
+        """
+        self._splitter = TextNormalizer(language=language)
+        self._max_marker = max(len(marker) for marker in SECTION_MARKERS)
+
+        self.section: Optional[str] = None
+        self._pending = ''
+        self._text = ''
+        self._emitted_upto = 0
+        self._sentence_index = 0
+
+        # Сколько событий уже отдано (для отката при смене провайдера)
+        self.events_emitted = 0
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """
+        Добавляет фрагмент ответа
+
+        Returns:
+            Новые события (возможно, пустой список)
+        """
+        self._pending += chunk
+        events = []
+
+        while True:
+            position, marker = self._find_marker(self._pending)
+            if marker is None:
+                break
+
+            self._append(self._pending[:position], events, final=False)
+            self._close_section(events)
+            self.section = SECTION_MARKERS[marker]
+            self._pending = self._pending[position + len(marker):]
+
+        # Хвост, который может оказаться началом маркера ('[SCR'), придерживаем
+        hold = self._marker_prefix_length(self._pending)
+        self._append(self._pending[:len(self._pending) - hold], events, final=False)
+        self._pending = self._pending[len(self._pending) - hold:]
+
+        self.events_emitted += len(events)
+        return events
+
+    def close(self) -> List[Dict]:
+        """Ответ закончился: закрывает последнюю секцию"""
+        events = []
+        self._append(self._pending, events, final=True)
+        self._pending = ''
+        self._close_section(events)
+
+        self.events_emitted += len(events)
+        return events
+
+    def _find_marker(self, text: str):
+        """Самый ранний маркер секции в тексте: (позиция, маркер) или (-1, None)"""
+        found = (-1, None)
+        for marker in SECTION_MARKERS:
+            position = text.find(marker)
+            if position != -1 and (found[1] is None or position < found[0]):
+                found = (position, marker)
+        return found
+
+    def _marker_prefix_length(self, text: str) -> int:
+        """Длина хвоста text, совпадающего с началом какого-либо маркера"""
+        start = text.rfind('[', max(0, len(text) - self._max_marker))
+        if start == -1:
+            return 0
+
+        tail = text[start:]
+        if any(marker.startswith(tail) for marker in SECTION_MARKERS):
+            return len(tail)
+        return 0
+
+    def _append(self, text: str, events: List[Dict], final: bool):
+        """Дописывает текст в текущую секцию и отдаёт законченные предложения"""
+        if self.section is None:
+            # Преамбула до [HOOK] - игнорируем, как и _parse_response
+            return
+
+        self._text += text
+
+        if self.section == 'titles':
+            return
+
+        spans = self._splitter.split_sentences(self._text[self._emitted_upto:])
+        if not final:
+            # Последнее предложение может быть ещё не дописано
+            spans = spans[:-1]
+
+        for start, end in spans:
+            events.append({
+                'type': 'sentence',
+                'section': self.section,
+                'index': self._sentence_index,
+                'text': self._text[self._emitted_upto + start:self._emitted_upto + end]
+            })
+            self._sentence_index += 1
+
+        if spans:
+            self._emitted_upto += spans[-1][1]
+
+    def _close_section(self, events: List[Dict]):
+        """Отдаёт последнее предложение и событие о готовой секции"""
+        if self.section is None:
+            return
+
+        self._append('', events, final=True)
+
+        event = {'type': 'section', 'section': self.section, 'text': self._text.strip()}
+        if self.section == 'titles':
+            event['titles'] = parse_titles(self._text.strip())
+        events.append(event)
+
+        self.section = None
+        self._text = ''
+        self._emitted_upto = 0
@@ -0,0 +1,202 @@
+"""
+Segment Renderer - параллельный рендер длинных видео кусками
+Сцены делятся на сегменты по границам сцен, сегменты рендерятся
+одновременно и склеиваются ffmpeg concat без перекодирования
+"""
+
+import contextvars
+import os
+import shutil
+import subprocess
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from services.cancellation import run_process
+from services.render_progress import RenderProgress, count_frames
+
+
+class SegmentedRenderer:
+    """
+    Обёртка над RemotionRenderer / FFmpegRenderer с тем же render_video()
+
+    Один процесс рендера на всё видео упирается в ядра одного процесса и
+    в таймаут. Здесь видео режется на сегменты примерно равной длительности
+    (только по границам сцен - кадры каждой сцены считаются так же, как при
+    цельном рендере), сегменты рендерятся параллельно, видео склеивается
+    concat demuxer'ом с -c copy.
+
+    Озвучка не режется: сегменты рендерятся без звука, а исходная дорожка
+    накладывается один раз при склейке - на стыках нет щелчков и сдвигов AAC.
+    Первая сцена каждого сегмента, кроме первого, рендерится с fadeIn -
+    как в цельном рендере, где у неё есть переход.
+
+    Ограничение: RemotionRenderer в режиме сервера отправляет все сегменты
+    в один render server - один Node процесс и один Chromium. Сегменты идут
+    параллельно (по --concurrency вкладок на сегмент, кодирование - отдельные
+    ffmpeg), но сборка кадров делит event loop сервера и память браузера,
+    поэтому ускорение ниже, чем у отдельных процессов CLI (use_server=False).
+    """
+
+    def __init__(
+        self,
+        renderer,
+        max_workers: Optional[int] = None,
+        threads_per_segment: int = 4,
+        min_segment_seconds: float = 60,
+        timeout: int = 600
+    ):
+        """
+        Args:
+            renderer: Рендерер сегментов (RemotionRenderer / FFmpegRenderer)
+            max_workers: Сколько сегментов рендерить одновременно
+                (по умолчанию ядра / threads_per_segment)
+            threads_per_segment: Сколько ядер занимает один процесс рендера
+                (Remotion --concurrency 4)
+            min_segment_seconds: Короче этого сегменты не делаются - короткое
+                видео рендерится целиком, как раньше
+            timeout: Таймаут склейки (сек)
+        """
+        self.renderer = renderer
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // threads_per_segment)
+        self.min_segment_seconds = min_segment_seconds
+        self.timeout = timeout
+
+    def plan_segments(self, scenes: List[Dict]) -> List[List[Dict]]:
+        """
+        Деление сцен на сегменты близкой длительности
+
+        Returns:
+            Список сегментов (списки сцен подряд, без пропусков)
+        """
+        total = sum(scene['duration'] for scene in scenes)
+        count = min(self.max_workers, len(scenes), int(total // self.min_segment_seconds))
+
+        if count <= 1:
+            return [scenes]
+
+        segments: List[List[Dict]] = [[]]
+        elapsed = 0.0
+
+        for i, scene in enumerate(scenes):
+            segments[-1].append(scene)
+            elapsed += scene['duration']
+
+            remaining_segments = count - len(segments)
+            remaining_scenes = len(scenes) - i - 1
+
+            # Сегмент закрывается, когда набрал свою долю общей длительности
+            if remaining_segments and remaining_scenes >= remaining_segments \
+                    and elapsed >= total * len(segments) / count:
+                segments.append([])
+
+        return [segment for segment in segments if segment]
+
+    def render_video(
+        self,
+        scenes: List[Dict],
+        audio_path: Optional[str] = None,
+        output_path: str = 'output.mp4',
+        fps: int = 30,
+        width: int = 1920,
+        height: int = 1080,
+        on_progress: Optional[Callable[[Dict], None]] = None
+    ) -> str:
+        """
+        Рендер видео сегментами (интерфейс как у RemotionRenderer.render_video)
+
+        Returns:
+            Путь к готовому видео
+        """
+        segments = self.plan_segments(scenes)
+
+        if len(segments) == 1:
+            return self.renderer.render_video(
+                scenes, audio_path, output_path, fps, width, height, on_progress=on_progress
+            )
+
+        # Переход на стыке сегментов: первая сцена сегмента - не первая в видео
+        segments = [segments[0]] + [[{**segment[0], 'fadeIn': True}] + segment[1:] for segment in segments[1:]]
+
+        output_abs_path = Path(output_path).absolute()
+        work_dir = output_abs_path.parent / f"segments_{uuid.uuid4().hex[:8]}"
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        print(f"\n🧩 Рендер сегментами: {len(segments)} сегментов, до {self.max_workers} одновременно")
+        for i, segment in enumerate(segments, 1):
+            print(f"   {i}. {len(segment)} сцен, {sum(scene['duration'] for scene in segment):.1f}s")
+
+        progress = RenderProgress(count_frames(scenes, fps), on_progress) if on_progress else None
+
+        def render_segment(index: int) -> str:
+            return self.renderer.render_video(
+                segments[index],
+                None,
+                str(work_dir / f"segment_{index:03d}.mp4"),
+                fps,
+                width,
+                height,
+                on_progress=progress.part_callback(index) if progress else None
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Потоки - с контекстом задачи: отмена доходит до процессов каждого сегмента
+                futures = [
+                    executor.submit(contextvars.copy_context().run, render_segment, index)
+                    for index in range(len(segments))
+                ]
+                segment_paths = [future.result() for future in futures]
+
+            print(f"\n🔗 Склейка {len(segment_paths)} сегментов (без перекодирования)...")
+            self.concat(segment_paths, audio_path, str(output_abs_path), work_dir / 'segments.txt')
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        print(f"\n✅ Видео готово: {output_abs_path}")
+        return str(output_abs_path)
+
+    def concat(self, segment_paths: List[str], audio_path: Optional[str], output_path: str, list_path: Path):
+        """Склейка сегментов + исходная озвучка (см. concat_clips)"""
+        concat_clips(segment_paths, audio_path, output_path, list_path, self.timeout)
+
+
+def concat_clips(
+    clip_paths: List[str],
+    audio_path: Optional[str],
+    output_path: str,
+    list_path: Path,
+    timeout: int = 600
+):
+    """
+    Склейка клипов concat demuxer'ом без перекодирования + исходная озвучка
+
+    Клипы должны быть с одинаковыми кодеком, разрешением и fps
+    (один рендерер с одними настройками)
+
+    Raises:
+        RuntimeError: ffmpeg завершился с ошибкой
+    """
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for path in clip_paths:
+            escaped = str(Path(path).absolute()).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    cmd = ['ffmpeg', '-y', '-v', 'error', '-f', 'concat', '-safe', '0', '-i', str(list_path)]
+    if audio_path:
+        cmd += ['-i', str(Path(audio_path).absolute())]
+
+    cmd += ['-map', '0:v', '-c:v', 'copy']
+    if audio_path:
+        cmd += ['-map', '1:a', '-c:a', 'aac', '-b:a', '192k', '-shortest']
+
+    cmd += ['-movflags', '+faststart', output_path]
+
+    try:
+        result = run_process(cmd, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"Склейка клипов превысила таймаут ({timeout}s)")
+
+    if result.returncode != 0:
+        raise RuntimeError(f"Склейка клипов не удалась: {result.stderr[-2000:]}")
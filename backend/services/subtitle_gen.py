@@ -3,10 +3,49 @@ Subtitle Generator - генератор субтитров с 5 професси
 Стили: Highlighted Words, Typewriter, Karaoke, Modern Minimalist, 3D Pop-out
 """
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 import re
 
 
+# Цвета из конфигов стилей -> RGB
+NAMED_COLORS = {
+    'white': (255, 255, 255),
+    'black': (0, 0, 0),
+    'yellow': (255, 255, 0),
+    'orange': (255, 165, 0),
+    'gold': (255, 215, 0)
+}
+
+
+def ass_color(value: Optional[str], default: str = '&H00FFFFFF') -> str:
+    """
+    Цвет стиля ('white', 'rgba(0,0,0,0.5)', 'linear-gradient(yellow, orange)') в формат ASS &HAABBGGRR
+
+    Для градиента берётся первый цвет; неизвестный цвет - default
+    """
+    if not value:
+        return default
+
+    value = value.strip().lower()
+    if value.startswith('linear-gradient('):
+        value = value[len('linear-gradient('):].split(',')[0].strip()
+
+    alpha = 0
+    match = re.match(r'rgba?\(([^)]*)\)', value)
+    if match:
+        parts = [part.strip() for part in match.group(1).split(',')]
+        r, g, b = (int(float(part)) for part in parts[:3])
+        if len(parts) > 3:
+            # В ASS альфа инвертирована: 00 - непрозрачный
+            alpha = round((1 - float(parts[3])) * 255)
+    elif value in NAMED_COLORS:
+        r, g, b = NAMED_COLORS[value]
+    else:
+        return default
+
+    return f"&H{alpha:02X}{b:02X}{g:02X}{r:02X}"
+
+
 class SubtitleStyle:
     """Базовый класс для стиля субтитров"""
 
@@ -104,6 +143,48 @@ class SubtitleStyle:
         """Возвращает конфигурацию стиля для MoviePy"""
         raise NotImplementedError("Subclass must implement get_style_config()")
 
+    def get_ass_style(self, width: int = 1920, height: int = 1080) -> Dict:
+        """
+        Стиль ASS (libass) из конфигурации стиля
+
+        Размеры в конфиге заданы для 1080p и масштабируются под высоту кадра.
+
+        Караоке (теги \\k): слово переходит из SecondaryColour в PrimaryColour,
+        поэтому неактивные слова - SecondaryColour, произнесённое - PrimaryColour.
+        Печатная машинка (\\ko по буквам): ещё не напечатанные буквы прозрачны.
+
+        Returns:
+            Поля строки Style: Fontname, Fontsize, PrimaryColour, SecondaryColour,
+            OutlineColour, BackColour, Bold, BorderStyle, Outline, Shadow, Alignment, MarginV
+        """
+        config = self.get_style_config()
+        scale = height / 1080
+        font = config.get('font', 'Arial')
+
+        # ('center', 'bottom') -> 2, ('center', 'center') -> 5 (раскладка цифровой клавиатуры)
+        vertical = config.get('position', ('center', 'bottom'))[1]
+        alignment = {'bottom': 2, 'center': 5, 'top': 8}.get(vertical, 2)
+
+        secondary = ass_color(config.get('inactive_color'), '&H000000FF')
+        if config.get('animation') == 'typewriter':
+            secondary = '&HFF000000'
+
+        return {
+            'Fontname': font.replace('-Bold', '').replace('-', ' '),
+            'Fontsize': round(config.get('fontsize', 60) * scale),
+            'PrimaryColour': ass_color(config.get('active_color') or config.get('color')),
+            'SecondaryColour': secondary,
+            'OutlineColour': ass_color(config.get('stroke_color'), '&H00000000'),
+            'BackColour': ass_color(config.get('bg_color') or config.get('shadow_color'), '&H80000000'),
+            'Bold': -1 if 'Bold' in font or font == 'Impact' else 0,
+            # Полупрозрачная плашка вместо обводки - BorderStyle 3
+            'BorderStyle': 3 if config.get('bg_color') else 1,
+            'Outline': config.get('stroke_width', 0) * scale,
+            'Shadow': 2 * scale if config.get('shadow') else 0,
+            'Alignment': alignment,
+            'MarginV': round(config.get('margin', (0, 100))[1] * scale)
+        }
+
 
 class HighlightedWordsStyle(SubtitleStyle):
     """
@@ -301,6 +382,128 @@ class SubtitleGenerator:
 
         return srt_content, style_config
 
+    def generate_ass(
+        self,
+        cues: List[Dict],
+        width: int = 1920,
+        height: int = 1080,
+        style_name: str = 'highlighted_words',
+        output_path: str = None
+    ) -> str:
+        """
+        Субтитры в формате ASS - для прожига ffmpeg (фильтр ass)
+
+        Args:
+            cues: Реплики [{'start', 'end', 'text', 'highlighted'}] (секунды от начала видео)
+            width: Ширина кадра (PlayResX)
+            height: Высота кадра (PlayResY)
+            style_name: Название стиля
+            output_path: Путь для сохранения .ass (опционально)
+
+        Returns:
+            Содержимое ASS файла
+        """
+        style = self.styles.get(style_name, self.styles['highlighted_words'])
+        fields = style.get_ass_style(width, height)
+
+        # Выделенные реплики - тёмный текст на золотой плашке (как highlighted в Remotion)
+        highlight = {
+            **fields,
+            'PrimaryColour': '&H00000000',
+            'OutlineColour': ass_color('gold'),
+            'BorderStyle': 3,
+            'Outline': round(12 * height / 1080),
+            'Shadow': 0
+        }
+
+        lines = [
+            '[Script Info]',
+            'ScriptType: v4.00+',
+            f'PlayResX: {width}',
+            f'PlayResY: {height}',
+            'WrapStyle: 0',
+            'ScaledBorderAndShadow: yes',
+            '',
+            '[V4+ Styles]',
+            'Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, '
+            'Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, '
+            'Shadow, Alignment, MarginL, MarginR, MarginV, Encoding',
+            self._ass_style_line('Default', fields, width),
+            self._ass_style_line('Highlight', highlight, width),
+            '',
+            '[Events]',
+            'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text'
+        ]
+
+        for cue in cues:
+            if not cue.get('text') or cue['end'] <= cue['start']:
+                continue
+
+            text = cue['text'].replace('{', '(').replace('}', ')').replace('\n', '\\N')
+            text = self._ass_animate(text, cue['end'] - cue['start'], style.get_style_config().get('animation'))
+            lines.append(
+                f"Dialogue: 0,{self._format_ass_time(cue['start'])},{self._format_ass_time(cue['end'])},"
+                f"{'Highlight' if cue.get('highlighted') else 'Default'},,0,0,0,,{text}"
+            )
+
+        ass_content = '\n'.join(lines) + '\n'
+
+        if output_path:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(ass_content)
+
+        return ass_content
+
+    def _ass_style_line(self, name: str, fields: Dict, width: int) -> str:
+        """Строка Style: ... (поля без значения в конфиге - по умолчанию libass)"""
+        # Текст занимает не больше 80% ширины кадра, как в AnimatedSubtitle
+        margin_h = round(width * 0.1)
+
+        return (
+            f"Style: {name},{fields['Fontname']},{fields['Fontsize']},{fields['PrimaryColour']},"
+            f"{fields.get('SecondaryColour', '&H000000FF')},{fields['OutlineColour']},"
+            f"{fields['BackColour']},{fields['Bold']},0,0,0,"
+            f"100,100,0,0,{fields['BorderStyle']},{fields['Outline']:g},{fields['Shadow']:g},"
+            f"{fields['Alignment']},{margin_h},{margin_h},{fields['MarginV']},1"
+        )
+
+    def _ass_animate(self, text: str, duration: float, animation: Optional[str]) -> str:
+        """
+        Анимация стиля тегами ASS (libass считает её сам - без отрисовки по кадрам)
+
+        karaoke    - \\k по словам, время слова пропорционально его длине
+        typewriter - \\ko по буквам за первые 70% реплики (не дольше 50 мс на букву)
+        bounce     - появление с увеличением 80% -> 110% -> 100%
+        """
+        if animation == 'karaoke':
+            words = text.split(' ')
+            total = sum(len(word) + 1 for word in words)
+            centis = [round(duration * 100 * (len(word) + 1) / total) for word in words]
+            return ' '.join(f"{{\\k{cs}}}{word}" for cs, word in zip(centis, words))
+
+        if animation == 'typewriter':
+            lines = text.split('\\N')
+            letters = sum(len(line.replace(' ', '')) for line in lines)
+            per_letter = max(1, min(5, round(duration * 70 / max(1, letters))))
+            return '\\N'.join(
+                ''.join(char if char == ' ' else f"{{\\ko{per_letter}}}{char}" for char in line)
+                for line in lines
+            )
+
+        if animation == 'bounce':
+            return f"{{\\fad(80,0)\\fscx80\\fscy80\\t(0,150,\\fscx110\\fscy110)\\t(150,250,\\fscx100\\fscy100)}}{text}"
+
+        return text
+
+    def _format_ass_time(self, seconds: float) -> str:
+        """Время в формате ASS (H:MM:SS.cc)"""
+        centis = int(round(seconds * 100))
+        hours, centis = divmod(centis, 360000)
+        minutes, centis = divmod(centis, 6000)
+        secs, centis = divmod(centis, 100)
+
+        return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
     def get_style_recommendations(self, niche: str) -> List[str]:
         """Рекомендует стили субтитров для ниши"""
 
@@ -4,7 +4,11 @@
 """
 
 import re
-from typing import Dict, List
+import os
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 
 class TextNormalizer:
@@ -18,8 +22,76 @@ class TextNormalizer:
     - Удаление спецсимволов
     - Проверка языка
     - Нормализация пунктуации
+    - Пакетная нормализация в нескольких процессах
+    - Нормализация по предложениям со смещениями в исходном тексте
+
+    Все регулярные выражения компилируются один раз при загрузке класса,
+    конвертация чисел в слова кэшируется.
     """
 
+    # Предкомпилированные шаблоны
+    _RU_CHARS = re.compile(r'[а-яА-ЯёЁ]')
+    _EN_CHARS = re.compile(r'[a-zA-Z]')
+
+    _MD_BOLD = re.compile(r'\*\*(.*?)\*\*')
+    _MD_ITALIC = re.compile(r'\*(.*?)\*')
+    _MD_UNDERSCORE = re.compile(r'_(.*?)_')
+    _MD_HEADER = re.compile(r'^#+\s+', re.MULTILINE)
+    _MD_LINK = re.compile(r'\[(.*?)\]\(.*?\)')
+
+    _URL = re.compile(r'https?://(?:www\.)?([a-zA-Z0-9-]+\.[a-zA-Z]{2,})')
+    _EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+    _DATE = re.compile(r'(\d{1,2})[./](\d{1,2})[./](\d{4})')
+    _YEAR = re.compile(r'(\d{4})\s*(?:г\.|год)')
+    _YEAR_RANGE = re.compile(r'(\d{4})-(\d{4})')
+
+    _NUMBER = re.compile(r'\b\d+(?:[.,]\d+)?\b')
+
+    _PROBLEMATIC_CHARS = re.compile(r'[^\w\s\.,!?;:\-—–()«»""\'`]', re.UNICODE)
+
+    _SPACE_BEFORE_PUNCT = re.compile(r'\s+([.,!?;:])')
+    _NO_SPACE_AFTER_PUNCT = re.compile(r'([.,!?;:])([^\s])')
+    _MULTIPLE_SPACES = re.compile(r'\s{2,}')
+    _WHITESPACE = re.compile(r'\s+')
+
+    # Конец предложения: знак + пробел + заглавная/цифра/кавычка, либо перенос строки
+    _SENTENCE_END = re.compile(r'[.!?…]+["»)]*(?=\s+["«(*#\-—]*[A-ZА-ЯЁ0-9])|\n+')
+    _TRAILING_WORD = re.compile(r'(?:^|\s)(\S+)$')
+
+    # После этих сокращений следующее слово с заглавной - не новое предложение
+    _NO_SENTENCE_BREAK = {'г.', 'гг.', 'проф.', 'см.', 'ср.', 'напр.', 'mr.', 'mrs.', 'dr.', 'prof.', 'e.g.', 'i.e.'}
+
+    # Месяцы в родительном падеже (для "15 января")
+    _MONTHS_GENITIVE = {
+        '01': 'января', '02': 'февраля', '03': 'марта',
+        '04': 'апреля', '05': 'мая', '06': 'июня',
+        '07': 'июля', '08': 'августа', '09': 'сентября',
+        '10': 'октября', '11': 'ноября', '12': 'декабря',
+        '1': 'января', '2': 'февраля', '3': 'марта',
+        '4': 'апреля', '5': 'мая', '6': 'июня',
+        '7': 'июля', '8': 'августа', '9': 'сентября'
+    }
+
+    # Математические символы
+    _MATH_SYMBOLS = {
+        '+': ' плюс ',
+        '−': ' минус ',
+        '-': ' минус ',
+        '×': ' умножить на ',
+        '÷': ' делить на ',
+        '=': ' равно ',
+        '≈': ' приблизительно равно ',
+        '≠': ' не равно ',
+        '<': ' меньше ',
+        '>': ' больше ',
+        '≤': ' меньше или равно ',
+        '≥': ' больше или равно ',
+        '%': ' процентов',
+        '№': ' номер ',
+        '°': ' градусов'
+    }
+
     def __init__(self, language: str = 'ru'):
         self.language = language
 
@@ -109,6 +181,15 @@ class TextNormalizer:
         if detected_lang != self.language:
             print(f"⚠️  Предупреждение: Обнаружен язык {detected_lang}, ожидался {self.language}")
 
+        text = self._apply_passes(text)
+
+        print(f"✅ Текст нормализован!")
+
+        return text
+
+    def _apply_passes(self, text: str) -> str:
+        """Шаги 2-11 нормализации (без вывода в консоль)"""
+
         # 2. Удаление markdown форматирования
         text = self._remove_markdown(text)
 
@@ -139,15 +220,148 @@ class TextNormalizer:
         # 11. Финальная очистка
         text = self._final_cleanup(text)
 
-        print(f"✅ Текст нормализован!")
-
         return text
 
+    def normalize_many(
+        self,
+        texts: List[str],
+        max_workers: Optional[int] = None,
+        chunksize: Optional[int] = None
+    ) -> List[str]:
+        """
+        Пакетная нормализация (например, всех сценариев ночного батча)
+
+        Тексты раздаются пачками по chunksize в ProcessPoolExecutor,
+        результат - в том же порядке, что и texts.
+
+        Args:
+            texts: Список текстов
+            max_workers: Количество процессов (по умолчанию - по числу ядер)
+            chunksize: Текстов на одну отправку в процесс (по умолчанию ~4 пачки на процесс)
+
+        Returns:
+            Нормализованные тексты (как normalize_for_tts для каждого)
+        """
+
+        return self._map_in_pool(_normalize_in_worker, texts, max_workers, chunksize)
+
+    def split_sentences(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Делит исходный (ненормализованный) текст на предложения
+
+        Точки в датах, дробях и URL не считаются концом предложения
+        (после них нет пробела), как и точки после 'г.', 'проф.', 'Dr.' и т.п.
+
+        Returns:
+            Список (start, end) - смещения предложений в text, без крайних пробелов
+        """
+
+        spans = []
+        start = 0
+
+        for match in self._SENTENCE_END.finditer(text):
+            end = match.end() if match.group(0)[0] != '\n' else match.start()
+
+            # 'г. Москва', 'Dr. Smith' - не конец предложения
+            trailing = self._TRAILING_WORD.search(text[start:end])
+            if match.group(0)[0] != '\n' and trailing and trailing.group(1).lower() in self._NO_SENTENCE_BREAK:
+                continue
+
+            spans.append((start, end))
+            start = match.end()
+
+        spans.append((start, len(text)))
+
+        sentences = []
+        for span_start, span_end in spans:
+            segment = text[span_start:span_end]
+            if not segment.strip():
+                continue
+            span_start += len(segment) - len(segment.lstrip())
+            span_end -= len(segment) - len(segment.rstrip())
+            sentences.append((span_start, span_end))
+
+        return sentences
+
+    def normalize_sentences(self, text: str) -> List[Dict]:
+        """
+        Нормализация по предложениям (для фрагментов TTS и субтитров)
+
+        Каждое предложение нормализуется отдельно, поэтому склейка
+        normalized не обязана побайтно совпадать с normalize_for_tts(text).
+
+        Returns:
+            [{'index', 'text', 'normalized', 'start', 'end'}] где start/end -
+            смещения исходного предложения в text
+        """
+
+        result = []
+
+        for start, end in self.split_sentences(text):
+            normalized = self._apply_passes(text[start:end])
+            if not normalized:
+                continue
+
+            result.append({
+                'index': len(result),
+                'text': text[start:end],
+                'normalized': normalized,
+                'start': start,
+                'end': end
+            })
+
+        return result
+
+    def normalize_many_sentences(
+        self,
+        texts: List[str],
+        max_workers: Optional[int] = None,
+        chunksize: Optional[int] = None
+    ) -> List[List[Dict]]:
+        """
+        Пакетный normalize_sentences в нескольких процессах
+
+        Returns:
+            Для каждого текста - список предложений (см. normalize_sentences)
+        """
+
+        return self._map_in_pool(_normalize_sentences_in_worker, texts, max_workers, chunksize)
+
+    def _map_in_pool(self, worker, texts: List[str], max_workers: Optional[int], chunksize: Optional[int]) -> List:
+        """Запускает worker для каждого текста в ProcessPoolExecutor"""
+
+        if not texts:
+            return []
+
+        workers = max_workers or min(len(texts), os.cpu_count() or 1)
+        total_chars = sum(len(text) for text in texts)
+
+        print(f"🔧 Пакетная нормализация: {len(texts)} текстов, {total_chars:,} символов, процессов: {workers}")
+
+        # Один процесс или один текст - пул не окупается
+        if workers <= 1 or len(texts) == 1:
+            _init_worker(self.language, self.ru_abbreviations, self.en_abbreviations)
+            results = [worker(text) for text in texts]
+        else:
+            if chunksize is None:
+                chunksize = max(1, math.ceil(len(texts) / (workers * 4)))
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.language, self.ru_abbreviations, self.en_abbreviations)
+            ) as executor:
+                results = list(executor.map(worker, texts, chunksize=chunksize))
+
+        print(f"✅ Нормализовано текстов: {len(results)}")
+
+        return results
+
     def _detect_language(self, text: str) -> str:
         """Определяет язык текста"""
         # Простая эвристика
-        russian_chars = len(re.findall(r'[а-яА-ЯёЁ]', text))
-        english_chars = len(re.findall(r'[a-zA-Z]', text))
+        russian_chars = len(self._RU_CHARS.findall(text))
+        english_chars = len(self._EN_CHARS.findall(text))
 
         if russian_chars > english_chars:
             return 'ru'
@@ -157,27 +371,28 @@ class TextNormalizer:
 
     def _remove_markdown(self, text: str) -> str:
         """Удаляет markdown форматирование"""
-        # Удаляем ** (bold)
-        text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-        # Удаляем * (italic)
-        text = re.sub(r'\*(.*?)\*', r'\1', text)
-        # Удаляем _ (italic)
-        text = re.sub(r'_(.*?)_', r'\1', text)
-        # Удаляем # (headers)
-        text = re.sub(r'^#+\s+', '', text, flags=re.MULTILINE)
-        # Удаляем [text](url)
-        text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)
+        # Шаблоны без своего символа в тексте ничего не найдут - пропускаем
+        if '*' in text:
+            # Удаляем ** (bold)
+            text = self._MD_BOLD.sub(r'\1', text)
+            # Удаляем * (italic)
+            text = self._MD_ITALIC.sub(r'\1', text)
+        if '_' in text:
+            # Удаляем _ (italic)
+            text = self._MD_UNDERSCORE.sub(r'\1', text)
+        if '#' in text:
+            # Удаляем # (headers)
+            text = self._MD_HEADER.sub('', text)
+        if '[' in text:
+            # Удаляем [text](url)
+            text = self._MD_LINK.sub(r'\1', text)
 
         return text
 
     def _normalize_urls(self, text: str) -> str:
         """Конвертирует URL в читаемый формат"""
         # Заменяем полные URL
-        text = re.sub(
-            r'https?://(?:www\.)?([a-zA-Z0-9-]+\.[a-zA-Z]{2,})',
-            r'сайт \1',
-            text
-        )
+        text = self._URL.sub(r'сайт \1', text)
         return text
 
     def _normalize_emails(self, text: str) -> str:
@@ -187,11 +402,8 @@ class TextNormalizer:
             local, domain = email.split('@')
             return f"{local} собака {domain.replace('.', ' точка ')}"
 
-        text = re.sub(
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            email_to_speech,
-            text
-        )
+        if '@' in text:
+            text = self._EMAIL.sub(email_to_speech, text)
         return text
 
     def _normalize_dates(self, text: str) -> str:
@@ -206,16 +418,7 @@ class TextNormalizer:
         """
 
         if self.language == 'ru':
-            # Месяцы в родительном падеже (для "15 января")
-            months_genitive = {
-                '01': 'января', '02': 'февраля', '03': 'марта',
-                '04': 'апреля', '05': 'мая', '06': 'июня',
-                '07': 'июля', '08': 'августа', '09': 'сентября',
-                '10': 'октября', '11': 'ноября', '12': 'декабря',
-                '1': 'января', '2': 'февраля', '3': 'марта',
-                '4': 'апреля', '5': 'мая', '6': 'июня',
-                '7': 'июля', '8': 'августа', '9': 'сентября'
-            }
+            months_genitive = self._MONTHS_GENITIVE
 
             # Даты формата DD.MM.YYYY или DD/MM/YYYY
             def date_to_words(match):
@@ -225,18 +428,14 @@ class TextNormalizer:
                 year_word = self._year_to_words(int(year))
                 return f"{day_word} {month_word} {year_word} года"
 
-            text = re.sub(
-                r'(\d{1,2})[./](\d{1,2})[./](\d{4})',
-                date_to_words,
-                text
-            )
+            text = self._DATE.sub(date_to_words, text)
 
             # Годы "2024 г." или "2024 год"
             def year_to_words(match):
                 year = int(match.group(1))
                 return self._year_to_words(year) + ' год'
 
-            text = re.sub(r'(\d{4})\s*(?:г\.|год)', year_to_words, text)
+            text = self._YEAR.sub(year_to_words, text)
 
             # Диапазоны лет "2020-2024"
             def year_range_to_words(match):
@@ -244,69 +443,21 @@ class TextNormalizer:
                 year2 = int(match.group(2))
                 return f"{self._year_to_words(year1)} - {self._year_to_words(year2)}"
 
-            text = re.sub(r'(\d{4})-(\d{4})', year_range_to_words, text)
+            text = self._YEAR_RANGE.sub(year_range_to_words, text)
 
         return text
 
     def _year_to_words(self, year: int) -> str:
         """Конвертирует год в слова (русский)"""
-        if year >= 2000:
-            thousands = year // 1000
-            remainder = year % 1000
-
-            if remainder == 0:
-                return "две тысячи"
-
-            result = "две тысячи"
-
-            if remainder >= 100:
-                hundreds = remainder // 100
-                remainder = remainder % 100
-                hundreds_words = {
-                    1: 'сто', 2: 'двести', 3: 'триста', 4: 'четыреста',
-                    5: 'пятьсот', 6: 'шестьсот', 7: 'семьсот',
-                    8: 'восемьсот', 9: 'девятьсот'
-                }
-                result += f" {hundreds_words.get(hundreds, '')}"
-
-            if remainder > 0:
-                result += f" {self._simple_num_to_words(remainder)}"
-
-            return result.strip()
-        else:
-            return self._simple_num_to_words(year)
+        return _year_to_words(year)
 
     def _simple_num_to_words(self, num: int) -> str:
         """Простая конвертация числа в слова (без внешних библиотек)"""
-        ones = ['', 'один', 'два', 'три', 'четыре', 'пять', 'шесть', 'семь', 'восемь', 'девять']
-        tens = ['', '', 'двадцать', 'тридцать', 'сорок', 'пятьдесят', 'шестьдесят', 'семьдесят', 'восемьдесят', 'девяносто']
-        teens = ['десять', 'одиннадцать', 'двенадцать', 'тринадцать', 'четырнадцать', 'пятнадцать', 'шестнадцать', 'семнадцать', 'восемнадцать', 'девятнадцать']
-
-        if num == 0:
-            return 'ноль'
-        if num < 10:
-            return ones[num]
-        if num < 20:
-            return teens[num - 10]
-        if num < 100:
-            return (tens[num // 10] + ' ' + ones[num % 10]).strip()
-        return str(num)
+        return _simple_num_to_words(num)
 
     def _number_to_ordinal(self, num: int) -> str:
         """Конвертирует число в порядковое числительное"""
-        ordinals = {
-            1: 'первое', 2: 'второе', 3: 'третье', 4: 'четвёртое',
-            5: 'пятое', 6: 'шестое', 7: 'седьмое', 8: 'восьмое',
-            9: 'девятое', 10: 'десятое', 11: 'одиннадцатое',
-            12: 'двенадцатое', 13: 'тринадцатое', 14: 'четырнадцатое',
-            15: 'пятнадцатое', 16: 'шестнадцатое', 17: 'семнадцатое',
-            18: 'восемнадцатое', 19: 'девятнадцатое', 20: 'двадцатое',
-            21: 'двадцать первое', 22: 'двадцать второе', 23: 'двадцать третье',
-            24: 'двадцать четвёртое', 25: 'двадцать пятое', 26: 'двадцать шестое',
-            27: 'двадцать седьмое', 28: 'двадцать восьмое', 29: 'двадцать девятое',
-            30: 'тридцатое', 31: 'тридцать первое'
-        }
-        return ordinals.get(num, str(num))
+        return _ORDINALS.get(num, str(num))
 
     def _numbers_to_words(self, text: str) -> str:
         """
@@ -327,81 +478,64 @@ class TextNormalizer:
             if any(char in context for char in ['@', 'http', '.com', '.ru']):
                 return number_str
 
-            try:
-                # Десятичные числа
-                if '.' in number_str or ',' in number_str:
-                    number_str = number_str.replace(',', '.')
-                    num = float(number_str)
+            return _number_string_to_words(number_str)
 
-                    # Разбиваем на целую и дробную часть
-                    integer_part = int(num)
-                    decimal_part = str(num).split('.')[1] if '.' in str(num) else ''
+        # Находим все числа
+        text = self._NUMBER.sub(convert_number, text)
 
-                    result = self._simple_num_to_words(integer_part)
+        return text
 
-                    if decimal_part:
-                        result += ' целых '
-                        for digit in decimal_part:
-                            result += self._simple_num_to_words(int(digit)) + ' '
+    def _expand_abbreviations(self, text: str) -> str:
+        """
+        Раскрывает все сокращения
+
+        Сокращения применяются строго по порядку словаря (от этого зависит
+        результат: например, 'г' срабатывает раньше 'г.'). Чтобы не гонять
+        по всему тексту отдельный шаблон на каждое сокращение, текст режется
+        на фрагменты по знакам, которых нет ни в одном сокращении (запятые,
+        переносы строк...), и шаблон применяется только к фрагментам, где есть
+        все его слова ('и', 'т', 'д' для 'и т.д.').
+        """
 
-                        # Определяем разряд
-                        decimal_places = len(decimal_part)
-                        if decimal_places == 1:
-                            result += 'десятых'
-                        elif decimal_places == 2:
-                            result += 'сотых'
-                        elif decimal_places == 3:
-                            result += 'тысячных'
+        abbreviations = self.ru_abbreviations if self.language == 'ru' else self.en_abbreviations
 
-                    return result
+        word_matcher, separators, entries = _compile_abbreviations(tuple(abbreviations.items()))
 
-                # Целые числа
-                else:
-                    num = int(number_str)
-                    return self._simple_num_to_words(num)
+        # Чётные элементы - фрагменты, нечётные - разделители
+        parts = separators.split(text) if separators else [text]
 
-            except:
-                return number_str
+        # Индекс: слово сокращения → фрагменты, где оно встречается
+        word_ids = {}
+        pieces_with = {}
+        for i in range(0, len(parts), 2):
+            for token in set(_WORD.findall(parts[i])):
+                if token not in word_ids:
+                    match = word_matcher.fullmatch(token) if word_matcher else None
+                    word_ids[token] = match.lastindex - 1 if match else None
 
-        # Находим все числа
-        text = re.sub(r'\b\d+(?:[.,]\d+)?\b', convert_number, text)
+                if word_ids[token] is not None:
+                    pieces_with.setdefault(word_ids[token], set()).add(i)
 
-        return text
+        for pattern, full_form, required, unlocks in entries:
+            if required:
+                candidates = set.intersection(*(pieces_with.get(index, set()) for index in required))
+            else:
+                candidates = range(0, len(parts), 2)
 
-    def _expand_abbreviations(self, text: str) -> str:
-        """Раскрывает все сокращения"""
+            for i in candidates:
+                parts[i], count = pattern.subn(full_form, parts[i])
 
-        abbreviations = self.ru_abbreviations if self.language == 'ru' else self.en_abbreviations
+                # Замена могла создать новые слова для следующих сокращений
+                if count:
+                    for index in unlocks:
+                        pieces_with.setdefault(index, set()).add(i)
 
-        for abbr, full_form in abbreviations.items():
-            # Точное совпадение (с границами слов)
-            pattern = r'\b' + re.escape(abbr) + r'\b'
-            text = re.sub(pattern, full_form, text, flags=re.IGNORECASE)
-
-        return text
+        return ''.join(parts)
 
     def _normalize_math_symbols(self, text: str) -> str:
         """Конвертирует математические символы в слова"""
 
-        symbols = {
-            '+': ' плюс ',
-            '−': ' минус ',
-            '-': ' минус ',
-            '×': ' умножить на ',
-            '÷': ' делить на ',
-            '=': ' равно ',
-            '≈': ' приблизительно равно ',
-            '≠': ' не равно ',
-            '<': ' меньше ',
-            '>': ' больше ',
-            '≤': ' меньше или равно ',
-            '≥': ' больше или равно ',
-            '%': ' процентов',
-            '№': ' номер ',
-            '°': ' градусов'
-        }
-
-        for symbol, word in symbols.items():
+        for symbol, word in self._MATH_SYMBOLS.items():
             text = text.replace(symbol, word)
 
         return text
@@ -410,7 +544,7 @@ class TextNormalizer:
         """Удаляет символы которые AI плохо читает"""
 
         # Удаляем emoji
-        text = re.sub(r'[^\w\s\.,!?;:\-—–()«»""\'`]', '', text, flags=re.UNICODE)
+        text = self._PROBLEMATIC_CHARS.sub('', text)
 
         # Заменяем разные виды кавычек на стандартные
         text = text.replace('«', '"').replace('»', '"')
@@ -437,13 +571,13 @@ class TextNormalizer:
         text = text.replace('…', '.')
 
         # Удаляем лишние пробелы перед знаками препинания
-        text = re.sub(r'\s+([.,!?;:])', r'\1', text)
+        text = self._SPACE_BEFORE_PUNCT.sub(r'\1', text)
 
         # Добавляем пробел после знаков препинания если его нет
-        text = re.sub(r'([.,!?;:])([^\s])', r'\1 \2', text)
+        text = self._NO_SPACE_AFTER_PUNCT.sub(r'\1 \2', text)
 
         # Удаляем двойные пробелы
-        text = re.sub(r'\s{2,}', ' ', text)
+        text = self._MULTIPLE_SPACES.sub(' ', text)
 
         # Удаляем пробелы в начале и конце строк
         text = '\n'.join(line.strip() for line in text.split('\n'))
@@ -458,7 +592,7 @@ class TextNormalizer:
         text = '\n'.join(lines)
 
         # Удаляем лишние пробелы
-        text = re.sub(r'\s+', ' ', text)
+        text = self._WHITESPACE.sub(' ', text)
 
         # Trim
         text = text.strip()
@@ -512,3 +646,198 @@ class TextNormalizer:
             'word_count': len(text.split()),
             'detected_language': detected_lang
         }
+
+
+# ═══════════════════════════════════════════════════════════════
+# Воркеры пакетной нормализации (должны быть на уровне модуля для pickle)
+# ═══════════════════════════════════════════════════════════════
+
+_worker_normalizer: Optional[TextNormalizer] = None
+
+
+def _init_worker(language: str, ru_abbreviations: Dict[str, str], en_abbreviations: Dict[str, str]):
+    """Один нормализатор на процесс (с теми же словарями сокращений)"""
+    global _worker_normalizer
+    _worker_normalizer = TextNormalizer(language=language)
+    _worker_normalizer.ru_abbreviations = ru_abbreviations
+    _worker_normalizer.en_abbreviations = en_abbreviations
+
+
+def _normalize_in_worker(text: str) -> str:
+    return _worker_normalizer._apply_passes(text)
+
+
+def _normalize_sentences_in_worker(text: str) -> List[Dict]:
+    return _worker_normalizer.normalize_sentences(text)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Кэшируемые конвертации (одни и те же числа встречаются постоянно)
+# ═══════════════════════════════════════════════════════════════
+
+_ONES = ['', 'один', 'два', 'три', 'четыре', 'пять', 'шесть', 'семь', 'восемь', 'девять']
+_TENS = ['', '', 'двадцать', 'тридцать', 'сорок', 'пятьдесят', 'шестьдесят', 'семьдесят', 'восемьдесят', 'девяносто']
+_TEENS = ['десять', 'одиннадцать', 'двенадцать', 'тринадцать', 'четырнадцать', 'пятнадцать', 'шестнадцать', 'семнадцать', 'восемнадцать', 'девятнадцать']
+
+_HUNDREDS = {
+    1: 'сто', 2: 'двести', 3: 'триста', 4: 'четыреста',
+    5: 'пятьсот', 6: 'шестьсот', 7: 'семьсот',
+    8: 'восемьсот', 9: 'девятьсот'
+}
+
+_ORDINALS = {
+    1: 'первое', 2: 'второе', 3: 'третье', 4: 'четвёртое',
+    5: 'пятое', 6: 'шестое', 7: 'седьмое', 8: 'восьмое',
+    9: 'девятое', 10: 'десятое', 11: 'одиннадцатое',
+    12: 'двенадцатое', 13: 'тринадцатое', 14: 'четырнадцатое',
+    15: 'пятнадцатое', 16: 'шестнадцатое', 17: 'семнадцатое',
+    18: 'восемнадцатое', 19: 'девятнадцатое', 20: 'двадцатое',
+    21: 'двадцать первое', 22: 'двадцать второе', 23: 'двадцать третье',
+    24: 'двадцать четвёртое', 25: 'двадцать пятое', 26: 'двадцать шестое',
+    27: 'двадцать седьмое', 28: 'двадцать восьмое', 29: 'двадцать девятое',
+    30: 'тридцатое', 31: 'тридцать первое'
+}
+
+
+@lru_cache(maxsize=4096)
+def _simple_num_to_words(num: int) -> str:
+    """Простая конвертация числа в слова (без внешних библиотек)"""
+    if num == 0:
+        return 'ноль'
+    if num < 10:
+        return _ONES[num]
+    if num < 20:
+        return _TEENS[num - 10]
+    if num < 100:
+        return (_TENS[num // 10] + ' ' + _ONES[num % 10]).strip()
+    return str(num)
+
+
+@lru_cache(maxsize=4096)
+def _year_to_words(year: int) -> str:
+    """Конвертирует год в слова (русский)"""
+    if year >= 2000:
+        remainder = year % 1000
+
+        if remainder == 0:
+            return "две тысячи"
+
+        result = "две тысячи"
+
+        if remainder >= 100:
+            hundreds = remainder // 100
+            remainder = remainder % 100
+            result += f" {_HUNDREDS.get(hundreds, '')}"
+
+        if remainder > 0:
+            result += f" {_simple_num_to_words(remainder)}"
+
+        return result.strip()
+    else:
+        return _simple_num_to_words(year)
+
+
+@lru_cache(maxsize=16384)
+def _number_string_to_words(number_str: str) -> str:
+    """Число из текста ('12', '3,14', '0.125') в слова; при ошибке - без изменений"""
+    try:
+        # Десятичные числа
+        if '.' in number_str or ',' in number_str:
+            num = float(number_str.replace(',', '.'))
+
+            # Разбиваем на целую и дробную часть
+            integer_part = int(num)
+            decimal_part = str(num).split('.')[1] if '.' in str(num) else ''
+
+            result = _simple_num_to_words(integer_part)
+
+            if decimal_part:
+                result += ' целых '
+                for digit in decimal_part:
+                    result += _simple_num_to_words(int(digit)) + ' '
+
+                # Определяем разряд
+                decimal_places = len(decimal_part)
+                if decimal_places == 1:
+                    result += 'десятых'
+                elif decimal_places == 2:
+                    result += 'сотых'
+                elif decimal_places == 3:
+                    result += 'тысячных'
+
+            return result
+
+        # Целые числа
+        return _simple_num_to_words(int(number_str))
+
+    except:
+        return number_str
+
+
+_WORD = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=8)
+def _compile_abbreviations(items: Tuple[Tuple[str, str], ...]):
+    """
+    Компилирует словарь сокращений (один раз на словарь)
+
+    Слова внутри сокращения отделены от соседей не-буквами (точкой, пробелом,
+    дефисом) или границей слова, поэтому в тексте каждое из них - целое слово.
+    Слова сравниваются тем же движком с IGNORECASE, что и сами шаблоны.
+
+    Returns:
+        (шаблон слов, шаблон разделителей фрагментов,
+         [(шаблон, замена, нужные слова, разблокируемые слова)])
+
+        «Разблокируемые» - слова, которые могут появиться в тексте после замены:
+        внутри самой замены или при склейке её конца со следующим словом
+        (сокращение оканчивается точкой, а замена - буквой).
+    """
+    words = []
+
+    def word_index(word: str) -> int:
+        for index, known in enumerate(words):
+            if re.fullmatch(re.escape(known), word, re.IGNORECASE):
+                return index
+        words.append(word)
+        return len(words) - 1
+
+    required_words = [frozenset(word_index(word) for word in _WORD.findall(abbr)) for abbr, _ in items]
+
+    word_matcher = None
+    if words:
+        word_matcher = re.compile(
+            '|'.join(f'({re.escape(word)})' for word in words),
+            re.IGNORECASE
+        )
+
+    entries = []
+    for (abbr, full_form), required in zip(items, required_words):
+        pattern = re.compile(r'\b' + re.escape(abbr) + r'\b', re.IGNORECASE)
+
+        unlocks = set()
+        for word in _WORD.findall(full_form):
+            match = word_matcher.fullmatch(word) if word_matcher else None
+            if match:
+                unlocks.add(match.lastindex - 1)
+
+        if abbr and not _WORD.match(abbr[0]):
+            # Сокращение начинается не с буквы - замена может склеить соседние слова
+            unlocks = set(range(len(words)))
+        elif abbr and not _WORD.match(abbr[-1]) and full_form and _WORD.match(full_form[-1]):
+            # Склейка: «...ЗАМЕНА» + «слово» → новое слово с началом из хвоста замены
+            tail = _WORD.findall(full_form)[-1]
+            for index, word in enumerate(words):
+                if len(word) > len(tail) and re.fullmatch(re.escape(word[:len(tail)]), tail, re.IGNORECASE):
+                    unlocks.add(index)
+
+        entries.append((pattern, full_form, required, frozenset(unlocks)))
+
+    # Разделители фрагментов: не-буквы, которых нет ни в одном сокращении,
+    # поэтому совпадение не может через них перейти, а \b на краю фрагмента
+    # работает так же, как в целом тексте
+    separator_chars = [char for char in '\n,;:!?' if not any(char in abbr for abbr, _ in items)]
+    separators = re.compile('([' + re.escape(''.join(separator_chars)) + '])') if separator_chars else None
+
+    return word_matcher, separators, entries
@@ -0,0 +1,184 @@
+"""
+Token Budget - лимит токенов ответа LLM по объёму запрошенного текста
+Переводит целевую длину в словах в max_tokens / num_predict для конкретной
+модели и уточняет оценку по фактической длине полученных сценариев
+"""
+
+import contextvars
+import json
+import math
+import os
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+
+# Токенов на слово по семействам моделей (приближение токенизаторов).
+# Кириллица дробится сильнее латиницы, особенно у словарей, обученных на английском.
+TOKENS_PER_WORD = {
+    'llama': {'ru': 2.6, 'en': 1.35},
+    'qwen': {'ru': 2.4, 'en': 1.3},
+    'mistral': {'ru': 3.2, 'en': 1.45},
+    'gemini': {'ru': 1.9, 'en': 1.3},
+    'gpt': {'ru': 1.8, 'en': 1.3},
+}
+
+# Для неизвестной модели - с запасом
+DEFAULT_TOKENS_PER_WORD = {'ru': 3.0, 'en': 1.5}
+
+# Объём ответа текущего запроса: (целевые слова, язык, служебные слова).
+# ContextVar, а не атрибут генератора: параллельные запросы (разделы длинного
+# сценария, пакеты тем) выполняются в своих задачах asyncio и не мешают друг другу.
+_expected_output: contextvars.ContextVar[Optional[Tuple[int, str, int]]] = contextvars.ContextVar(
+    'expected_output', default=None
+)
+
+
+@contextmanager
+def expected_output(target_words: int, language: str = 'ru', extra_words: int = 0):
+    """
+    Объём ответа для запросов внутри блока
+
+    Пример:
+        with expected_output(1000, 'ru', extra_words=150):
+            content = await candidate['generate'](prompt)
+
+    Args:
+        target_words: Сколько слов основного текста просим у модели
+        language: Язык ответа
+        extra_words: Служебный текст сверх основного (hook, CTA, заголовки, разметка)
+    """
+    token = _expected_output.set((target_words, language, extra_words))
+    try:
+        yield
+    finally:
+        _expected_output.reset(token)
+
+
+def current_output() -> Optional[Tuple[int, str, int]]:
+    """Объём ответа текущего запроса или None (лимит по умолчанию)"""
+    return _expected_output.get()
+
+
+class TokenBudgetEstimator:
+    """
+    Оценка лимита токенов ответа
+
+    budget = (target_words × length_ratio + extra_words) × tokens_per_word × margin
+
+    length_ratio - во сколько раз модель обычно превышает запрошенную длину
+    (EWMA по фактическому word_count, хранится в JSON между запусками).
+    Недобор длины лимит не уменьшает: иначе обрезанный ответ сократил бы
+    следующий лимит ещё сильнее.
+    """
+
+    def __init__(
+        self,
+        state_file: str = ".token_budget.json",
+        alpha: float = 0.3,
+        margin: float = 1.25,
+        min_tokens: int = 256,
+        max_tokens: int = 8000
+    ):
+        """
+        Args:
+            state_file: Файл статистики длины ответов
+            alpha: Вес нового замера в EWMA (0..1)
+            margin: Запас сверх оценки (ошибка токенизатора, разметка)
+            min_tokens: Нижняя граница лимита
+            max_tokens: Верхняя граница лимита (максимум ответа у провайдеров)
+        """
+        self.state_file = state_file
+        self.alpha = alpha
+        self.margin = margin
+        self.min_tokens = min_tokens
+        self.max_tokens = max_tokens
+
+        self.stats: Dict[str, Dict] = self._load_stats()
+
+    def family(self, model: str) -> str:
+        """Семейство модели ('llama-3.1-70b-versatile' -> 'llama')"""
+        model = model.lower()
+        for family in TOKENS_PER_WORD:
+            if family in model:
+                return family
+        return 'other'
+
+    def tokens_per_word(self, model: str, language: str) -> float:
+        """Среднее число токенов на слово для модели и языка"""
+        ratios = TOKENS_PER_WORD.get(self.family(model), DEFAULT_TOKENS_PER_WORD)
+        return ratios.get(language, DEFAULT_TOKENS_PER_WORD.get(language, DEFAULT_TOKENS_PER_WORD['ru']))
+
+    def length_ratio(self, model: str, language: str) -> float:
+        """Фактическая длина / запрошенная по наблюдениям (1.0 без замеров)"""
+        entry = self.stats.get(self._key(model, language))
+        return entry['ratio'] if entry else 1.0
+
+    def estimate(self, target_words: int, language: str, model: str, extra_words: int = 0) -> int:
+        """
+        Лимит токенов ответа
+
+        Args:
+            target_words: Сколько слов основного текста просим
+            language: Язык ответа
+            model: Модель (по названию определяется токенизатор)
+            extra_words: Служебный текст сверх основного
+
+        Returns:
+            max_tokens, кратный 64, в пределах [min_tokens, max_tokens]
+        """
+        words = target_words * max(1.0, self.length_ratio(model, language)) + extra_words
+        tokens = words * self.tokens_per_word(model, language) * self.margin
+        tokens = math.ceil(tokens / 64) * 64
+
+        return max(self.min_tokens, min(self.max_tokens, tokens))
+
+    def observe(self, model: str, language: str, target_words: int, actual_words: int):
+        """
+        Учитывает фактическую длину ответа
+
+        Args:
+            model: Модель, написавшая ответ
+            language: Язык ответа
+            target_words: Запрошенная длина (слов)
+            actual_words: Полученная длина (result['word_count'])
+        """
+        if target_words <= 0 or actual_words <= 0:
+            return
+
+        ratio = actual_words / target_words
+        key = self._key(model, language)
+        entry = self.stats.get(key)
+
+        if entry is None:
+            entry = {'ratio': ratio, 'samples': 0}
+        else:
+            entry['ratio'] = self.alpha * ratio + (1 - self.alpha) * entry['ratio']
+
+        entry['samples'] += 1
+        self.stats[key] = entry
+        self._save_stats()
+
+    def get_status(self) -> Dict[str, Dict]:
+        """Статистика длины ответов по семействам моделей и языкам"""
+        return {key: dict(entry) for key, entry in self.stats.items()}
+
+    def _key(self, model: str, language: str) -> str:
+        return f"{self.family(model)}:{language}"
+
+    def _load_stats(self) -> Dict:
+        """Загружает статистику"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def _save_stats(self):
+        """Сохраняет статистику"""
+        try:
+            with open(self.state_file, 'w') as f:
+                json.dump(self.stats, f, indent=2)
+        except Exception as e:
+            print(f"⚠️  Ошибка сохранения статистики длины ответов: {e}")
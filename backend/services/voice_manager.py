@@ -4,6 +4,7 @@ Voice Manager - профессиональная озвучка через Eleve
 """
 
 import os
+import re
 import asyncio
 from typing import Dict, List, Optional
 import requests
@@ -11,6 +12,9 @@ from pydub import AudioSegment
 from pydub.silence import detect_nonsilent
 import io
 
+from services.quota_scheduler import ElevenLabsQuotaScheduler
+from services.audio_stream import StreamingAudioProcessor
+
 
 class VoiceManager:
     """
@@ -31,6 +35,18 @@ class VoiceManager:
         # ElevenLabs API endpoint
         self.api_url = "https://api.elevenlabs.io/v1/text-to-speech"
 
+        # Максимальная длина одного запроса к ElevenLabs (символов)
+        self.max_chunk_chars = 2500
+
+        # С какой длины текста обрабатывать аудио потоково (~30 мин озвучки)
+        self.streaming_threshold_chars = 30000
+
+        # Планировщик ключей по остатку символов (только для SafeAPIManager)
+        if hasattr(api_key_manager, 'get_elevenlabs_remaining'):
+            self.quota_scheduler = ElevenLabsQuotaScheduler(api_key_manager)
+        else:
+            self.quota_scheduler = None
+
         # Все бесплатные голоса ElevenLabs с характеристиками
         self.voices = self._init_voices()
 
@@ -373,7 +389,8 @@ class VoiceManager:
         output_path: str,
         normalize_text: bool = True,
         remove_silence: bool = True,
-        normalize_volume: bool = True
+        normalize_volume: bool = True,
+        streaming: Optional[bool] = None
     ) -> str:
         """
         Генерирует аудио с профессиональной обработкой
@@ -385,6 +402,8 @@ class VoiceManager:
             normalize_text: Нормализовать текст перед озвучкой
             remove_silence: Обрезать длинные паузы
             normalize_volume: Нормализовать громкость
+            streaming: Потоковая обработка с постоянной памятью
+                       (None - автоматически для длинных текстов)
 
         Returns:
             Путь к сгенерированному файлу
@@ -424,10 +443,98 @@ class VoiceManager:
         # 2. Генерация через ElevenLabs
         print(f"   🎵 Генерация аудио через ElevenLabs...")
 
-        # Получаем API ключ
-        api_key = await self.key_manager.get_safe_elevenlabs_key()
+        # Режем текст на фрагменты и заранее раскладываем их по ключам
+        chunks = self._split_text_into_chunks(text)
+
+        if self.quota_scheduler and len(chunks) > 1:
+            planned_keys = self.quota_scheduler.plan([len(chunk) for chunk in chunks])
+        else:
+            planned_keys = [None] * len(chunks)
+
+        temp_path = output_path.replace('.mp3', '_temp.mp3')
+        done = 0
 
-        url = f"{self.api_url}/{actual_voice_id}"
+        try:
+            with open(temp_path, 'wb') as f:
+                for chunk, api_key in zip(chunks, planned_keys):
+                    if len(chunks) > 1:
+                        print(f"   [{done + 1}/{len(chunks)}] Фрагмент {len(chunk)} символов...")
+
+                    # Сохраняем raw аудио (mp3 фрагменты склеиваются побайтно)
+                    f.write(await self._synthesize_chunk(chunk, actual_voice_id, api_key))
+                    done += 1
+
+        except (Exception, asyncio.CancelledError) as e:
+            print(f"   ❌ Ошибка: {e}")
+            # Освобождаем символы, зарезервированные под ещё не начатые фрагменты (ошибка или отмена).
+            # Резерв фрагмента done снимает сам _synthesize_chunk при любой ошибке
+            if self.quota_scheduler:
+                for chunk, api_key in zip(chunks[done + 1:], planned_keys[done + 1:]):
+                    if api_key:
+                        self.quota_scheduler.release(api_key, len(chunk))
+
+            # Недописанный _temp.mp3 не оставляем
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        print(f"   ✅ Аудио сгенерировано ({len(text)} символов)")
+
+        if streaming is None:
+            streaming = len(text) >= self.streaming_threshold_chars
+
+        # 3. Обработка аудио
+        if streaming:
+            # Длинная озвучка: окнами через memmap, без загрузки в память
+            print(f"   🌊 Потоковая обработка (обрезка пауз, нормализация, fade)...")
+            duration = StreamingAudioProcessor().process_file(
+                temp_path,
+                output_path,
+                remove_silence=remove_silence,
+                normalize_volume=normalize_volume
+            )
+        else:
+            duration = self._process_in_memory(temp_path, output_path, remove_silence, normalize_volume)
+
+        # Удаляем temp файл
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        print(f"   ✅ Аудио готово: {output_path}")
+        print(f"   ⏱️  Длительность: {duration:.1f}s")
+
+        return output_path
+
+    async def _synthesize_chunk(
+        self,
+        text: str,
+        voice_id: str,
+        api_key: Optional[str] = None
+    ) -> bytes:
+        """
+        Озвучивает один фрагмент через ElevenLabs
+
+        Args:
+            text: Фрагмент текста (уже нормализованный)
+            voice_id: ID голоса ElevenLabs
+            api_key: Ключ из плана планировщика (None - выбрать сейчас)
+
+        Returns:
+            MP3 байты фрагмента
+        """
+
+        if api_key:
+            try:
+                await self.quota_scheduler.wait_turn()
+            except (Exception, asyncio.CancelledError):
+                # Фрагмент так и не отправлен - его резерв больше не нужен
+                self.quota_scheduler.release(api_key, len(text))
+                raise
+        else:
+            # Ключ без плана: сразу отсекаем ключи с недостаточным остатком
+            api_key = await self.key_manager.get_safe_elevenlabs_key(required_chars=len(text))
+
+        url = f"{self.api_url}/{voice_id}"
 
         headers = {
             "Accept": "audio/mpeg",
@@ -447,72 +554,118 @@ class VoiceManager:
         }
 
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=120)
+            # Синхронный клиент - в отдельном потоке: отмена задачи не ждёт ответа API
+            response = await asyncio.to_thread(requests.post, url, json=data, headers=headers, timeout=120)
+        except (Exception, asyncio.CancelledError):
+            if self.quota_scheduler:
+                self.quota_scheduler.release(api_key, len(text))
+            raise
 
-            if response.status_code == 200:
-                # Сохраняем raw аудио
-                temp_path = output_path.replace('.mp3', '_temp.mp3')
-                with open(temp_path, 'wb') as f:
-                    f.write(response.content)
+        if response.status_code == 200:
+            # Трекаем использование (считаем символы)
+            if self.quota_scheduler:
+                self.quota_scheduler.commit(api_key, len(text))
+            else:
+                self.key_manager.track_usage('elevenlabs', api_key, len(text))
 
-                # Трекаем использование (считаем символы)
-                chars_used = len(text)
-                self.key_manager.track_usage('elevenlabs', api_key, chars_used)
+            return response.content
 
-                print(f"   ✅ Аудио сгенерировано ({chars_used} символов)")
+        error_msg = f"ElevenLabs API error: {response.status_code}"
+        print(f"   ❌ {error_msg}")
+        print(f"   {response.text}")
 
-                # 3. Обработка аудио
-                audio = AudioSegment.from_mp3(temp_path)
+        # Отмечаем ошибку
+        self.key_manager.mark_key_as_blocked('elevenlabs', api_key, error_msg)
 
-                # 3.1 Обрезка длинных пауз (КРИТИЧНО!)
-                if remove_silence:
-                    print(f"   ✂️  Обрезка пауз...")
-                    audio = self._remove_long_silences(audio)
+        # Retry с другим ключом
+        next_key = None
+        if self.quota_scheduler:
+            self.quota_scheduler.release(api_key, len(text))
+            next_key = self.quota_scheduler.plan([len(text)])[0]
 
-                # 3.2 Нормализация громкости
-                if normalize_volume:
-                    print(f"   🔊 Нормализация громкости...")
-                    audio = self._normalize_volume(audio)
+        return await self._synthesize_chunk(text, voice_id, next_key)
 
-                # 3.3 Fade in/out (плавное начало и конец)
-                audio = audio.fade_in(100).fade_out(100)
+    def _split_text_into_chunks(self, text: str, max_chars: Optional[int] = None) -> List[str]:
+        """
+        Делит текст на фрагменты по границам предложений
+
+        Args:
+            text: Текст для озвучки
+            max_chars: Максимальная длина фрагмента (по умолчанию self.max_chunk_chars)
 
-                # Сохраняем финальное аудио
-                audio.export(output_path, format="mp3", bitrate="192k")
+        Returns:
+            Список фрагментов, каждый не длиннее max_chars
+        """
 
-                # Удаляем temp файл
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+        max_chars = max_chars or self.max_chunk_chars
 
-                duration = len(audio) / 1000.0  # в секундах
-                print(f"   ✅ Аудио готово: {output_path}")
-                print(f"   ⏱️  Длительность: {duration:.1f}s")
+        if len(text) <= max_chars:
+            return [text]
 
-                return output_path
+        sentences = re.split(r'(?<=[.!?])\s+', text)
 
+        chunks = []
+        current = ''
+
+        for sentence in sentences:
+            # Слишком длинное предложение режем по словам
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(' ', 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                if current:
+                    chunks.append(current)
+                    current = ''
+                chunks.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+
+            if not sentence:
+                continue
+
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = sentence
             else:
-                error_msg = f"ElevenLabs API error: {response.status_code}"
-                print(f"   ❌ {error_msg}")
-                print(f"   {response.text}")
-
-                # Отмечаем ошибку
-                self.key_manager.mark_key_as_blocked(
-                    'elevenlabs',
-                    api_key,
-                    error_msg
-                )
-
-                # Retry с другим ключом
-                return await self.generate_audio(
-                    text, voice_id, output_path,
-                    normalize_text=False,  # Уже нормализовали
-                    remove_silence=remove_silence,
-                    normalize_volume=normalize_volume
-                )
-
-        except Exception as e:
-            print(f"   ❌ Ошибка: {e}")
-            raise
+                current = f"{current} {sentence}" if current else sentence
+
+        if current:
+            chunks.append(current)
+
+        return chunks
+
+    def _process_in_memory(
+        self,
+        temp_path: str,
+        output_path: str,
+        remove_silence: bool,
+        normalize_volume: bool
+    ) -> float:
+        """
+        Обработка через pydub (всё аудио в памяти) - для коротких озвучек
+
+        Returns:
+            Длительность в секундах
+        """
+
+        audio = AudioSegment.from_mp3(temp_path)
+
+        # 3.1 Обрезка длинных пауз (КРИТИЧНО!)
+        if remove_silence:
+            print(f"   ✂️  Обрезка пауз...")
+            audio = self._remove_long_silences(audio)
+
+        # 3.2 Нормализация громкости
+        if normalize_volume:
+            print(f"   🔊 Нормализация громкости...")
+            audio = self._normalize_volume(audio)
+
+        # 3.3 Fade in/out (плавное начало и конец)
+        audio = audio.fade_in(100).fade_out(100)
+
+        # Сохраняем финальное аудио
+        audio.export(output_path, format="mp3", bitrate="192k")
+
+        return len(audio) / 1000.0  # в секундах
 
     def _remove_long_silences(
         self,
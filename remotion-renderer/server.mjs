@@ -0,0 +1,184 @@
+// Render server: один bundle и один браузер на всё время работы.
+// Запускается и контролируется из Python (backend/services/remotion_server.py).
+//
+// GET  /health  -> { ok, pid, bundled, sourceHash, rendering }
+// GET  /progress?outputPath=...  -> { renderedFrames, totalFrames } (пока рендер идёт)
+// POST /render  <- { props, outputPath, sourceHash, codec, concurrency, x264Preset, crf }
+//               -> { outputPath, seconds }
+// POST /cancel  <- { outputPath }  -> { cancelled } (прерывает идущий рендер)
+//
+// Bundle пересобирается, только если sourceHash из запроса отличается от собранного.
+
+import http from 'node:http';
+import path from 'node:path';
+import { bundle } from '@remotion/bundler';
+import { openBrowser, selectComposition, renderMedia, makeCancelSignal } from '@remotion/renderer';
+
+const port = Number(process.env.RENDER_SERVER_PORT || 3123);
+const entryPoint = path.join(process.cwd(), 'src', 'index.tsx');
+const compositionId = 'Video';
+
+let serveUrl = null;
+let bundledHash = null;
+let bundling = null;
+let browser = null;
+let rendering = 0;
+const progress = new Map();
+const cancels = new Map();
+
+async function ensureBundle(sourceHash) {
+  if (serveUrl && (!sourceHash || sourceHash === bundledHash)) {
+    return serveUrl;
+  }
+
+  if (!bundling) {
+    bundling = (async () => {
+      const started = Date.now();
+      serveUrl = await bundle({ entryPoint });
+      bundledHash = sourceHash || null;
+      console.log(`bundle ready in ${((Date.now() - started) / 1000).toFixed(1)}s (${bundledHash})`);
+      return serveUrl;
+    })().finally(() => {
+      bundling = null;
+    });
+  }
+
+  return bundling;
+}
+
+async function ensureBrowser() {
+  if (!browser) {
+    browser = await openBrowser('chrome');
+  }
+  return browser;
+}
+
+async function render({ props, outputPath, sourceHash, codec = 'h264', concurrency = 4, x264Preset = null, crf = null }) {
+  // Отмена может прийти ещё во время сборки bundle - до начала renderMedia
+  let cancelled = false;
+  const { cancelSignal, cancel } = makeCancelSignal();
+  cancels.set(outputPath, () => {
+    cancelled = true;
+    cancel();
+  });
+
+  const url = await ensureBundle(sourceHash);
+  const puppeteerInstance = await ensureBrowser();
+
+  const composition = await selectComposition({
+    serveUrl: url,
+    id: compositionId,
+    inputProps: props,
+    puppeteerInstance,
+  });
+
+  if (cancelled) {
+    throw new Error('render cancelled');
+  }
+
+  await renderMedia({
+    composition,
+    serveUrl: url,
+    codec,
+    outputLocation: outputPath,
+    inputProps: props,
+    concurrency,
+    puppeteerInstance,
+    overwrite: true,
+    cancelSignal,
+    ...(x264Preset ? { x264Preset } : {}),
+    ...(crf !== null ? { crf } : {}),
+    onProgress: ({ renderedFrames }) => {
+      progress.set(outputPath, { renderedFrames, totalFrames: composition.durationInFrames });
+    },
+  });
+}
+
+function readJson(request) {
+  return new Promise((resolve, reject) => {
+    let body = '';
+    request.on('data', (chunk) => {
+      body += chunk;
+    });
+    request.on('end', () => {
+      try {
+        resolve(JSON.parse(body || '{}'));
+      } catch (error) {
+        reject(error);
+      }
+    });
+    request.on('error', reject);
+  });
+}
+
+function send(response, status, payload) {
+  response.writeHead(status, { 'Content-Type': 'application/json' });
+  response.end(JSON.stringify(payload));
+}
+
+const server = http.createServer(async (request, response) => {
+  if (request.method === 'GET' && request.url === '/health') {
+    send(response, 200, { ok: true, pid: process.pid, bundled: Boolean(serveUrl), sourceHash: bundledHash, rendering });
+    return;
+  }
+
+  if (request.method === 'GET' && request.url.startsWith('/progress')) {
+    const outputPath = new URL(request.url, 'http://127.0.0.1').searchParams.get('outputPath');
+    send(response, 200, progress.get(outputPath) || {});
+    return;
+  }
+
+  if (request.method === 'POST' && request.url === '/render') {
+    const started = Date.now();
+    let job = {};
+    rendering += 1;
+
+    try {
+      job = await readJson(request);
+      await render(job);
+      send(response, 200, { outputPath: job.outputPath, seconds: (Date.now() - started) / 1000 });
+    } catch (error) {
+      console.error(error);
+      send(response, 500, { error: String(error && error.stack ? error.stack : error) });
+    } finally {
+      progress.delete(job.outputPath);
+      cancels.delete(job.outputPath);
+      rendering -= 1;
+    }
+    return;
+  }
+
+  if (request.method === 'POST' && request.url === '/cancel') {
+    try {
+      const { outputPath } = await readJson(request);
+      const cancel = cancels.get(outputPath);
+      if (cancel) {
+        cancel();
+      }
+      send(response, 200, { cancelled: Boolean(cancel) });
+    } catch (error) {
+      send(response, 400, { error: String(error) });
+    }
+    return;
+  }
+
+  send(response, 404, { error: 'not found' });
+});
+
+// Только локальные подключения
+server.listen(port, '127.0.0.1', () => {
+  console.log(`render server listening on 127.0.0.1:${port}`);
+  // Прогрев: bundle и браузер готовы к первому запросу
+  ensureBundle(process.env.SOURCE_HASH).then(ensureBrowser).catch((error) => console.error(error));
+});
+
+async function shutdown() {
+  server.close();
+  if (browser) {
+    await browser.close({ silent: true }).catch(() => {});
+  }
+  process.exit(0);
+}
+
+process.on('SIGTERM', shutdown);
+process.on('SIGINT', shutdown);
@@ -0,0 +1,47 @@
+import React from 'react';
+import { Composition, CalculateMetadataFunction } from 'remotion';
+import { Video } from './Video';
+import { VideoConfig } from './types';
+
+interface VideoProps {
+  config: VideoConfig;
+}
+
+const defaultConfig: VideoConfig = {
+  scenes: [],
+  fps: 30,
+  width: 1920,
+  height: 1080,
+};
+
+// Длительность и формат считаются из props задачи (--props), а не из общего файла:
+// параллельные рендеры получают каждый свои сцены
+const calculateMetadata: CalculateMetadataFunction<VideoProps> = ({ props }) => {
+  const { scenes, fps, width, height } = props.config;
+  const durationInFrames = scenes.reduce(
+    (total, scene) => total + Math.round(scene.duration * fps),
+    0
+  );
+
+  return {
+    durationInFrames: Math.max(1, durationInFrames),
+    fps,
+    width,
+    height,
+  };
+};
+
+export const Root: React.FC = () => {
+  return (
+    <Composition
+      id="Video"
+      component={Video}
+      durationInFrames={1}
+      fps={defaultConfig.fps}
+      width={defaultConfig.width}
+      height={defaultConfig.height}
+      defaultProps={{ config: defaultConfig }}
+      calculateMetadata={calculateMetadata}
+    />
+  );
+};
@@ -10,7 +10,7 @@ interface VideoProps {
 }
 
 export const Video: React.FC<VideoProps> = ({ config }) => {
-  const { scenes, audioPath, fps } = config;
+  const { scenes, audioPath, fps, simpleTransitions } = config;
 
   let currentFrame = 0;
 
@@ -26,6 +26,7 @@ export const Video: React.FC<VideoProps> = ({ config }) => {
         currentFrame += durationInFrames;
 
         const transitionDuration = Math.round(0.5 * fps); // 0.5 сек transition
+        const fadeIn = (scene.fadeIn ?? index > 0) && !simpleTransitions;
 
         return (
           <Sequence
@@ -34,7 +35,7 @@ export const Video: React.FC<VideoProps> = ({ config }) => {
             durationInFrames={durationInFrames}
           >
             {/* Transition in */}
-            {index > 0 && (
+            {fadeIn && (
               <Transition
                 transitionType="fade"
                 durationInFrames={transitionDuration}
@@ -43,16 +44,18 @@ export const Video: React.FC<VideoProps> = ({ config }) => {
                 <KenBurnsScene
                   imagePath={scene.imagePath}
                   effect={scene.effect}
+                  effectParams={scene.effectParams}
                   durationInFrames={durationInFrames}
                 />
               </Transition>
             )}
 
-            {/* Сцена без transition для первого кадра */}
-            {index === 0 && (
+            {/* Сцена без transition для первого кадра (и в черновом профиле) */}
+            {!fadeIn && (
               <KenBurnsScene
                 imagePath={scene.imagePath}
                 effect={scene.effect}
+                effectParams={scene.effectParams}
                 durationInFrames={durationInFrames}
               />
             )}
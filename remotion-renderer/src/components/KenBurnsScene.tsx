@@ -1,16 +1,19 @@
 import React from 'react';
 import { useCurrentFrame, useVideoConfig, interpolate, Img, spring } from 'remotion';
 import { easeInOutCubic } from '../utils/easing';
+import { EffectParams } from '../types';
 
 interface KenBurnsSceneProps {
   imagePath: string;
   effect: 'zoom_in' | 'zoom_out' | 'pan_left' | 'pan_right' | 'pan_up' | 'pan_down' | 'static';
+  effectParams?: EffectParams | null;
   durationInFrames: number;
 }
 
 export const KenBurnsScene: React.FC<KenBurnsSceneProps> = ({
   imagePath,
   effect,
+  effectParams,
   durationInFrames,
 }) => {
   const frame = useCurrentFrame();
@@ -35,29 +38,42 @@ export const KenBurnsScene: React.FC<KenBurnsSceneProps> = ({
   let translateX = 0;
   let translateY = 0;
 
-  switch (effect) {
-    case 'zoom_in':
-      scale = interpolate(easedProgress, [0, 1], [1, 1.3]);
-      break;
-    case 'zoom_out':
-      scale = interpolate(easedProgress, [0, 1], [1.3, 1]);
-      break;
-    case 'pan_left':
-      scale = 1.2;
-      translateX = interpolate(easedProgress, [0, 1], [10, -10]);
-      break;
-    case 'pan_right':
-      scale = 1.2;
-      translateX = interpolate(easedProgress, [0, 1], [-10, 10]);
-      break;
-    case 'pan_up':
-      scale = 1.2;
-      translateY = interpolate(easedProgress, [0, 1], [10, -10]);
-      break;
-    case 'pan_down':
-      scale = 1.2;
-      translateY = interpolate(easedProgress, [0, 1], [-10, 10]);
-      break;
+  if (effectParams) {
+    // Окно из backend (как zoompan в FFmpegRenderer): центр окна - точка кадра,
+    // которая оказывается в середине; окно не выходит за края кадра
+    scale = interpolate(easedProgress, [0, 1], [effectParams.start_scale, effectParams.end_scale]);
+
+    const half = 0.5 / Math.max(scale, 1);
+    const center = (start: number, end: number) =>
+      Math.min(1 - half, Math.max(half, interpolate(easedProgress, [0, 1], [start, end])));
+
+    translateX = (0.5 - center(effectParams.start_position[0], effectParams.end_position[0])) * 100;
+    translateY = (0.5 - center(effectParams.start_position[1], effectParams.end_position[1])) * 100;
+  } else {
+    switch (effect) {
+      case 'zoom_in':
+        scale = interpolate(easedProgress, [0, 1], [1, 1.3]);
+        break;
+      case 'zoom_out':
+        scale = interpolate(easedProgress, [0, 1], [1.3, 1]);
+        break;
+      case 'pan_left':
+        scale = 1.2;
+        translateX = interpolate(easedProgress, [0, 1], [10, -10]);
+        break;
+      case 'pan_right':
+        scale = 1.2;
+        translateX = interpolate(easedProgress, [0, 1], [-10, 10]);
+        break;
+      case 'pan_up':
+        scale = 1.2;
+        translateY = interpolate(easedProgress, [0, 1], [10, -10]);
+        break;
+      case 'pan_down':
+        scale = 1.2;
+        translateY = interpolate(easedProgress, [0, 1], [-10, 10]);
+        break;
+    }
   }
 
   return (
@@ -1,7 +1,4 @@
 import { registerRoot } from 'remotion';
-import { Video } from './Video';
-import config from './config.json';
+import { Root } from './Root';
 
-registerRoot(() => {
-  return <Video config={config} />;
-});
+registerRoot(Root);
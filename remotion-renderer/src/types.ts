@@ -1,7 +1,20 @@
+// Параметры Ken Burns из backend (KenBurnsEffect.get_effect_params / reframe_params):
+// масштаб и центр окна в кадре (0..1), пересчитанные под формат видео
+export interface EffectParams {
+  start_scale: number;
+  end_scale: number;
+  start_position: [number, number];
+  end_position: [number, number];
+}
+
 export interface Scene {
   imagePath: string;
   duration: number;
   effect: 'zoom_in' | 'zoom_out' | 'pan_left' | 'pan_right' | 'pan_up' | 'pan_down' | 'static';
+  effectParams?: EffectParams | null;
+  // Fade in сцены; по умолчанию - у всех, кроме первой. Клипы сцен и сегментов
+  // передают явно: первая сцена клипа может быть не первой в видео
+  fadeIn?: boolean;
   subtitle?: {
     text: string;
     startTime: number;
@@ -16,4 +29,6 @@ export interface VideoConfig {
   fps: number;
   width: number;
   height: number;
+  // Черновой профиль: сцены склеиваются встык, без fade
+  simpleTransitions?: boolean;
 }
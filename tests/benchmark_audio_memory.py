@@ -0,0 +1,89 @@
+"""
+Бенчмарк памяти: обработка озвучки через pydub vs потоковая (memmap)
+
+Каждый прогон - в отдельном процессе, печатается пиковый RSS (ru_maxrss).
+
+Запуск:
+    python tests/benchmark_audio_memory.py            # 5, 30, 60 минут
+    python tests/benchmark_audio_memory.py 10 120     # свои длительности (мин)
+"""
+
+import sys
+import os
+import resource
+import subprocess
+import tempfile
+import time
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+
+def peak_rss_mb() -> float:
+    # Linux: килобайты, macOS: байты
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(mode: str, source: str, result: str):
+    """Один прогон обработки (вызывается в дочернем процессе)"""
+    start = time.time()
+
+    if mode == 'streaming':
+        from services.audio_stream import StreamingAudioProcessor
+        StreamingAudioProcessor().process_wav(source, result)
+    else:
+        from pydub import AudioSegment
+        from services.voice_manager import VoiceManager
+
+        manager = VoiceManager.__new__(VoiceManager)
+        audio = AudioSegment.from_wav(source)
+        audio = manager._remove_long_silences(audio)
+        audio = manager._normalize_volume(audio)
+        audio.fade_in(100).fade_out(100).export(result, format='wav')
+
+    print(f"{peak_rss_mb():.1f} {time.time() - start:.1f}")
+
+
+def measure(mode: str, source: str, result: str):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', mode, source, result],
+        capture_output=True, text=True
+    )
+    if output.returncode != 0:
+        return None
+    rss, seconds = output.stdout.split()[-2:]
+    return float(rss), float(seconds)
+
+
+def main(minutes_list):
+    from test_audio_stream import write_speech_like_wav
+
+    print("=" * 70)
+    print("🧪 БЕНЧМАРК ПАМЯТИ ОБРАБОТКИ АУДИО (16 kHz mono, 16-bit)")
+    print("=" * 70)
+    print(f"{'Длительность':>14} | {'WAV':>8} | {'pydub RSS':>14} | {'stream RSS':>14}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for minutes in minutes_list:
+            source = os.path.join(tmp, f'{minutes}.wav')
+            write_speech_like_wav(source, minutes * 60)
+            size_mb = os.path.getsize(source) / 1024 / 1024
+
+            row = []
+            for mode in ('pydub', 'streaming'):
+                stats = measure(mode, source, os.path.join(tmp, f'{minutes}_{mode}.wav'))
+                row.append(f"{stats[0]:7.1f}MB {stats[1]:4.1f}s" if stats else f"{'—':>14}")
+
+            print(f"{minutes:>10} мин | {size_mb:6.1f}MB | {row[0]:>14} | {row[1]:>14}")
+
+            os.remove(source)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(*sys.argv[2:5])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or [5, 30, 60])
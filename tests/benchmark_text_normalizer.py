@@ -0,0 +1,93 @@
+"""
+Бенчмарк TextNormalizer.normalize_for_tts на длинных сценариях
+
+Два вида сценариев нужной длины:
+- обычный: повествовательный текст, каждое пятое предложение - фраза из
+  golden-корпуса (даты, числа, сокращения, URL, markdown)
+- плотный: только фразы golden-корпуса (худший случай)
+
+Запуск:
+    python tests/benchmark_text_normalizer.py              # 10k, 25k, 50k слов
+    python tests/benchmark_text_normalizer.py 5000 100000  # свои размеры
+"""
+
+import sys
+import os
+import io
+import json
+import contextlib
+import time
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.text_normalizer import TextNormalizer
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'golden', 'text_normalizer.json')
+
+PROSE = [
+    "Большинство людей даже не подозревают, насколько сильно привычки влияют на их жизнь.",
+    "Каждое утро мы принимаем сотни решений, и почти все они происходят автоматически.",
+    "Психологи давно заметили, что мозг стремится экономить энергию любой ценой.",
+    "Именно поэтому так сложно начать бегать по утрам или отказаться от сладкого.",
+    "Но хорошая новость в том, что привычки можно менять, если понимать, как они устроены.",
+    "Представьте себе обычный вечер: вы пришли домой, устали и хотите просто отдохнуть.",
+    "В этот момент рука сама тянется к телефону, хотя вы собирались почитать книгу.",
+    "Это не слабость характера, а работа древних механизмов вознаграждения.",
+]
+
+
+def build_script(words: int, dense: bool = False) -> str:
+    """Сценарий длиной не меньше words слов"""
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        phrases = [case['input'] for case in json.load(f) if case['language'] == 'ru']
+
+    if not dense:
+        # Четыре обычных предложения на одну фразу корпуса
+        mixed = []
+        for i, phrase in enumerate(phrases):
+            mixed.extend(PROSE[(i + j) % len(PROSE)] for j in range(4))
+            mixed.append(phrase)
+        phrases = mixed
+
+    parts, count = [], 0
+    while count < words:
+        for phrase in phrases:
+            parts.append(phrase)
+            count += len(phrase.split())
+            if count >= words:
+                break
+
+    return '\n'.join(parts)
+
+
+def measure(normalizer: TextNormalizer, text: str, repeats: int = 3) -> float:
+    """Лучшее время из repeats прогонов (сек)"""
+    best = float('inf')
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            normalizer.normalize_for_tts(text)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(sizes):
+    normalizer = TextNormalizer(language='ru')
+
+    print("=" * 60)
+    print("🧪 БЕНЧМАРК TextNormalizer.normalize_for_tts")
+    print("=" * 60)
+    print(f"{'Текст':>8} | {'Слов':>8} | {'Символов':>10} | {'Время':>9} | {'Слов/сек':>10}")
+
+    for dense in (False, True):
+        for words in sizes:
+            text = build_script(words, dense=dense)
+            seconds = measure(normalizer, text)
+            kind = 'плотный' if dense else 'обычный'
+            print(f"{kind:>8} | {words:>8} | {len(text):>10} | {seconds * 1000:7.1f}ms | {words / seconds:>10.0f}")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 25000, 50000])
@@ -0,0 +1,101 @@
+"""
+Тесты потоковой обработки аудио (обрезка пауз, нормализация, память)
+"""
+
+import sys
+import os
+import tracemalloc
+import wave
+
+import numpy as np
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.audio_stream import StreamingAudioProcessor, read_wav_header
+
+SAMPLE_RATE = 16000
+
+
+def write_speech_like_wav(path, seconds, speech_ms=1500, pause_ms=1000):
+    """Синтетическая «речь»: тон 220 Гц чередуется с длинными паузами (окнами, без большой памяти)"""
+    period = SAMPLE_RATE * (speech_ms + pause_ms) // 1000
+    speech = SAMPLE_RATE * speech_ms // 1000
+
+    t = np.arange(speech) / SAMPLE_RATE
+    block = np.zeros(period, dtype='<i2')
+    block[:speech] = (3000 * np.sin(2 * np.pi * 220 * t)).astype('<i2')
+
+    with wave.open(str(path), 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+        for _ in range(SAMPLE_RATE * seconds // period):
+            out.writeframes(block.tobytes())
+
+
+def read_samples(path):
+    with wave.open(str(path), 'rb') as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype='<i2').astype(np.float64)
+
+
+def test_long_pauses_trimmed(tmp_path):
+    source = tmp_path / 'in.wav'
+    result = tmp_path / 'out.wav'
+    write_speech_like_wav(source, 10)
+
+    duration = StreamingAudioProcessor().process_wav(str(source), str(result), normalize_volume=False)
+
+    # 4 фрагмента по 1.5s + 3 паузы по 0.2s (хвостовая пауза отрезана)
+    assert duration == pytest.approx(4 * 1.5 + 3 * 0.2, abs=0.02)
+    assert read_wav_header(str(result))[3] == int(round(duration * SAMPLE_RATE))
+
+
+def test_volume_normalized_to_target(tmp_path):
+    source = tmp_path / 'in.wav'
+    result = tmp_path / 'out.wav'
+    write_speech_like_wav(source, 10)
+
+    StreamingAudioProcessor().process_wav(str(source), str(result), fade_ms=0)
+
+    samples = read_samples(result)
+    dbfs = 20 * np.log10(np.sqrt(np.mean(samples ** 2)) / 32768.0)
+    assert dbfs == pytest.approx(-20.0, abs=0.1)
+
+
+def test_fades_start_and_end_silent(tmp_path):
+    source = tmp_path / 'in.wav'
+    result = tmp_path / 'out.wav'
+    write_speech_like_wav(source, 5)
+
+    StreamingAudioProcessor().process_wav(str(source), str(result))
+
+    samples = read_samples(result)
+    assert abs(samples[0]) < 1
+    assert abs(samples[-1]) < 100
+    assert np.abs(samples[SAMPLE_RATE // 2:SAMPLE_RATE]).max() > 3000
+
+
+def peak_memory(source, result):
+    tracemalloc.start()
+    StreamingAudioProcessor().process_wav(str(source), str(result))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def test_peak_memory_independent_of_duration(tmp_path):
+    short = tmp_path / 'short.wav'
+    long = tmp_path / 'long.wav'
+    write_speech_like_wav(short, 60)
+    write_speech_like_wav(long, 600)
+
+    short_peak = peak_memory(short, tmp_path / 'short_out.wav')
+    long_peak = peak_memory(long, tmp_path / 'long_out.wav')
+
+    # 10x длиннее - пик памяти почти тот же (отличается только список диапазонов)
+    assert long_peak < short_peak * 1.5
+    # И заметно меньше самого аудио (~19 MB)
+    assert long_peak < os.path.getsize(long) / 10
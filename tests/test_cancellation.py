@@ -0,0 +1,142 @@
+"""
+Тесты отмены задачи: корутина, процессы рендера, HTTP-рендер на сервере
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services import remotion_server
+from services.cancellation import (
+    CancelToken, TaskCancelledError, cancel_scope, current_token, run_cancellable, run_process
+)
+from services.remotion_server import RemotionRenderServer
+from services.segment_renderer import SegmentedRenderer
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def is_alive(pid: int) -> bool:
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().rsplit(')', 1)[1].split()[0] not in ('Z', 'X')
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.exists('/proc'), reason='нужен /proc')
+def test_cancel_kills_whole_process_group():
+    # Рендерер с дочерним процессом (как npx remotion -> Chromium)
+    script = (
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+        "print(child.pid, flush=True)\n"
+        "time.sleep(30)\n"
+    )
+    token = CancelToken(kill_timeout=2)
+    children = []
+
+    def on_line(line):
+        children.append(int(line))
+        token.cancel()
+
+    started = time.time()
+    with cancel_scope(token):
+        with pytest.raises(TaskCancelledError):
+            run_process([sys.executable, '-c', script], on_line=on_line)
+
+    assert time.time() - started < 10
+
+    # Сигнал доставлен, процесс завершается асинхронно
+    deadline = time.time() + 2
+    while children and is_alive(children[0]) and time.time() < deadline:
+        time.sleep(0.05)
+    assert children and not is_alive(children[0])
+
+    # Новые процессы отменённой задачи не запускаются
+    with cancel_scope(token):
+        with pytest.raises(TaskCancelledError):
+            run_process([sys.executable, '-c', 'print(1)'])
+
+
+def test_run_cancellable_stops_coroutine_from_other_thread():
+    token = CancelToken()
+    seen = []
+
+    async def pipeline():
+        seen.append(current_token())
+        await asyncio.sleep(30)
+
+    loop = asyncio.new_event_loop()
+    threading.Timer(0.2, token.cancel).start()
+    try:
+        with pytest.raises(TaskCancelledError):
+            run_cancellable(loop, pipeline(), token)
+    finally:
+        loop.close()
+
+    assert seen == [token]
+    assert current_token() is None
+
+
+def test_segment_threads_see_task_token():
+    class FakeRenderer:
+        def __init__(self):
+            self.tokens = []
+
+        def render_video(self, scenes, audio_path=None, output_path='output.mp4', fps=30, width=1920, height=1080,
+                         on_progress=None):
+            self.tokens.append(current_token())
+            current_token().check()
+            with open(output_path, 'wb') as f:
+                f.write(b'video')
+            return output_path
+
+    fake = FakeRenderer()
+    token = CancelToken()
+    token.cancel()
+    scenes = [{'imagePath': f'{i}.png', 'duration': 15, 'effect': 'zoom_in'} for i in range(4)]
+
+    with cancel_scope(token):
+        with pytest.raises(TaskCancelledError):
+            SegmentedRenderer(fake, max_workers=2, min_segment_seconds=10).render_video(scenes, None, 'video.mp4')
+
+    assert fake.tokens and all(seen is token for seen in fake.tokens)
+
+
+def test_server_render_is_cancelled_on_server(tmp_path, monkeypatch):
+    (tmp_path / 'src').mkdir()
+    server = RemotionRenderServer(str(tmp_path))
+    monkeypatch.setattr(server, 'ensure_running', lambda: None)
+
+    token = CancelToken()
+    requests = []
+
+    def fake_post(url, json=None, timeout=None):
+        requests.append((url.rsplit('/', 1)[1], json['outputPath']))
+        if url.endswith('/render'):
+            # Отмена приходит, пока идёт рендер
+            token.cancel()
+            raise httpx.ReadError('connection closed')
+        return httpx.Response(200, json={'cancelled': True})
+
+    monkeypatch.setattr(remotion_server.httpx, 'post', fake_post)
+
+    with cancel_scope(token):
+        with pytest.raises(TaskCancelledError):
+            server.render({'config': {}}, 'video.mp4')
+
+    output_path = str(tmp_path / 'video.mp4')
+    assert requests == [('render', output_path), ('cancel', output_path)]
@@ -0,0 +1,115 @@
+"""
+Тесты circuit breaker для LLM провайдеров
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from services.provider_router import ProviderRouter
+from services.token_budget import TokenBudgetEstimator
+from services.script_gen import ScriptGenerator, ScriptGeneratorError
+
+VALID_RESPONSE = "[HOOK]\nЦепляющее начало.\n[SCRIPT]\nОсновной текст сценария.\n[CTA]\nПодпишитесь!\n[TITLES]\n1. Заголовок"
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_opens_after_threshold_and_half_opens_after_cooldown(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('services.circuit_breaker.time.time', lambda: now[0])
+
+    breaker = CircuitBreaker('groq:test', failure_threshold=2, cooldown=60)
+    breaker.record_failure(Exception('timeout'))
+    assert breaker.allow_request()
+
+    breaker.record_failure(Exception('timeout'))
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    # Cooldown прошёл - ровно один пробный запрос
+    now[0] += 61
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+
+    # Пробный упал - снова open, cooldown удвоен
+    breaker.record_failure(Exception('timeout'))
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.cooldown == 120
+
+    now[0] += 121
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.cooldown == 60
+
+
+def test_state_persists_between_registries():
+    registry = CircuitBreakerRegistry(failure_threshold=1)
+    registry.get('ollama:llama3.1:8b').record_failure(Exception('connect error'))
+
+    restored = CircuitBreakerRegistry(failure_threshold=1)
+    breaker = restored.get('ollama:llama3.1:8b')
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert 'connect error' in breaker.last_error
+    assert restored.get_status()['ollama:llama3.1:8b']['retry_in'] > 0
+
+
+def make_generator(candidates):
+    generator = ScriptGenerator.__new__(ScriptGenerator)
+    generator.circuit_breakers = CircuitBreakerRegistry(failure_threshold=1)
+    generator.router = ProviderRouter()
+    generator.token_budget = TokenBudgetEstimator()
+    generator.script_cache = None
+    generator._get_provider_candidates = lambda use_ollama=True: candidates
+    return generator
+
+
+def candidate(key, generate):
+    return {'key': key, 'name': key, 'emoji': '🧪', 'provider': key, 'model': key, 'generate': generate}
+
+
+def test_generate_script_skips_open_provider():
+    calls = []
+
+    async def failing(prompt):
+        calls.append('slow')
+        raise Exception('timeout')
+
+    async def working(prompt):
+        calls.append('fast')
+        return VALID_RESPONSE
+
+    generator = make_generator([candidate('slow', failing), candidate('fast', working)])
+
+    first = asyncio.run(generator.generate_script('Тема'))
+    second = asyncio.run(generator.generate_script('Тема'))
+
+    assert first['provider'] == second['provider'] == 'fast'
+    # Второй раз упавший провайдер даже не вызывается
+    assert calls == ['slow', 'fast', 'fast']
+
+
+def test_generate_script_reports_open_circuits():
+    async def failing(prompt):
+        raise Exception('HTTP 500')
+
+    generator = make_generator([candidate('only', failing)])
+
+    with pytest.raises(ScriptGeneratorError):
+        asyncio.run(generator.generate_script('Тема'))
+
+    with pytest.raises(ScriptGeneratorError, match='circuit open'):
+        asyncio.run(generator.generate_script('Тема'))
@@ -0,0 +1,185 @@
+"""
+Тесты FFmpeg рендерера (команда и субтитры - без запуска ffmpeg)
+"""
+
+import sys
+import os
+import subprocess
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.ffmpeg_renderer import FFmpegRenderer
+from services.ken_burns import EffectType, KenBurnsEffect
+from services.subtitle_gen import SubtitleGenerator, ass_color
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def make_scenes():
+    return [
+        {'imagePath': 'images/1.png', 'duration': 4.0, 'effect': 'zoom_in'},
+        {
+            'imagePath': 'images/2.png', 'duration': 3.0, 'effect': 'pan_right',
+            'effectParams': KenBurnsEffect().get_effect_params(EffectType.PAN_RIGHT),
+            'subtitle': {'text': 'Привет {мир}', 'startTime': 0.5, 'endTime': 2.5, 'highlighted': True}
+        },
+        {'imagePath': 'images/3.png', 'duration': 5.0, 'effect': 'unknown'},
+    ]
+
+
+def test_command_chains_zoompan_and_xfade_on_scene_boundaries():
+    cmd = FFmpegRenderer(transition=0.5).build_command(make_scenes(), 'audio.mp3', 'out.mp4', fps=30)
+    graph = cmd[cmd.index('-filter_complex') + 1]
+
+    assert cmd.count('-i') == 4
+    assert cmd[cmd.index('-map', cmd.index('[vout]')) + 1] == '3:a'
+
+    # Клипы длиннее сцен на переход (кроме последнего)
+    assert 'd=135:s=1920x1080:fps=30' in graph
+    assert 'd=105:' in graph
+    assert 'd=150:' in graph
+
+    # Переходы начинаются ровно в начале сцены - синхронно с аудио
+    assert '[v0][v1]xfade=transition=fade:duration=0.500:offset=4.000[x1]' in graph
+    assert '[x1][v2]xfade=transition=fade:duration=0.500:offset=7.000[x2]' in graph
+    assert '[x2]null[vout]' in graph
+
+    # zoom_in: 1.0 -> 1.3, pan_right: центр 0.4 -> 0.6 при масштабе 1.2
+    assert "z='1.0+(0.3)*" in graph
+    assert "z='1.2+(0)*" in graph and '0.4+(0.2)*' in graph
+
+
+def test_without_transition_scenes_are_concatenated():
+    cmd = FFmpegRenderer(transition=0).build_command(make_scenes(), None, 'out.mp4', fps=25)
+    graph = cmd[cmd.index('-filter_complex') + 1]
+
+    assert 'xfade' not in graph
+    assert '[v0][v1][v2]concat=n=3:v=1:a=0[joined]' in graph
+    assert '-shortest' not in cmd
+
+
+def test_clip_from_middle_of_video_fades_in():
+    scenes = make_scenes()
+    cmd = FFmpegRenderer(transition=0.5).build_command(scenes, None, 'out.mp4')
+    assert 'fade=t=in' not in cmd[cmd.index('-filter_complex') + 1]
+
+    cmd = FFmpegRenderer(transition=0.5).build_command([{**scenes[1], 'fadeIn': True}], None, 'out.mp4')
+    graph = cmd[cmd.index('-filter_complex') + 1]
+    assert 'setsar=1,fade=t=in:st=0:d=0.500,format=yuv420p[v0]' in graph
+
+    # Без переходов - встык и для клипов
+    cmd = FFmpegRenderer(transition=0).build_command([{**scenes[1], 'fadeIn': True}], None, 'out.mp4')
+    assert 'fade=t=in' not in cmd[cmd.index('-filter_complex') + 1]
+
+
+def test_subtitles_written_as_ass_with_scene_offsets(tmp_path):
+    renderer = FFmpegRenderer()
+    path = renderer.write_subtitles(make_scenes(), tmp_path / 'subs.ass', fps=30, width=1080, height=1920)
+
+    content = open(path, encoding='utf-8').read()
+    assert 'PlayResX: 1080' in content and 'PlayResY: 1920' in content
+    # Вторая сцена начинается на 4-й секунде
+    assert 'Dialogue: 0,0:00:04.50,0:00:06.50,Highlight,,0,0,0,,Привет (мир)' in content
+
+    cmd = renderer.build_command(make_scenes(), None, 'out.mp4', subtitles_path=path)
+    assert cmd[cmd.index('-filter_complex') + 1].endswith('ass=subs.ass[vout]')
+
+
+def test_render_video_runs_ffmpeg_and_cleans_subtitles(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append((cmd, kwargs))
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+
+    output = FFmpegRenderer().render_video(make_scenes(), 'audio.mp3', 'temp/video.mp4')
+
+    assert output == str(tmp_path / 'temp' / 'video.mp4')
+    assert calls[0][1]['cwd'] == tmp_path / 'temp'
+    assert not list((tmp_path / 'temp').glob('*.ass'))
+
+    monkeypatch.setattr(subprocess, 'run', lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 1, '', 'boom'))
+    with pytest.raises(RuntimeError, match='boom'):
+        FFmpegRenderer().render_video(make_scenes(), None, 'temp/video.mp4')
+
+
+def test_ass_styles_follow_subtitle_generator_configs():
+    assert ass_color('yellow') == '&H0000FFFF'
+    assert ass_color('rgba(0,0,0,0.5)') == '&H80000000'
+    assert ass_color('linear-gradient(yellow, orange)') == '&H0000FFFF'
+
+    styles = SubtitleGenerator().styles
+    minimal = styles['modern_minimalist'].get_ass_style(1920, 1080)
+    popout = styles['popout_3d'].get_ass_style(1080, 1920)
+
+    assert minimal['BorderStyle'] == 3
+    assert popout['Alignment'] == 5
+    assert popout['Fontsize'] == 160
+
+
+def test_animated_styles_become_ass_override_tags():
+    generator = SubtitleGenerator()
+    cue = [{'start': 0.0, 'end': 2.0, 'text': 'раз два три', 'highlighted': False}]
+
+    # Время слова пропорционально длине
+    karaoke = generator.generate_ass([{**cue[0], 'text': 'я пошёл домой'}], style_name='karaoke')
+    assert karaoke.splitlines()[-1].endswith('{\\k29}я {\\k86}пошёл {\\k86}домой')
+    # Неактивные слова - inactive_color (SecondaryColour), произнесённые - active_color
+    assert 'Style: Default,Arial,65,&H0000FFFF,&H80FFFFFF,' in karaoke
+
+    typewriter = generator.generate_ass(cue, style_name='typewriter').splitlines()[-1]
+    assert typewriter.endswith('{\\ko5}р{\\ko5}а{\\ko5}з {\\ko5}д{\\ko5}в{\\ko5}а {\\ko5}т{\\ko5}р{\\ko5}и')
+
+    assert '\\t(0,150,' in generator.generate_ass(cue, style_name='popout_3d').splitlines()[-1]
+
+
+def test_burn_subtitles_reencodes_with_ass_and_copies_audio(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append((cmd, kwargs))
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    (tmp_path / 'raw.mp4').write_bytes(b'video')
+
+    output = FFmpegRenderer(subtitle_style='karaoke').burn_subtitles(make_scenes(), 'raw.mp4', 'final.mp4')
+
+    cmd, kwargs = calls[0]
+    assert output == str(tmp_path / 'final.mp4')
+    assert cmd[cmd.index('-vf') + 1].startswith('ass=subtitles_')
+    assert cmd[cmd.index('-c:a') + 1] == 'copy'
+    assert kwargs['cwd'] == tmp_path
+    assert not list(tmp_path.glob('*.ass'))
+
+    # Без субтитров - без перекодирования
+    scenes = [{**scene, 'subtitle': None} for scene in make_scenes()]
+    FFmpegRenderer().burn_subtitles(scenes, 'raw.mp4', 'plain.mp4')
+    assert len(calls) == 1 and (tmp_path / 'plain.mp4').exists()
+
+
+def test_reframed_pan_follows_same_image_region_in_vertical_format():
+    ken_burns = KenBurnsEffect()
+    pan = ken_burns.get_effect_params(EffectType.PAN_RIGHT)
+
+    vertical = ken_burns.reframe_params(pan, 1080, 1920)
+    # Кадр 9:16 видит 31.6% ширины изображения - смещение центра растёт во столько же раз
+    assert vertical['start_position'] == (0.184, 0.5)
+    assert vertical['end_position'] == (0.816, 0.5)
+    assert vertical['start_scale'] == pan['start_scale']
+
+    # Для 16:9 ничего не меняется
+    assert ken_burns.reframe_params(pan, 1920, 1080)['start_position'] == pan['start_position']
+
+    scenes = [{**make_scenes()[1], 'effectParams': vertical}]
+    graph = FFmpegRenderer().build_command(scenes, None, 'shorts.mp4', width=1080, height=1920)
+    assert 's=1080x1920' in graph[graph.index('-filter_complex') + 1]
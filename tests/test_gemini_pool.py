@@ -0,0 +1,94 @@
+"""
+Тесты пула клиентов Gemini
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.gemini_pool import GeminiClientPool, GeminiPoolError
+from services.script_gen import ScriptGenerator
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModels:
+    def __init__(self, key, log):
+        self.key = key
+        self.log = log
+
+    async def generate_content(self, model, contents, config):
+        self.log.append(('start', self.key))
+        await asyncio.sleep(0.05)
+        if contents == 'quota':
+            raise Exception('429 RESOURCE_EXHAUSTED')
+        return FakeResponse(f'{self.key}:{contents}')
+
+
+class FakeClient:
+    def __init__(self, key, log):
+        self.aio = type('Aio', (), {'models': FakeModels(key, log)})()
+
+
+def make_pool(log, keys=('k1', 'k2', 'k3')):
+    return GeminiClientPool(list(keys), client_factory=lambda key: FakeClient(key, log))
+
+
+def make_generator(pool):
+    generator = ScriptGenerator.__new__(ScriptGenerator)
+    generator.gemini_pool = pool
+    generator.model_id = 'gemini-test'
+    return generator
+
+
+def test_concurrent_requests_spread_over_keys():
+    log = []
+    generator = make_generator(make_pool(log))
+
+    async def run():
+        return await asyncio.gather(*[generator._generate_with_gemini(f'p{i}') for i in range(3)])
+
+    results = asyncio.run(run())
+
+    # Три одновременных запроса - три разных ключа, и все стартовали до первого ответа
+    assert sorted(key for _, key in log) == ['k1', 'k2', 'k3']
+    assert [result.split(':')[1] for result in results] == ['p0', 'p1', 'p2']
+    assert all(entry['in_flight'] == 0 for entry in generator.gemini_pool.get_status().values())
+
+
+def test_sequential_requests_rotate_by_total_usage():
+    log = []
+    generator = make_generator(make_pool(log, keys=('k1', 'k2')))
+
+    for i in range(4):
+        asyncio.run(generator._generate_with_gemini(f'p{i}'))
+
+    assert [key for _, key in log] == ['k1', 'k2', 'k1', 'k2']
+
+
+def test_quota_error_puts_key_on_cooldown():
+    log = []
+    pool = make_pool(log, keys=('k1', 'k2'))
+    generator = make_generator(pool)
+
+    with pytest.raises(Exception, match='RESOURCE_EXHAUSTED'):
+        asyncio.run(generator._generate_with_gemini('quota'))
+
+    for i in range(2):
+        asyncio.run(generator._generate_with_gemini(f'p{i}'))
+
+    assert [key for _, key in log] == ['k1', 'k2', 'k2']
+
+
+def test_pool_requires_keys():
+    with pytest.raises(GeminiPoolError):
+        GeminiClientPool([])
@@ -0,0 +1,117 @@
+"""
+Тесты длинных сценариев: план + параллельные разделы
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.provider_router import ProviderRouter
+from services.token_budget import TokenBudgetEstimator
+from services.script_gen import ScriptGenerator, ScriptGeneratorError
+
+OUTLINE = """[HOOK]
+Почему мы забываем сны?
+[OUTLINE]
+1. Что такое сон | фазы сна и зачем они нужны
+2. Память во сне | как мозг сортирует воспоминания
+3. **Почему сны исчезают** | роль норадреналина
+4. Как запомнить сон | практические советы
+[CTA]
+Подпишитесь на канал!
+[TITLES]
+1. Куда исчезают сны
+2. Тайна забытых снов
+3. Почему мы не помним сны"""
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def make_generator(providers):
+    generator = ScriptGenerator.__new__(ScriptGenerator)
+    generator.circuit_breakers = CircuitBreakerRegistry()
+    generator.router = ProviderRouter()
+    generator.token_budget = TokenBudgetEstimator()
+    generator.script_cache = None
+    generator._get_provider_candidates = lambda use_ollama=True: [
+        {'key': name, 'name': name, 'emoji': '🧪', 'provider': name, 'model': name, 'generate': generate}
+        for name, generate in providers
+    ]
+    return generator
+
+
+def fake_provider(name, stats, broken_sections=()):
+    async def generate(prompt):
+        if '[OUTLINE]' in prompt:
+            return OUTLINE
+
+        section = int(prompt.split('РАЗДЕЛ ')[1].split(':')[0])
+        stats['in_flight'] += 1
+        stats['max_in_flight'] = max(stats['max_in_flight'], stats['in_flight'])
+        await asyncio.sleep(0.02)
+        stats['in_flight'] -= 1
+        stats['calls'].append((name, section))
+
+        if section in broken_sections:
+            return 'обрыв'
+        return f"Раздел {section}: заголовок\n" + ' '.join([f'слово{section}'] * 60)
+
+    return generate
+
+
+def test_sections_are_generated_in_parallel_and_stitched_in_order():
+    stats = {'in_flight': 0, 'max_in_flight': 0, 'calls': []}
+    generator = make_generator([('a', fake_provider('a', stats)), ('b', fake_provider('b', stats))])
+
+    result = asyncio.run(generator.generate_long_script('Сны', target_length=240, sections=4))
+
+    assert stats['max_in_flight'] == 4
+    assert [section['title'] for section in result['sections']] == [
+        'Что такое сон', 'Память во сне', 'Почему сны исчезают', 'Как запомнить сон'
+    ]
+    # Разделы разошлись по двум провайдерам
+    assert {name for name, _ in stats['calls']} == {'a', 'b'}
+
+    paragraphs = result['script'].split('\n\n')
+    assert [paragraph.split()[0] for paragraph in paragraphs] == ['слово1', 'слово2', 'слово3', 'слово4']
+    assert result['hook'] == 'Почему мы забываем сны?'
+    assert result['title_suggestions'][0] == 'Куда исчезают сны'
+    assert result['word_count'] == 240
+
+
+def test_truncated_section_falls_back_to_other_provider():
+    stats = {'in_flight': 0, 'max_in_flight': 0, 'calls': []}
+    generator = make_generator([
+        ('a', fake_provider('a', stats, broken_sections=(1, 2, 3, 4))),
+        ('b', fake_provider('b', stats)),
+    ])
+
+    result = asyncio.run(generator.generate_long_script('Сны', target_length=240, sections=4, spread=1))
+
+    assert {section['provider'] for section in result['sections']} == {'b'}
+
+
+def test_generate_script_switches_to_long_form_for_long_targets():
+    stats = {'in_flight': 0, 'max_in_flight': 0, 'calls': []}
+    generator = make_generator([('a', fake_provider('a', stats))])
+
+    result = asyncio.run(generator.generate_script('Сны', target_length=ScriptGenerator.LONG_FORM_WORDS))
+
+    assert len(result['sections']) == 4
+
+
+def test_outline_without_sections_is_rejected():
+    generator = make_generator([])
+
+    with pytest.raises(ScriptGeneratorError):
+        generator._parse_outline("[HOOK]\nПривет\n[OUTLINE]\nпусто")
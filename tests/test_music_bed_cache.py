@@ -0,0 +1,108 @@
+"""
+Тесты кэша музыкальных подложек (без запуска ffmpeg)
+"""
+
+import sys
+import os
+import subprocess
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services import music_bed_cache
+from services.music_bed_cache import DURATION_BUCKETS, MusicBedCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def track(tmp_path, monkeypatch):
+    """Трек 'calm' в tmp_path с громкостью -20 dB"""
+    path = tmp_path / 'calm.mp3'
+    path.write_bytes(b'music')
+
+    volume = {'calm': -20}
+    monkeypatch.setattr(music_bed_cache, 'get_music_path', lambda key: str(path) if key == 'calm' else None)
+    monkeypatch.setattr(music_bed_cache, 'get_music_volume', lambda key: volume[key])
+    return path, volume
+
+
+@pytest.fixture
+def ffmpeg_calls(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        with open(cmd[-1], 'wb') as f:
+            f.write(b'flac')
+        return subprocess.CompletedProcess(cmd, 0, b'', b'')
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    return calls
+
+
+def test_bucket_boundaries(tmp_path):
+    cache = MusicBedCache(cache_dir=str(tmp_path / 'beds'))
+
+    assert cache.get_bucket(1) == 60
+    assert cache.get_bucket(60) == 60
+    assert cache.get_bucket(60.5) == 180
+    assert cache.get_bucket(3600) == DURATION_BUCKETS[-1]
+    # Длиннее последнего бакета - вверх до 10 минут
+    assert cache.get_bucket(3601) == 4200
+    assert cache.get_bucket(4200) == 4200
+
+
+def test_bed_filename_tracks_volume_and_source_version(tmp_path, track):
+    path, volume = track
+    cache = MusicBedCache(cache_dir=str(tmp_path / 'beds'))
+
+    name = cache._bed_filename('calm', str(path), 180, 48000)
+    assert name.startswith('calm_180s_48000hz_') and name.endswith('.flac')
+    assert cache._bed_filename('calm', str(path), 180, 48000) == name
+
+    volume['calm'] = -14
+    louder = cache._bed_filename('calm', str(path), 180, 48000)
+    assert louder != name
+
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 60))
+    assert cache._bed_filename('calm', str(path), 180, 48000) != louder
+
+
+def test_mix_command_trims_and_fades_out(tmp_path):
+    cache = MusicBedCache(cache_dir=str(tmp_path / 'beds'), fade_out=3.0)
+
+    cmd = cache.build_mix_command('video.mp4', 'bed.flac', 125.5, 'out.mp4')
+    graph = cmd[cmd.index('-filter_complex') + 1]
+
+    assert 'atrim=0:125.500' in graph
+    assert 'afade=t=out:st=122.500:d=3.0' in graph
+    assert cmd[cmd.index('-c:v') + 1] == 'copy'
+    assert cmd[-1] == 'out.mp4'
+
+
+def test_get_bed_builds_once_then_hits_cache(tmp_path, track, ffmpeg_calls):
+    cache = MusicBedCache(cache_dir=str(tmp_path / 'beds'))
+
+    first = cache.get_bed('calm', 100, sample_rate=44100)
+    assert len(ffmpeg_calls) == 1
+    assert '-t' in ffmpeg_calls[0] and ffmpeg_calls[0][ffmpeg_calls[0].index('-t') + 1] == '180'
+    assert os.path.exists(first) and not list((tmp_path / 'beds').glob('*.tmp.flac'))
+
+    # Тот же бакет - из кэша, без ffmpeg
+    assert cache.get_bed('calm', 170, sample_rate=44100) == first
+    assert len(ffmpeg_calls) == 1
+
+    # Другая частота - новая подложка
+    assert cache.get_bed('calm', 170, sample_rate=48000) != first
+    assert len(ffmpeg_calls) == 2
+
+    # Трека нет на диске
+    assert cache.get_bed('missing', 100) is None
@@ -0,0 +1,73 @@
+"""
+Тесты сессии Ollama (keep_alive, клиент, статус для /api/health)
+"""
+
+import sys
+import os
+import asyncio
+
+import httpx
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.ollama_session import OllamaSession
+
+
+def test_keep_alive_is_longer_during_batch(monkeypatch):
+    applied = []
+    session = OllamaSession(keep_alive='10m', batch_keep_alive='2h')
+    monkeypatch.setattr(session, '_apply_keep_alive', applied.append)
+
+    assert session.generate_payload('hi', stream=False)['keep_alive'] == '10m'
+
+    with session.batch():
+        with session.batch():
+            assert session.generate_payload('hi', stream=True)['keep_alive'] == '2h'
+        assert session.current_keep_alive == '2h'
+        assert applied == []
+
+    # Батч закончился - модель снова выгружается по обычному таймеру
+    assert session.current_keep_alive == '10m'
+    assert applied == ['10m']
+
+
+def test_client_is_reused_within_event_loop():
+    session = OllamaSession()
+
+    async def two_clients():
+        return session.client(), session.client()
+
+    first, second = asyncio.run(two_clients())
+    assert first is second
+
+    # Новый event loop (новая задача Flask сервера) - новый клиент
+    third, _ = asyncio.run(two_clients())
+    assert third is not first
+
+
+def test_status_reports_resident_model(monkeypatch):
+    def fake_get(url, timeout):
+        assert url.endswith('/api/ps')
+        return httpx.Response(200, request=httpx.Request('GET', url), json={'models': [
+            {'name': 'qwen2.5:7b'},
+            {'name': 'llama3.1:8b', 'expires_at': '2025-01-01T10:00:00Z', 'size_vram': 5000000000}
+        ]})
+
+    monkeypatch.setattr('services.ollama_session.httpx.get', fake_get)
+    status = OllamaSession().status()
+
+    assert status['reachable'] and status['resident']
+    assert status['expires_at'] == '2025-01-01T10:00:00Z'
+
+
+def test_status_when_ollama_is_down(monkeypatch):
+    def fake_get(url, timeout):
+        raise httpx.ConnectError('connection refused')
+
+    monkeypatch.setattr('services.ollama_session.httpx.get', fake_get)
+    status = OllamaSession().status()
+
+    assert status['reachable'] is False
+    assert status['resident'] is False
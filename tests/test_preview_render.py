@@ -0,0 +1,109 @@
+"""
+Тесты чернового профиля рендера и таймлайна проекта (без запуска Node)
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.output_manager import OutputManager
+from services.remotion_renderer import RENDER_PROFILES, RemotionRenderer
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def remotion_dir(tmp_path):
+    (tmp_path / 'remotion' / 'src').mkdir(parents=True)
+    return str(tmp_path / 'remotion')
+
+
+def test_preview_profile_uses_fast_encoder_and_hard_cuts(remotion_dir):
+    preview = RemotionRenderer(remotion_dir=remotion_dir, use_server=False, profile='preview')
+    cmd = preview.build_command('props.json', 'preview.mp4')
+
+    assert cmd[cmd.index('--x264-preset') + 1] == 'ultrafast'
+    assert cmd[cmd.index('--crf') + 1] == str(RENDER_PROFILES['preview']['crf'])
+    assert preview.build_props([], None, 15, 854, 480)['config']['simpleTransitions'] is True
+
+    # Финальный профиль - прежняя команда
+    final = RemotionRenderer(remotion_dir=remotion_dir, use_server=False)
+    assert '--x264-preset' not in final.build_command('props.json', 'video.mp4')
+    assert final.build_props([], None, 30, 1920, 1080)['config']['simpleTransitions'] is False
+
+    with pytest.raises(ValueError):
+        RemotionRenderer(remotion_dir=remotion_dir, use_server=False, profile='draft')
+
+
+def test_timeline_round_trip(tmp_path):
+    manager = OutputManager(base_output_dir=str(tmp_path))
+    project_dir = manager.create_video_project('Тест', {})
+    scenes = [{'imagePath': str(project_dir / 'images' / '1.png'), 'duration': 4.0, 'effect': 'zoom_in', 'subtitle': None}]
+
+    path = manager.save_timeline(project_dir, scenes, project_dir / 'audio.mp3', 4.2, 'karaoke', 1080, 1920)
+
+    assert json.loads(path.read_text(encoding='utf-8'))['audioPath'] == str(project_dir / 'audio.mp3')
+    timeline = manager.load_timeline(project_dir)
+    assert timeline['scenes'] == scenes
+    assert timeline['subtitleStyle'] == 'karaoke'
+    assert (timeline['width'], timeline['height']) == (1080, 1920)
+
+    with pytest.raises(FileNotFoundError):
+        manager.load_timeline(tmp_path / 'missing')
+
+
+def test_project_dir_must_be_inside_output_root(tmp_path):
+    manager = OutputManager(base_output_dir=str(tmp_path / 'videos'))
+    project_dir = manager.create_video_project('Тест', {})
+
+    assert manager.resolve_project_dir(str(project_dir)) == project_dir.resolve()
+    assert manager.resolve_project_dir(project_dir.name) == project_dir.resolve()
+
+    (tmp_path / 'secret').mkdir()
+    os.symlink(tmp_path / 'secret', tmp_path / 'videos' / 'link')
+
+    for outside in [tmp_path / 'secret', project_dir / '..' / '..' / 'secret', '../secret', 'link', tmp_path / 'videos']:
+        with pytest.raises(ValueError):
+            manager.resolve_project_dir(outside)
+
+
+def test_render_preview_needs_only_timeline_and_renderer(tmp_path, monkeypatch):
+    main_orchestrator = pytest.importorskip('main_orchestrator')
+    Orchestrator = main_orchestrator.YouTubeAutomationOrchestrator
+
+    manager = OutputManager(base_output_dir=str(tmp_path / 'videos'))
+    project_dir = manager.create_video_project('Тест', {})
+    scenes = [{'imagePath': 'images/1.png', 'duration': 4.0, 'effect': 'zoom_in', 'subtitle': None}]
+    manager.save_timeline(project_dir, scenes, project_dir / 'audio.mp3', 4.0, 'karaoke', 1080, 1920)
+
+    calls = []
+
+    class FakeRenderer:
+        def render_video(self, scenes, audio_path, output_path, fps, width, height, on_progress=None):
+            calls.append((width, height, fps))
+            return output_path
+
+    def init_forbidden(self):
+        raise AssertionError('оркестратор не должен создаваться')
+
+    monkeypatch.setattr(Orchestrator, '__init__', init_forbidden)
+    monkeypatch.setattr(Orchestrator, 'create_renderer', classmethod(lambda cls, *args, **kwargs: FakeRenderer()))
+
+    path = asyncio.run(Orchestrator.render_preview(str(project_dir), output_manager=manager))
+
+    assert path == str(project_dir.resolve() / 'preview.mp4')
+    # Вертикальный проект - вертикальный черновик 480p
+    assert calls == [(480, 854, RENDER_PROFILES['preview']['fps'])]
+
+    with pytest.raises(main_orchestrator.YouTubeAutomationError):
+        asyncio.run(Orchestrator.render_preview(str(tmp_path), output_manager=manager))
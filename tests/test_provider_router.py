@@ -0,0 +1,157 @@
+"""
+Тесты адаптивного порядка провайдеров и гонки запросов
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.provider_router import ProviderRouter
+from services.token_budget import TokenBudgetEstimator
+from services.script_gen import ScriptGenerator
+
+VALID_RESPONSE = "[HOOK]\nЦепляющее начало.\n[SCRIPT]\nОсновной текст сценария.\n[CTA]\nПодпишитесь!\n[TITLES]\n1. Заголовок"
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def candidate(key, generate=None):
+    return {'key': key, 'name': key, 'emoji': '🧪', 'provider': key, 'model': key, 'generate': generate}
+
+
+def make_generator(candidates):
+    generator = ScriptGenerator.__new__(ScriptGenerator)
+    generator.circuit_breakers = CircuitBreakerRegistry()
+    generator.router = ProviderRouter()
+    generator.token_budget = TokenBudgetEstimator()
+    generator.script_cache = None
+    generator._get_provider_candidates = lambda use_ollama=True: candidates
+    return generator
+
+
+def test_order_prefers_reliable_over_fast_but_flaky():
+    router = ProviderRouter()
+    candidates = [candidate('flaky'), candidate('steady'), candidate('unknown')]
+
+    # Без статистики - исходный приоритет
+    assert [c['key'] for c in router.order(candidates)] == ['flaky', 'steady', 'unknown']
+
+    for _ in range(5):
+        router.record('flaky', 2.0, success=False)
+        router.record('steady', 8.0, success=True)
+
+    assert [c['key'] for c in router.order(candidates)] == ['steady', 'unknown', 'flaky']
+
+    # Статистика переживает перезапуск
+    assert ProviderRouter().get_status()['steady']['samples'] == 5
+
+
+def test_failed_provider_recovers_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('services.provider_router.time.time', lambda: now[0])
+
+    router = ProviderRouter(half_life=600)
+    candidates = [candidate('ollama'), candidate('groq')]
+
+    # Один таймаут не умножает стоимость на 100: замер смешан с априорными значениями
+    router.record('ollama', 120.0, success=False)
+    assert router.expected_cost('ollama') < 200
+    assert [c['key'] for c in router.order(candidates)] == ['groq', 'ollama']
+
+    # Без новых замеров статистика возвращается к априорной
+    now[0] += 6 * 3600
+    assert router.expected_cost('ollama') == pytest.approx(router.expected_cost('unknown'), rel=0.01)
+
+    # ...и провайдер снова обгоняет медленного конкурента
+    router.record('groq', 90.0, success=True)
+    assert [c['key'] for c in router.order(candidates)] == ['ollama', 'groq']
+
+
+def test_race_returns_first_valid_and_cancels_loser():
+    cancelled = []
+
+    async def slow(prompt):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append('slow')
+            raise
+        return VALID_RESPONSE
+
+    async def fast(prompt):
+        await asyncio.sleep(0.01)
+        return VALID_RESPONSE
+
+    generator = make_generator([candidate('slow', slow), candidate('fast', fast)])
+    result = asyncio.run(generator.generate_script('Тема', race=True))
+
+    assert result['provider'] == 'fast'
+    assert cancelled == ['slow']
+    # Отменённый запрос не считается ни успехом, ни ошибкой
+    assert 'slow' not in generator.router.stats
+    assert generator.circuit_breakers.get('slow').failures == 0
+
+
+def test_race_invalid_answer_falls_back_to_other_racer():
+    async def broken(prompt):
+        return "без разметки"
+
+    async def valid(prompt):
+        await asyncio.sleep(0.01)
+        return VALID_RESPONSE
+
+    generator = make_generator([candidate('broken', broken), candidate('valid', valid)])
+    result = asyncio.run(generator.generate_script('Тема', race=True))
+
+    assert result['provider'] == 'valid'
+    # Неудача учтена (смешана с априорной долей успехов)
+    assert generator.router.stats['broken']['samples'] == 1
+    assert generator.router.stats['broken']['success_rate'] < generator.router.default_success
+
+
+def test_cancelled_race_cancels_all_racers():
+    from services.cancellation import CancelToken, TaskCancelledError, run_cancellable
+
+    cancelled = []
+    started = []
+
+    def racer(name):
+        async def generate(prompt):
+            started.append(name)
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+            return VALID_RESPONSE
+        return generate
+
+    generator = make_generator([candidate('first', racer('first')), candidate('second', racer('second'))])
+    token = CancelToken()
+
+    async def job():
+        race = asyncio.ensure_future(generator.generate_script('Тема', race=True))
+        while len(started) < 2:
+            await asyncio.sleep(0.01)
+        # Как /api/cancel: токен снимает корутину задачи посреди гонки
+        token.cancel()
+        await race
+
+    loop = asyncio.new_event_loop()
+    try:
+        with pytest.raises(TaskCancelledError):
+            run_cancellable(loop, job(), token)
+    finally:
+        loop.close()
+
+    assert sorted(cancelled) == ['first', 'second']
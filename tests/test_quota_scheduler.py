@@ -0,0 +1,155 @@
+"""
+Тесты планировщика ElevenLabs ключей по остатку символов
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.api_key_manager import SafeAPIManager
+from services.quota_scheduler import ElevenLabsQuotaScheduler, QuotaSchedulerError
+from services import voice_manager as voice_manager_module
+from services.voice_manager import VoiceManager
+
+SENTENCES = "Первое предложение тут. Второе предложение тут. Третье предложение тут."
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """SafeAPIManager с тремя ключами и разным остатком символов"""
+    monkeypatch.chdir(tmp_path)
+    manager = SafeAPIManager()
+    manager.elevenlabs_keys = ['key_a', 'key_b', 'key_c']
+
+    # Остатки: a=9000, b=2000, c=500 (лимит 10,000)
+    for key, used in [('key_a', 1000), ('key_b', 8000), ('key_c', 9500)]:
+        manager.track_usage('elevenlabs', key, used)
+
+    return manager
+
+
+def test_remaining_uses_local_usage(manager):
+    assert manager.get_elevenlabs_remaining('key_a') == 9000
+    assert manager.get_elevenlabs_remaining('key_c') == 500
+    assert manager.get_elevenlabs_remaining('unknown') == 10000
+
+
+def test_plan_never_exceeds_budget(manager):
+    scheduler = ElevenLabsQuotaScheduler(manager)
+    lengths = [1500, 1500, 400, 1800, 2500]
+
+    plan = scheduler.plan(lengths)
+
+    assert len(plan) == len(lengths)
+
+    spent = {}
+    for key, length in zip(plan, lengths):
+        spent[key] = spent.get(key, 0) + length
+    for key, chars in spent.items():
+        assert chars <= manager.get_elevenlabs_remaining(key)
+
+    # Короткий фрагмент дорабатывает почти пустой ключ
+    assert plan[2] == 'key_c'
+
+
+def test_plan_reserves_and_release(manager):
+    scheduler = ElevenLabsQuotaScheduler(manager)
+
+    plan = scheduler.plan([1800])
+    assert plan == ['key_b']
+    assert scheduler.get_budgets()['key_b'] == 200
+
+    scheduler.release('key_b', 1800)
+    assert scheduler.get_budgets()['key_b'] == 2000
+
+
+def test_commit_tracks_usage(manager):
+    scheduler = ElevenLabsQuotaScheduler(manager)
+
+    key = scheduler.plan([1500])[0]
+    before = manager.get_elevenlabs_remaining(key)
+    scheduler.commit(key, 1500)
+
+    assert manager.get_elevenlabs_remaining(key) == before - 1500
+    assert scheduler.reservations == {}
+
+
+def test_plan_rejects_oversized_chunk(manager):
+    scheduler = ElevenLabsQuotaScheduler(manager)
+
+    with pytest.raises(QuotaSchedulerError):
+        scheduler.plan([9500])
+
+
+def test_blocked_keys_are_skipped(manager):
+    manager.key_status['permanently_blocked'].append(manager._get_key_hash('key_a'))
+    scheduler = ElevenLabsQuotaScheduler(manager)
+
+    assert 'key_a' not in scheduler.get_budgets()
+    with pytest.raises(QuotaSchedulerError):
+        scheduler.plan([3000])
+
+
+class FakeResponse:
+    status_code = 200
+    content = b'mp3'
+    text = ''
+
+
+@pytest.fixture
+def voice(manager, monkeypatch):
+    """VoiceManager с короткими фрагментами и ElevenLabs без сети"""
+    monkeypatch.setattr(voice_manager_module.requests, 'post', lambda *args, **kwargs: FakeResponse())
+    voice = VoiceManager(manager, None)
+    voice.max_chunk_chars = 30
+    return voice
+
+
+def test_failed_wait_turn_releases_every_reservation(voice, tmp_path):
+    turns = []
+
+    async def wait_turn():
+        turns.append(1)
+        if len(turns) == 2:
+            raise RuntimeError('turn failed')
+
+    voice.quota_scheduler.wait_turn = wait_turn
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(voice.generate_audio(SENTENCES, 'voice', str(tmp_path / 'audio.mp3'), normalize_text=False))
+
+    # Фрагмент, упавший до отправки, и ещё не начатые фрагменты не держат резерв
+    assert voice.quota_scheduler.reservations == {}
+    assert not (tmp_path / 'audio_temp.mp3').exists()
+
+
+def test_cancel_during_wait_turn_frees_quota(voice, tmp_path):
+    waiting = asyncio.Event()
+    turns = []
+
+    async def wait_turn():
+        turns.append(1)
+        if len(turns) == 2:
+            waiting.set()
+            await asyncio.sleep(30)
+
+    voice.quota_scheduler.wait_turn = wait_turn
+
+    async def cancel_while_waiting():
+        task = asyncio.ensure_future(
+            voice.generate_audio(SENTENCES, 'voice', str(tmp_path / 'audio.mp3'), normalize_text=False)
+        )
+        await waiting.wait()
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(cancel_while_waiting())
+
+    assert voice.quota_scheduler.reservations == {}
@@ -0,0 +1,113 @@
+"""
+Тесты изоляции задач RemotionRenderer (без запуска Node)
+"""
+
+import sys
+import os
+import json
+import subprocess
+import threading
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.ken_burns import EffectType, KenBurnsEffect
+from services.remotion_renderer import RemotionRenderer
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    (tmp_path / 'remotion' / 'src').mkdir(parents=True)
+    return RemotionRenderer(remotion_dir=str(tmp_path / 'remotion'), use_server=False)
+
+
+def test_concurrent_renders_get_own_props(renderer, tmp_path, monkeypatch):
+    seen = {}
+    both_started = threading.Barrier(2)
+
+    def fake_run(cmd, **kwargs):
+        props = next(arg for arg in cmd if arg.startswith('--props='))[len('--props='):]
+        both_started.wait(timeout=5)
+        with open(props, encoding='utf-8') as f:
+            seen[cmd[5]] = json.load(f)['config']
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+
+    def render(name):
+        scenes = [{'imagePath': f'{name}.png', 'duration': 3.0, 'effect': 'zoom_in'}]
+        renderer.render_video(scenes, f'{name}.mp3', f'{name}/video.mp4', width=1080, height=1920)
+
+    threads = [threading.Thread(target=render, args=(name,)) for name in ('first', 'second')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen[str(tmp_path / 'first' / 'video.mp4')]['scenes'][0]['imagePath'] == 'first.png'
+    assert seen[str(tmp_path / 'second' / 'video.mp4')]['audioPath'] == 'second.mp3'
+    assert seen[str(tmp_path / 'second' / 'video.mp4')]['height'] == 1920
+
+    # Общий config.json больше не пишется, props удаляются после рендера
+    assert not (tmp_path / 'remotion' / 'src' / 'config.json').exists()
+    assert not list(tmp_path.glob('*/remotion_props_*.json'))
+
+
+def test_command_renders_video_composition_with_props(renderer):
+    cmd = renderer.build_command('job/props.json', '/out/video.mp4')
+
+    assert cmd[:6] == ['npx', 'remotion', 'render', 'src/index.tsx', 'Video', '/out/video.mp4']
+    assert cmd[6].startswith('--props=') and cmd[6].endswith(os.path.join('job', 'props.json'))
+
+
+def test_props_carry_reframed_effect_params(renderer, tmp_path):
+    ken_burns = KenBurnsEffect()
+    vertical = ken_burns.reframe_params(ken_burns.get_effect_params(EffectType.PAN_RIGHT), 1080, 1920)
+    scenes = [{'imagePath': '0.png', 'duration': 3.0, 'effect': 'pan_right', 'effectParams': vertical}]
+
+    props_path = renderer.write_props(scenes, None, 30, 1080, 1920, tmp_path / 'props.json')
+
+    # KenBurnsScene строит окно по effectParams, а не по имени эффекта
+    scene = json.loads(props_path.read_text(encoding='utf-8'))['config']['scenes'][0]
+    assert scene['effectParams']['start_position'] == [0.184, 0.5]
+    assert scene['effectParams']['end_position'] == [0.816, 0.5]
+
+
+def test_ass_mode_renders_scenes_without_subtitles_then_burns_them(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        if cmd[0] == 'npx':
+            props = next(arg for arg in cmd if arg.startswith('--props='))[len('--props='):]
+            with open(props, encoding='utf-8') as f:
+                calls.append(('remotion', json.load(f)['config']['scenes']))
+        else:
+            calls.append(('ffmpeg', cmd))
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+
+    (tmp_path / 'remotion' / 'src').mkdir(parents=True)
+    renderer = RemotionRenderer(
+        remotion_dir=str(tmp_path / 'remotion'), use_server=False, subtitles='ass', subtitle_style='karaoke'
+    )
+    scenes = [{
+        'imagePath': '1.png', 'duration': 3.0, 'effect': 'zoom_in',
+        'subtitle': {'text': 'Привет', 'startTime': 0, 'endTime': 2.0, 'highlighted': False}
+    }]
+
+    output = renderer.render_video(scenes, 'audio.mp3', 'out/video.mp4')
+
+    assert output == str(tmp_path / 'out' / 'video.mp4')
+    assert [kind for kind, _ in calls] == ['remotion', 'ffmpeg']
+    assert calls[0][1][0]['subtitle'] is None
+    assert 'ass=' in calls[1][1][calls[1][1].index('-vf') + 1]
+    assert not list((tmp_path / 'out').glob('video_nosubs_*'))
@@ -0,0 +1,161 @@
+"""
+Тесты супервизора Remotion render server (вместо Node - маленький HTTP сервер на Python)
+"""
+
+import sys
+import os
+import json
+import socket
+import subprocess
+import textwrap
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.remotion_renderer import RemotionRenderer
+from services.remotion_server import RemotionRenderServer, RemotionServerError
+
+FAKE_SERVER = textwrap.dedent('''
+    import json, os
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def reply(self, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.reply({
+                'ok': True, 'pid': os.getpid(), 'bundled': True,
+                'sourceHash': os.environ['SOURCE_HASH'], 'rendering': 0
+            })
+
+        def do_POST(self):
+            job = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            with open(job['outputPath'], 'w') as f:
+                json.dump(job, f)
+            self.reply({'outputPath': job['outputPath'], 'seconds': 0.1})
+
+    HTTPServer(('127.0.0.1', int(os.environ['RENDER_SERVER_PORT'])), Handler).serve_forever()
+''')
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def remotion_dir(tmp_path):
+    (tmp_path / 'remotion' / 'src').mkdir(parents=True)
+    (tmp_path / 'remotion' / 'src' / 'index.tsx').write_text('registerRoot(Root);')
+    (tmp_path / 'remotion' / 'package.json').write_text('{}')
+    (tmp_path / 'remotion' / 'fake_server.py').write_text(FAKE_SERVER)
+    return tmp_path / 'remotion'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def make_server(remotion_dir, command=None):
+    return RemotionRenderServer(
+        str(remotion_dir),
+        port=free_port(),
+        command=command or [sys.executable, 'fake_server.py'],
+        startup_timeout=10
+    )
+
+
+def test_render_goes_through_server_with_source_hash(remotion_dir, tmp_path):
+    server = make_server(remotion_dir)
+    try:
+        output = server.render({'config': {'scenes': []}}, 'video.mp4')
+
+        job = json.load(open(output))
+        assert job['sourceHash'] == server.source_hash()
+        assert job['props'] == {'config': {'scenes': []}}
+        assert server.status()['bundled'] is True
+
+        # Изменение исходников меняет хэш - сервер пересоберёт bundle
+        (remotion_dir / 'src' / 'Video.tsx').write_text('export const Video = () => null;')
+        server.render({'config': {'scenes': []}}, 'second.mp4')
+        assert json.load(open('second.mp4'))['sourceHash'] != job['sourceHash']
+    finally:
+        server.stop()
+
+
+def test_crashed_server_is_restarted(remotion_dir):
+    server = make_server(remotion_dir)
+    try:
+        server.render({'config': {}}, 'first.mp4')
+        server.process.kill()
+        server.process.wait()
+
+        server.render({'config': {}}, 'second.mp4')
+        assert server.restarts == 1
+        assert os.path.exists('second.mp4')
+    finally:
+        server.stop()
+
+
+def test_two_supervisors_get_own_servers(remotion_dir):
+    # API сервер и CLI batch: у каждого свой сервер на свободном порту
+    first = RemotionRenderServer(str(remotion_dir), command=[sys.executable, 'fake_server.py'], startup_timeout=10)
+    second = RemotionRenderServer(str(remotion_dir), command=[sys.executable, 'fake_server.py'], startup_timeout=10)
+    try:
+        first.render({'config': {}}, 'first.mp4')
+        second.render({'config': {}}, 'second.mp4')
+
+        assert first.base_url != second.base_url
+        assert first.status()['pid'] == first.process.pid
+        assert second.restarts == 0
+    finally:
+        first.stop()
+        second.stop()
+
+
+def test_foreign_server_on_port_is_not_adopted(remotion_dir):
+    owner = make_server(remotion_dir)
+    try:
+        owner.ensure_running()
+
+        # Порт занят чужим сервером: свой процесс не поднялся - ошибка с его выводом
+        intruder = RemotionRenderServer(
+            str(remotion_dir), port=owner.port, command=[sys.executable, 'fake_server.py'], startup_timeout=10
+        )
+        with pytest.raises(RemotionServerError, match='Address already in use'):
+            intruder.ensure_running()
+    finally:
+        owner.stop()
+
+
+def test_renderer_falls_back_to_cli_when_server_fails(remotion_dir, monkeypatch):
+    renderer = RemotionRenderer(remotion_dir=str(remotion_dir), use_server=False)
+    renderer.server = make_server(remotion_dir, command=[sys.executable, '-c', 'raise SystemExit(1)'])
+
+    cli_calls = []
+
+    def fake_run(cmd, **kwargs):
+        cli_calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+
+    renderer.render_video([{'imagePath': 'a.png', 'duration': 2.0, 'effect': 'static'}], None, 'video.mp4')
+    assert cli_calls and cli_calls[0][:3] == ['npx', 'remotion', 'render']
+
+    # Повторный старт не пытаемся делать до конца паузы
+    with pytest.raises(RemotionServerError, match='недоступен'):
+        renderer.server.ensure_running()
@@ -0,0 +1,90 @@
+"""
+Тесты прогресса рендера: разбор вывода, fps и ETA
+"""
+
+import sys
+import os
+import subprocess
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services import render_progress
+from services.render_progress import (
+    RenderProgress, count_frames, parse_ffmpeg_line, parse_remotion_line, run_with_progress
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_parsers_read_remotion_and_ffmpeg_frames():
+    assert parse_remotion_line('Rendered 120/900, time remaining: 1m\n') == (120, 900)
+    assert parse_remotion_line('Bundling 50%') is None
+    assert parse_ffmpeg_line('frame=240\n') == (240, None)
+    assert parse_ffmpeg_line('fps=30.5') is None
+    assert count_frames([{'duration': 2.0}, {'duration': 0.01}], 30) == 61
+
+
+def test_fps_and_eta_from_first_rendered_frame(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(render_progress.time, 'time', clock.time)
+    reports = []
+
+    progress = RenderProgress(900, reports.append, min_interval=0)
+
+    # Запуск браузера не учитывается в скорости
+    clock.now += 30
+    progress.update(30)
+    clock.now += 10
+    progress.update(330)
+
+    assert reports[-1]['fps'] == 30.0
+    assert reports[-1]['eta'] == 19
+    assert reports[-1]['percent'] == 36.7
+    assert reports[-1]['elapsed'] == 40
+
+    # Части (сегменты) суммируются
+    combined = RenderProgress(200, reports.append, min_interval=0)
+    combined.part_callback(0)({'frames': 100})
+    combined.part_callback(1)({'frames': 100})
+    assert reports[-1]['frames'] == 200 and reports[-1]['eta'] == 0
+
+
+def test_run_with_progress_streams_output_lines():
+    script = (
+        "import sys\n"
+        "for i in (10, 20, 30):\n"
+        "    sys.stdout.write(f'Rendered {i}/30\\r'); sys.stdout.flush()\n"
+        "sys.stderr.write('done\\n')\n"
+    )
+    seen = []
+
+    class Recorder(RenderProgress):
+        def update(self, frames, total_frames=None):
+            seen.append((frames, total_frames))
+            super().update(frames, total_frames)
+
+    result = run_with_progress([sys.executable, '-c', script], parse_remotion_line, Recorder(30))
+
+    assert result.returncode == 0
+    assert seen == [(10, 30), (20, 30), (30, 30)]
+    assert 'done' in result.stderr
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_with_progress(
+            [sys.executable, '-c', 'import time; time.sleep(5)'], parse_remotion_line, RenderProgress(1), timeout=0.5
+        )
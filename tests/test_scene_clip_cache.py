@@ -0,0 +1,167 @@
+"""
+Тесты рендера по сценам с кэшем клипов (без запуска ffmpeg / Remotion)
+"""
+
+import sys
+import os
+import shutil
+import subprocess
+import time
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.remotion_renderer import RemotionRenderer
+from services.scene_clip_cache import SceneClipCache, SceneCachedRenderer
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def concat_calls(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        with open(cmd[cmd.index('-i') + 1], encoding='utf-8') as f:
+            calls.append((cmd, f.read()))
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    return calls
+
+
+class FakeRenderer:
+    def __init__(self, transition=0.5):
+        self.transition = transition
+        self.rendered = []
+        self.fade_in = {}
+
+    def render_video(self, scenes, audio_path=None, output_path='output.mp4', fps=30, width=1920, height=1080,
+                     on_progress=None):
+        self.rendered.append(scenes[0]['imagePath'])
+        self.fade_in[scenes[0]['imagePath']] = scenes[0]['fadeIn']
+        with open(output_path, 'wb') as f:
+            f.write(b'x' * 100)
+        return output_path
+
+
+def make_scenes():
+    scenes = []
+    for i in range(3):
+        with open(f'{i}.png', 'wb') as f:
+            f.write(f'image {i}'.encode())
+        scenes.append({
+            'imagePath': f'{i}.png', 'duration': 3.0, 'effect': 'zoom_in',
+            'subtitle': {'text': f'Сцена {i}', 'startTime': 0, 'endTime': 3.0, 'highlighted': False}
+        })
+    return scenes
+
+
+def test_rerender_touches_only_changed_scenes(concat_calls):
+    fake = FakeRenderer()
+    renderer = SceneCachedRenderer(fake, max_workers=2)
+    scenes = make_scenes()
+
+    renderer.render_video(scenes, 'audio.mp3', 'video.mp4')
+    assert sorted(fake.rendered) == ['0.png', '1.png', '2.png']
+
+    # Перегенерирована картинка 1 (тот же путь) и субтитр сцены 2
+    with open('1.png', 'wb') as f:
+        f.write(b'new image 1')
+    scenes[2]['subtitle']['text'] = 'Другой текст'
+    fake.rendered.clear()
+
+    renderer.render_video(scenes, 'audio.mp3', 'video.mp4')
+    assert sorted(fake.rendered) == ['1.png', '2.png']
+
+    cmd, listing = concat_calls[-1]
+    assert cmd[cmd.index('-c:v') + 1] == 'copy'
+    assert listing.count("file '") == 3
+    assert not any(name.startswith('scene_clips_') for name in os.listdir('.'))
+
+
+def test_renderer_settings_are_part_of_key(concat_calls):
+    cache = SceneClipCache()
+    scenes = make_scenes()
+
+    SceneCachedRenderer(FakeRenderer(transition=0.5), cache=cache).render_video(scenes, None, 'video.mp4')
+
+    other = FakeRenderer(transition=0)
+    SceneCachedRenderer(other, cache=cache).render_video(scenes, None, 'video.mp4')
+    assert len(other.rendered) == 3
+
+    assert cache.scene_key(scenes[0], 30, 1920, 1080) != cache.scene_key(scenes[0], 30, 1080, 1920)
+
+
+def test_clips_fade_in_like_full_render(concat_calls):
+    fake = FakeRenderer()
+    cache = SceneClipCache()
+    scenes = make_scenes()
+
+    SceneCachedRenderer(fake, cache=cache).render_video(scenes, None, 'video.mp4')
+    assert fake.fade_in == {'0.png': False, '1.png': True, '2.png': True}
+    assert 'fadeIn' not in scenes[0]
+
+    # Первая сцена, ставшая второй, - уже другой клип
+    fake.rendered.clear()
+    SceneCachedRenderer(fake, cache=cache).render_video([scenes[1], scenes[0]], None, 'video.mp4')
+    assert sorted(fake.rendered) == ['0.png', '1.png']
+
+
+def test_concat_survives_eviction_by_other_job(concat_calls, monkeypatch):
+    cache = SceneClipCache()
+    scenes = make_scenes()
+    SceneCachedRenderer(FakeRenderer(), cache=cache).render_video(scenes, None, 'warm.mp4')
+
+    listed = []
+
+    def fake_run(cmd, **kwargs):
+        # Пока идёт склейка, другая задача вытесняет весь кэш
+        shutil.rmtree(cache.cache_dir)
+        cache.cache_dir.mkdir()
+        with open(cmd[cmd.index('-i') + 1], encoding='utf-8') as f:
+            listed.extend(line.split("'")[1] for line in f)
+        assert all(os.path.getsize(path) == 100 for path in listed)
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    fake = FakeRenderer()
+    SceneCachedRenderer(fake, cache=cache).render_video(scenes, None, 'video.mp4')
+
+    assert fake.rendered == []
+    assert len(listed) == 3 and not any(str(cache.cache_dir) in path for path in listed)
+
+
+def test_remotion_source_edit_invalidates_clips(tmp_path):
+    src = tmp_path / 'remotion' / 'src'
+    src.mkdir(parents=True)
+    (src / 'Video.tsx').write_text('export const Video = () => null;')
+
+    renderer = SceneCachedRenderer(RemotionRenderer(remotion_dir=str(tmp_path / 'remotion'), use_server=False))
+    tag = renderer.renderer_tag()
+    assert renderer.renderer_tag() == tag
+
+    # Правка композиции - другие кадры, другой ключ
+    (src / 'Video.tsx').write_text('export const Video = () => <div />;')
+    assert renderer.renderer_tag() != tag
+
+
+def test_cache_evicts_least_recently_used_over_limit(tmp_path):
+    cache = SceneClipCache(max_size_mb=0)
+    cache.max_size = 250
+
+    for i, key in enumerate(['old', 'mid', 'new']):
+        clip = tmp_path / f'{key}_clip.mp4'
+        clip.write_bytes(b'x' * 100)
+        cache.put(key, str(clip))
+        os.utime(cache.cache_dir / f'{key}.mp4', (time.time() + i, time.time() + i))
+
+    assert cache.evict(keep=['old']) == 1
+    assert cache.get('old') and cache.get('new')
+    assert cache.get('mid') is None
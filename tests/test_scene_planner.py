@@ -0,0 +1,109 @@
+"""
+Тесты локальной раскадровки (generate_image_prompts без LLM)
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.provider_router import ProviderRouter
+from services.token_budget import TokenBudgetEstimator
+from services.scene_planner import ScenePlanner
+from services.script_gen import ScriptGenerator
+
+SCRIPT = (
+    "Вы когда-нибудь замечали, как страх управляет вашими решениями? "
+    "Учёные провели эксперимент с детьми. "
+    "Однако результаты удивили всех. "
+    "Деньги не приносят счастья, если нет времени на друзей. "
+    "Например, одиночество влияет на мозг сильнее, чем курение. "
+    "Итак, что же делать? Начните с малых привычек каждый день."
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def test_scenes_are_sentence_aligned_and_contiguous():
+    scenes = ScenePlanner().plan(SCRIPT, images_per_minute=15)
+
+    assert ' '.join(scene['text'] for scene in scenes) == SCRIPT
+    for previous, scene in zip(scenes, scenes[1:]):
+        assert scene['timestamp'] == pytest.approx(previous['timestamp'] + previous['duration'], abs=0.02)
+
+    for scene in scenes:
+        assert set(scene) >= {'prompt', 'timestamp', 'duration', 'scene_description'}
+        assert scene['prompt']
+
+
+def test_keyword_descriptions():
+    planner = ScenePlanner()
+
+    assert planner.describe('Страх живёт в мозге.') == 'frightened person in shadows, human brain'
+    # 'детали' - не 'дети'
+    assert planner.describe('Обратите внимание на детали.') == 'person reflecting, symbolic abstract background'
+
+
+def test_short_stems_do_not_match_unrelated_words():
+    planner = ScenePlanner()
+    neutral = 'person reflecting, symbolic abstract background'
+
+    # 'другой' - не 'друг', 'дорогой' - не 'дорога', 'время' - не повод для часов
+    assert planner.describe('Другой подход дорогой ценой.') == neutral
+    assert planner.describe('Домашние дела ждут водителя.') == neutral
+    assert planner.describe('Мороз, горный воздух, и время идёт.') == neutral
+    assert planner.describe('Город в горах.') == 'city skyline, mountains'
+
+    # Перечисленные формы коротких слов по-прежнему работают
+    assert planner.describe('Друзья пьют воду дома.') == 'group of friends, glass of water, cozy home interior'
+    assert planner.describe('Мой друг ушёл в лес.') == 'two friends, forest'
+
+
+def test_real_durations_and_total_duration():
+    planner = ScenePlanner()
+    sentence_count = len(planner._splitter.split_sentences(SCRIPT))
+
+    scenes = planner.plan(SCRIPT, images_per_minute=60, sentence_durations=[2.0] * sentence_count)
+    assert sum(scene['duration'] for scene in scenes) == pytest.approx(2.0 * sentence_count)
+
+    scenes = planner.plan(SCRIPT, total_duration=90.0)
+    assert sum(scene['duration'] for scene in scenes) == pytest.approx(90.0, abs=0.05)
+
+
+def test_images_per_minute_controls_scene_count():
+    long_script = SCRIPT * 20
+
+    dense = ScenePlanner().plan(long_script, images_per_minute=30)
+    sparse = ScenePlanner().plan(long_script, images_per_minute=6)
+
+    assert len(dense) > len(sparse) * 3
+
+
+def test_generate_image_prompts_with_llm_refinement():
+    async def refine(prompt):
+        return "1. a scared man at a crossroads\n2. kids in a science lab"
+
+    generator = ScriptGenerator.__new__(ScriptGenerator)
+    generator.circuit_breakers = CircuitBreakerRegistry()
+    generator.router = ProviderRouter()
+    generator.token_budget = TokenBudgetEstimator()
+    generator._get_provider_candidates = lambda use_ollama=True: [
+        {'key': 'fake', 'name': 'fake', 'emoji': '🧪', 'provider': 'fake', 'model': 'fake', 'generate': refine}
+    ]
+
+    local = asyncio.run(generator.generate_image_prompts(SCRIPT, images_per_minute=30))
+    refined = asyncio.run(generator.generate_image_prompts(SCRIPT, images_per_minute=30, refine_with_llm=True))
+
+    assert refined[0]['prompt'] == 'a scared man at a crossroads'
+    assert refined[1]['prompt'] == 'kids in a science lab'
+    # Сцены без ответа LLM сохраняют локальный промпт
+    assert refined[2]['prompt'] == local[2]['prompt']
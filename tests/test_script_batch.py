@@ -0,0 +1,94 @@
+"""
+Тесты пакетной генерации сценариев
+"""
+
+import sys
+import os
+import asyncio
+import re
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.provider_router import ProviderRouter
+from services.token_budget import TokenBudgetEstimator
+from services.script_gen import ScriptGenerator
+from utils.cache import YouTubeCache
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def block(number, topic):
+    return (f"=== ВИДЕО {number} ===\n[HOOK]\nХук про {topic}.\n[SCRIPT]\nСценарий про {topic}.\n"
+            f"[CTA]\nПодпишитесь!\n[TITLES]\n1. {topic}\n")
+
+
+def make_generator(requests, skip_topics=()):
+    async def generate(prompt):
+        requests.append(prompt)
+        if '=== ВИДЕО N ===' in prompt:
+            topics = re.findall(r'^\d+\. "(.+)"$', prompt, flags=re.MULTILINE)
+            return '\n'.join(block(i, topic) for i, topic in enumerate(topics, 1) if topic not in skip_topics)
+
+        topic = re.search(r'на тему:\n"(.+)"', prompt).group(1)
+        return block(1, topic).split('\n', 1)[1]
+
+    generator = ScriptGenerator.__new__(ScriptGenerator)
+    generator.circuit_breakers = CircuitBreakerRegistry()
+    generator.router = ProviderRouter()
+    generator.token_budget = TokenBudgetEstimator()
+    generator.script_cache = YouTubeCache("script_cache.db")
+    generator.cache_ttl = 3600
+    generator._get_provider_candidates = lambda use_ollama=True: [
+        {'key': 'fake', 'name': 'fake', 'emoji': '🧪', 'provider': 'fake', 'model': 'fake', 'generate': generate}
+    ]
+    return generator
+
+
+def test_short_topics_are_packed_into_few_requests():
+    requests = []
+    topics = [f'Тема {i}' for i in range(10)]
+
+    results = asyncio.run(make_generator(requests).generate_scripts_batch(topics, target_length=150))
+
+    # 1200 // (150 + 80) = 5 тем в запросе
+    assert len(requests) == 2
+    assert [result['topic'] for result in results] == topics
+    assert [result['script'] for result in results] == [f'Сценарий про {topic}.' for topic in topics]
+
+
+def test_missing_topic_is_generated_separately():
+    requests = []
+    topics = ['Сон', 'Память', 'Страх']
+
+    results = asyncio.run(make_generator(requests, skip_topics={'Память'}).generate_scripts_batch(topics))
+
+    assert len(requests) == 2
+    assert results[1]['script'] == 'Сценарий про Память.'
+
+
+def test_batch_results_are_reused_by_generate_script():
+    requests = []
+    generator = make_generator(requests)
+
+    asyncio.run(generator.generate_scripts_batch(['Сон', 'Память'], target_length=150))
+    single = asyncio.run(generator.generate_script('Память', target_length=150))
+
+    assert len(requests) == 1
+    assert single['script'] == 'Сценарий про Память.'
+
+
+def test_long_topics_fan_out_concurrently():
+    requests = []
+    results = asyncio.run(make_generator(requests).generate_scripts_batch(['Сон', 'Память'], target_length=1000))
+
+    assert len(requests) == 2
+    assert all('=== ВИДЕО N ===' not in prompt for prompt in requests)
+    assert [result['topic'] for result in results] == ['Сон', 'Память']
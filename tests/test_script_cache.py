@@ -0,0 +1,87 @@
+"""
+Тесты кэша сгенерированных сценариев
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.provider_router import ProviderRouter
+from services.token_budget import TokenBudgetEstimator
+from services.script_gen import ScriptGenerator
+from utils.cache import YouTubeCache
+
+VALID_RESPONSE = "[HOOK]\nЦепляющее начало.\n[SCRIPT]\nОсновной текст сценария.\n[CTA]\nПодпишитесь!\n[TITLES]\n1. Заголовок"
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def make_generator(calls, ttl=3600):
+    async def generate(prompt):
+        calls.append(prompt)
+        return VALID_RESPONSE
+
+    generator = ScriptGenerator.__new__(ScriptGenerator)
+    generator.circuit_breakers = CircuitBreakerRegistry()
+    generator.router = ProviderRouter()
+    generator.token_budget = TokenBudgetEstimator()
+    generator.script_cache = YouTubeCache("script_cache.db")
+    generator.cache_ttl = ttl
+    generator._get_provider_candidates = lambda use_ollama=True: [
+        {'key': 'fake', 'name': 'fake', 'emoji': '🧪', 'provider': 'fake', 'model': 'fake-1', 'generate': generate}
+    ]
+    return generator
+
+
+def test_retry_is_served_from_cache():
+    calls = []
+
+    first = asyncio.run(make_generator(calls).generate_script('Тема'))
+    # Новый экземпляр (перезапуск приложения) - кэш на диске
+    second = asyncio.run(make_generator(calls).generate_script('Тема'))
+
+    assert len(calls) == 1
+    assert second == first
+    assert second['provider'] == 'fake'
+
+
+def test_different_prompt_and_bypass_flag_regenerate():
+    calls = []
+    generator = make_generator(calls)
+
+    asyncio.run(generator.generate_script('Тема'))
+    asyncio.run(generator.generate_script('Тема', target_length=500))
+    asyncio.run(generator.generate_script('Тема', use_cache=False))
+
+    assert len(calls) == 3
+
+
+def test_expired_entry_is_ignored():
+    calls = []
+
+    asyncio.run(make_generator(calls, ttl=-1).generate_script('Тема'))
+    asyncio.run(make_generator(calls).generate_script('Тема'))
+
+    assert len(calls) == 2
+
+
+def test_cache_hit_replays_stream_events():
+    calls = []
+    asyncio.run(make_generator(calls).generate_script('Тема'))
+
+    events = []
+    result = asyncio.run(make_generator(calls).generate_script('Тема', on_event=events.append))
+
+    assert len(calls) == 1
+    assert events[0] == {'type': 'sentence', 'section': 'hook', 'index': 0, 'text': 'Цепляющее начало.'}
+    assert events[-1] == {'type': 'done', 'result': result}
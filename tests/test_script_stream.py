@@ -0,0 +1,114 @@
+"""
+Тесты потокового разбора сценария
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.provider_router import ProviderRouter
+from services.token_budget import TokenBudgetEstimator
+from services.script_gen import ScriptGenerator
+from services.script_stream import ScriptStreamParser
+
+RESPONSE = (
+    "Вот ваш сценарий:\n"
+    "[HOOK]\nВы знали? Это случилось в г. Москва давно.\n"
+    "[SCRIPT]\nПервый абзац. Второе предложение!\n\nНовый абзац.\n"
+    "[CTA]\nПодпишитесь!\n"
+    "[TITLES]\n1. Первый заголовок\n2. Второй заголовок"
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def parse_in_chunks(text, size):
+    parser = ScriptStreamParser()
+    events = []
+    for i in range(0, len(text), size):
+        events += parser.feed(text[i:i + size])
+    return events + parser.close()
+
+
+@pytest.mark.parametrize('size', [1, 2, 5, 13, len(RESPONSE)])
+def test_events_do_not_depend_on_chunking(size):
+    assert parse_in_chunks(RESPONSE, size) == parse_in_chunks(RESPONSE, len(RESPONSE))
+
+
+def test_sentences_and_sections_match_parse_response():
+    events = parse_in_chunks(RESPONSE, 3)
+    sentences = [(e['section'], e['text']) for e in events if e['type'] == 'sentence']
+    sections = {e['section']: e for e in events if e['type'] == 'section'}
+
+    assert sentences == [
+        ('hook', 'Вы знали?'),
+        ('hook', 'Это случилось в г. Москва давно.'),
+        ('script', 'Первый абзац.'),
+        ('script', 'Второе предложение!'),
+        ('script', 'Новый абзац.'),
+        ('cta', 'Подпишитесь!'),
+    ]
+
+    parsed = ScriptGenerator._parse_response(None, RESPONSE)
+    assert sections['hook']['text'] == parsed['hook']
+    assert sections['script']['text'] == parsed['script']
+    assert sections['titles']['titles'] == parsed['title_suggestions']
+
+
+def test_hook_is_handed_off_before_stream_ends():
+    parser = ScriptStreamParser()
+    hook_end = RESPONSE.index('[SCRIPT]') + len('[SCRIPT]')
+
+    events = parser.feed(RESPONSE[:hook_end])
+
+    assert {'type': 'section', 'section': 'hook', 'text': 'Вы знали? Это случилось в г. Москва давно.'} in events
+
+
+def make_generator(candidates):
+    generator = ScriptGenerator.__new__(ScriptGenerator)
+    generator.circuit_breakers = CircuitBreakerRegistry()
+    generator.router = ProviderRouter()
+    generator.token_budget = TokenBudgetEstimator()
+    generator.script_cache = None
+    generator._get_provider_candidates = lambda use_ollama=True: candidates
+    return generator
+
+
+def candidate(key, generate, stream=None):
+    return {'key': key, 'name': key, 'emoji': '🧪', 'provider': key, 'model': key,
+            'generate': generate, 'stream': stream}
+
+
+def test_stream_script_resets_when_provider_breaks_mid_stream():
+    async def broken_stream(prompt):
+        yield RESPONSE[:60]
+        raise Exception('connection reset')
+
+    async def whole(prompt):
+        return RESPONSE
+
+    async def collect():
+        generator = make_generator([
+            candidate('broken', whole, stream=broken_stream),
+            candidate('backup', whole),
+        ])
+        return [event async for event in generator.stream_script('Тема')]
+
+    events = asyncio.run(collect())
+    types = [event['type'] for event in events]
+
+    assert types[0] == 'sentence'
+    assert 'reset' in types
+    assert types[-1] == 'done'
+    assert events[-1]['result']['provider'] == 'backup'
+    assert events[types.index('reset') + 1]['text'] == 'Вы знали?'
@@ -0,0 +1,121 @@
+"""
+Тесты сегментного рендера (без запуска ffmpeg / Remotion)
+"""
+
+import sys
+import os
+import subprocess
+import threading
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.remotion_renderer import RemotionRenderer
+from services.segment_renderer import SegmentedRenderer
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+class FakeRenderer:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def render_video(self, scenes, audio_path=None, output_path='output.mp4', fps=30, width=1920, height=1080,
+                     on_progress=None):
+        with self.lock:
+            self.calls.append({'scenes': scenes, 'audio': audio_path, 'output': output_path})
+        with open(output_path, 'wb') as f:
+            f.write(b'video')
+        return output_path
+
+
+def make_scenes(durations):
+    return [{'imagePath': f'{i}.png', 'duration': d, 'effect': 'zoom_in'} for i, d in enumerate(durations)]
+
+
+def test_segments_split_on_scene_boundaries_by_duration():
+    renderer = SegmentedRenderer(FakeRenderer(), max_workers=3, min_segment_seconds=10)
+    scenes = make_scenes([10, 10, 10, 10, 10, 10, 5, 5, 10])
+
+    segments = renderer.plan_segments(scenes)
+
+    assert len(segments) == 3
+    assert [scene for segment in segments for scene in segment] == scenes
+    assert [sum(s['duration'] for s in segment) for segment in segments] == [30, 30, 20]
+
+
+def test_short_video_renders_in_one_piece_with_audio():
+    fake = FakeRenderer()
+    renderer = SegmentedRenderer(fake, max_workers=4, min_segment_seconds=60)
+
+    renderer.render_video(make_scenes([20, 20, 20]), 'audio.mp3', 'video.mp4')
+
+    assert len(fake.calls) == 1
+    assert fake.calls[0]['audio'] == 'audio.mp3'
+
+
+def test_segments_rendered_silent_and_stream_copied(monkeypatch, tmp_path):
+    fake = FakeRenderer()
+    commands = []
+
+    def fake_run(cmd, **kwargs):
+        commands.append(cmd)
+        with open(cmd[cmd.index('-i') + 1], encoding='utf-8') as f:
+            commands.append(f.read())
+        return subprocess.CompletedProcess(cmd, 0, '', '')
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+
+    output = SegmentedRenderer(fake, max_workers=2, min_segment_seconds=10).render_video(
+        make_scenes([15, 15, 15, 15]), 'audio.mp3', 'temp/video.mp4'
+    )
+
+    assert output == str(tmp_path / 'temp' / 'video.mp4')
+    assert len(fake.calls) == 2
+    assert all(call['audio'] is None for call in fake.calls)
+
+    cmd, listing = commands
+    assert cmd[cmd.index('-c:v') + 1] == 'copy'
+    assert cmd[cmd.index('-map', cmd.index('-c:v')) + 1] == '1:a'
+    assert str(tmp_path / 'audio.mp3') in cmd
+    assert listing.count("file '") == 2 and 'segment_000.mp4' in listing.splitlines()[0]
+
+    # Временные сегменты удалены
+    assert not list((tmp_path / 'temp').glob('segments_*'))
+
+
+def test_later_segments_fade_in_first_scene(monkeypatch, tmp_path):
+    fake = FakeRenderer()
+    monkeypatch.setattr(subprocess, 'run', lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, '', ''))
+    scenes = make_scenes([10, 10, 10, 10, 10, 10])
+
+    SegmentedRenderer(fake, max_workers=3, min_segment_seconds=10).render_video(scenes, None, 'video.mp4')
+
+    remotion = RemotionRenderer(remotion_dir=str(tmp_path), use_server=False)
+    props = [
+        remotion.build_props(call['scenes'], None, 30, 1920, 1080)['config']['scenes']
+        for call in sorted(fake.calls, key=lambda call: call['output'])
+    ]
+
+    assert len(props) == 3
+    assert 'fadeIn' not in props[0][0]
+    assert all(segment[0]['fadeIn'] is True for segment in props[1:])
+    # Внутри сегмента переходы - как обычно, по индексу сцены
+    assert not any('fadeIn' in scene for segment in props for scene in segment[1:])
+    assert not any('fadeIn' in scene for scene in scenes)
+
+
+def test_concat_failure_raises(monkeypatch):
+    monkeypatch.setattr(subprocess, 'run', lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 1, '', 'boom'))
+
+    with pytest.raises(RuntimeError, match='boom'):
+        SegmentedRenderer(FakeRenderer(), max_workers=2, min_segment_seconds=10).render_video(
+            make_scenes([15, 15]), None, 'video.mp4'
+        )
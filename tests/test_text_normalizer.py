@@ -0,0 +1,65 @@
+"""
+Golden-корпус TextNormalizer: результат нормализации не должен меняться
+
+Ожидаемые значения в tests/golden/text_normalizer.json получены
+исходной (некомпилированной) реализацией.
+"""
+
+import sys
+import os
+import json
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.text_normalizer import TextNormalizer
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), 'golden', 'text_normalizer.json')
+
+with open(GOLDEN_PATH, encoding='utf-8') as f:
+    GOLDEN_CASES = json.load(f)
+
+
+@pytest.mark.parametrize('case', GOLDEN_CASES, ids=lambda case: f"{case['language']}:{case['input'][:30]}")
+def test_golden_corpus(case):
+    normalizer = TextNormalizer(language=case['language'])
+    assert normalizer.normalize_for_tts(case['input']) == case['expected']
+
+
+def test_custom_abbreviations_keep_dictionary_order():
+    normalizer = TextNormalizer(language='ru')
+    normalizer.ru_abbreviations = {'д': 'дом', 'д-р': 'доктор'}
+
+    # 'д' стоит раньше и срабатывает первым, как при последовательных заменах
+    assert normalizer._expand_abbreviations('д-р Иванов') == 'дом-р Иванов'
+
+
+def test_normalize_many_matches_serial():
+    normalizer = TextNormalizer(language='ru')
+    texts = [case['input'] for case in GOLDEN_CASES if case['language'] == 'ru']
+
+    results = normalizer.normalize_many(texts, max_workers=2, chunksize=5)
+
+    assert results == [normalizer.normalize_for_tts(text) for text in texts]
+
+
+def test_normalize_sentences_offsets():
+    normalizer = TextNormalizer(language='ru')
+    text = "Встреча 01.01.2024 в г. Москва. Цена 3.14 руб!\n\nДалее 5 км и т.д. Конец"
+
+    sentences = normalizer.normalize_sentences(text)
+
+    assert [s['text'] for s in sentences] == [
+        'Встреча 01.01.2024 в г. Москва.',
+        'Цена 3.14 руб!',
+        'Далее 5 км и т.д.',
+        'Конец'
+    ]
+    for sentence in sentences:
+        assert text[sentence['start']:sentence['end']] == sentence['text']
+        assert sentence['normalized'] == normalizer.normalize_for_tts(sentence['text'])
+
+    assert normalizer.normalize_many_sentences([text, text], max_workers=2) == [sentences, sentences]
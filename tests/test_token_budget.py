@@ -0,0 +1,107 @@
+"""
+Тесты оценки лимита токенов ответа LLM
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Добавляем backend в путь
+project_root = os.path.dirname(os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(project_root, 'backend'))
+
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.provider_router import ProviderRouter
+from services.script_gen import ScriptGenerator
+from services.token_budget import TokenBudgetEstimator, current_output, expected_output
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+def make_generator(generate):
+    generator = ScriptGenerator.__new__(ScriptGenerator)
+    generator.circuit_breakers = CircuitBreakerRegistry()
+    generator.router = ProviderRouter()
+    generator.token_budget = TokenBudgetEstimator()
+    generator.script_cache = None
+    generator._get_provider_candidates = lambda use_ollama=True: [
+        {'key': 'llama', 'name': 'llama', 'emoji': '🧪', 'provider': 'ollama', 'model': 'llama3.1:8b', 'generate': generate}
+    ]
+    return generator
+
+
+def test_estimate_depends_on_length_language_and_tokenizer():
+    budget = TokenBudgetEstimator()
+
+    short_ru = budget.estimate(150, 'ru', 'llama3.1:8b')
+    long_ru = budget.estimate(1000, 'ru', 'llama3.1:8b')
+
+    assert short_ru < long_ru < 4000
+    assert budget.estimate(1000, 'en', 'llama3.1:8b') < long_ru
+    assert budget.estimate(1000, 'ru', 'gemini-2.0-flash') < budget.estimate(1000, 'ru', 'mistral-7b-instruct-v0.3')
+    assert long_ru % 64 == 0
+
+    # Границы
+    assert budget.estimate(5, 'en', 'gpt-4o-mini') == budget.min_tokens
+    assert budget.estimate(50000, 'ru', 'llama3.1:8b') == budget.max_tokens
+
+
+def test_observed_overshoot_raises_budget_and_persists():
+    budget = TokenBudgetEstimator()
+    before = budget.estimate(500, 'ru', 'llama3.1:8b')
+
+    # Модель пишет в полтора раза длиннее запрошенного
+    for _ in range(5):
+        budget.observe('llama3.1:8b', 'ru', 500, 750)
+
+    assert budget.estimate(500, 'ru', 'llama3.1:8b') > before
+    # Семейство общее: Groq Llama 70B получает ту же поправку
+    assert TokenBudgetEstimator().length_ratio('llama-3.1-70b', 'ru') == pytest.approx(1.5)
+
+
+def test_undershoot_never_shrinks_budget():
+    budget = TokenBudgetEstimator()
+    before = budget.estimate(500, 'ru', 'qwen2.5-72b-instruct')
+
+    budget.observe('qwen2.5-72b-instruct', 'ru', 500, 200)
+
+    assert budget.estimate(500, 'ru', 'qwen2.5-72b-instruct') == before
+
+
+def test_generate_script_passes_tight_limit_and_learns():
+    seen = []
+    generator = None
+
+    async def generate(prompt):
+        seen.append(generator._max_tokens('llama3.1:8b', 4000))
+        return "[HOOK]\nНачало.\n[SCRIPT]\n" + "слово " * 300 + "\n[CTA]\nПодпишитесь!\n[TITLES]\n1. Заголовок"
+
+    generator = make_generator(generate)
+    expected = generator.token_budget.estimate(200, 'ru', 'llama3.1:8b', extra_words=generator.SCRIPT_OVERHEAD_WORDS)
+
+    asyncio.run(generator.generate_script("тема", target_length=200))
+
+    assert seen[0] == expected < 4000
+
+    # Вне запроса - прежний лимит
+    assert current_output() is None
+    assert generator._max_tokens('llama3.1:8b', 4000) == 4000
+
+    assert generator.token_budget.get_status()['llama:ru']['ratio'] == pytest.approx(1.5)
+
+
+def test_parallel_requests_keep_own_budget():
+    async def request(words):
+        with expected_output(words, 'ru'):
+            await asyncio.sleep(0.01)
+            return current_output()[0]
+
+    async def run():
+        return await asyncio.gather(request(100), request(900))
+
+    assert asyncio.run(run()) == [100, 900]